@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Table load, query and export hot paths
+
+Each case runs in a fresh (spawned) process, so its peak RSS is its own.
+The timed call runs once untraced for wall time, then again under
+tracemalloc for allocations.  Data is synthetic (see synthetic.py) and
+arelle runs offline, so the suite needs no network.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 1000 100000 --output results.json
+    python -m benchmarks.run_benchmarks --cases load_xbrl get_facts --compare baseline.json
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from benchmarks.synthetic import generate_dataset
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import datetime
+import importlib.metadata
+import json
+import multiprocessing
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+DEFAULT_SIZES = (1_000, 100_000)
+
+
+# CASES
+#each case is setup(data, scratch_dir) -> run, where run() is the timed call
+
+def make_factory(scratch_dir):
+    from src.TableFactory import TableFactory
+
+    factory = TableFactory(scratch_dir / 'working')
+    factory.options['internetConnectivity'] = 'offline'
+    factory.logfile_dir.mkdir(parents=True, exist_ok=True)
+    return factory
+
+
+def load_table(data, scratch_dir, trusted=False):
+    return make_factory(scratch_dir).create_xbrl_instance_table(data['instance'], trusted=trusted)
+
+
+def setup_load_xbrl(data, scratch_dir):
+    factory = make_factory(scratch_dir)
+    return lambda: factory.create_xbrl_instance_table(data['instance'])
+
+
+def setup_load_xbrl_trusted(data, scratch_dir):
+    factory = make_factory(scratch_dir)
+    return lambda: factory.create_xbrl_instance_table(data['instance'], trusted=True)
+
+
+def setup_get_facts(data, scratch_dir):
+    table = load_table(data, scratch_dir)
+    return table.get_facts
+
+
+def setup_get_fact_store(data, scratch_dir):
+    table = load_table(data, scratch_dir)
+
+    def run():
+        table.fact_store = None
+        return table.get_facts(columnar=True)
+    return run
+
+
+def setup_get_instance(data, scratch_dir):
+    table = load_table(data, scratch_dir)
+    return table.get_instance
+
+
+def setup_to_file(data, scratch_dir):
+    table = load_table(data, scratch_dir)
+    return lambda: table.to_file(scratch_dir / 'out' / 'bench.xbrl')
+
+
+def setup_are_xml_files_identical_lxml(data, scratch_dir):
+    from src.utils import are_xml_files_identical_lxml
+
+    copy_path = scratch_dir / 'copy.xbrl'
+    shutil.copyfile(data['instance'], copy_path)
+    return lambda: are_xml_files_identical_lxml(data['instance'], copy_path)
+
+
+def copy_workbook(data, scratch_dir):
+    workbook = scratch_dir / data['workbook'].name
+    shutil.copyfile(data['workbook'], workbook)
+    shutil.copyfile(data['instance'], scratch_dir / data['instance'].name)
+    return workbook
+
+
+def setup_generate_xbrl(data, scratch_dir):
+    from src.vba.bas_create_instance_doc.generate_xbrl import generate_xbrl
+
+    workbook = copy_workbook(data, scratch_dir)
+    return lambda: generate_xbrl(workbook, output_file=str(scratch_dir / 'generated.xbrl'))
+
+
+def setup_populate_spreadsheet(data, scratch_dir):
+    from src.vba.bas_create_instance_doc.populate_spreadsheet import populate_spreadsheet
+
+    workbook = copy_workbook(data, scratch_dir)
+    return lambda: populate_spreadsheet(workbook)
+
+
+def setup_initialize_data(data, scratch_dir):
+    from src.vba.bas_create_instance_doc.initialize_data import initialize_data
+
+    workbook = copy_workbook(data, scratch_dir)
+    return lambda: initialize_data(workbook)
+
+
+def setup_generate_audit_information(data, scratch_dir):
+    from src.vba.bas_create_instance_doc.generate_audit_information import generate_audit_information
+
+    workbook = copy_workbook(data, scratch_dir)
+    return lambda: generate_audit_information(workbook)
+
+
+def setup_clear_audit_information(data, scratch_dir):
+    from src.vba.bas_create_instance_doc.clear_audit_information import clear_audit_information
+
+    workbook = copy_workbook(data, scratch_dir)
+    return lambda: clear_audit_information(workbook)
+
+
+CASES = {
+    'load_xbrl': setup_load_xbrl,
+    'load_xbrl_trusted': setup_load_xbrl_trusted,
+    'get_facts': setup_get_facts,
+    'get_fact_store': setup_get_fact_store,
+    'get_instance': setup_get_instance,
+    'to_file': setup_to_file,
+    'are_xml_files_identical_lxml': setup_are_xml_files_identical_lxml,
+    'generate_xbrl': setup_generate_xbrl,
+    'populate_spreadsheet': setup_populate_spreadsheet,
+    'initialize_data': setup_initialize_data,
+    'generate_audit_information': setup_generate_audit_information,
+    'clear_audit_information': setup_clear_audit_information,
+}
+
+
+# RUNNER
+
+def peak_rss_kb():
+    """Get the process' peak RSS in KiB (ru_maxrss is bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_case(case, data, scratch_dir):
+    """Run one case in the current (worker) process and measure it."""
+    scratch_dir = Path(scratch_dir)
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    result = {'case': case, 'n_facts': data['n_facts'], 'error': None}
+    try:
+        run = CASES[case](data, scratch_dir)
+        result['setup_peak_rss_kb'] = peak_rss_kb()
+        started_at = time.perf_counter()
+        run()
+        result['wall_time'] = time.perf_counter() - started_at
+        result['peak_rss_kb'] = peak_rss_kb()
+        tracemalloc.start()
+        run()
+        current, peak = tracemalloc.get_traced_memory()
+        result['alloc_peak_bytes'] = peak
+        result['alloc_retained_bytes'] = current
+        tracemalloc.stop()
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return result
+
+
+def run_isolated(case, data, scratch_dir):
+    """Run one case in a fresh spawned process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_case, case, data, scratch_dir).result()
+
+
+def get_metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for package in ('arelle-release', 'lxml', 'numpy', 'openpyxl'):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'packages': versions,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=None, work_dir=None, max_workbook_rows=50_000, verbose=True):
+    """Generate the datasets and run every case at every size.
+
+    Returns:
+        dict: {'meta': {...}, 'results': [{case, n_facts, wall_time, ...}]}
+    """
+    cases = list(cases or CASES)
+    work_dir = Path(work_dir or tempfile.mkdtemp(prefix='xbrl-bench-'))
+    report = {'meta': get_metadata(), 'results': []}
+    for n_facts in sizes:
+        started_at = time.perf_counter()
+        data = generate_dataset(work_dir / 'data', n_facts, max_workbook_rows)
+        if verbose:
+            print(f'generated {n_facts} facts in {time.perf_counter() - started_at:.2f}s')
+        for case in cases:
+            result = run_isolated(case, data, work_dir / 'scratch' / f'{case}_{n_facts}')
+            report['results'].append(result)
+            if verbose:
+                if result['error']:
+                    print(f"  {case:<30} error: {result['error']}")
+                else:
+                    print(f"  {case:<30} {result['wall_time']:>9.4f}s  rss {result['peak_rss_kb'] / 1024:>8.1f}MiB  "
+                          f"alloc {result['alloc_peak_bytes'] / (1 << 20):>8.1f}MiB")
+    return report
+
+
+def compare(report, baseline, threshold=1.25):
+    """Get the cases whose wall time regressed past `threshold` times the
+    baseline's."""
+    baseline_times = {
+        (result['case'], result['n_facts']): result.get('wall_time')
+        for result in baseline['results']
+        }
+    regressions = []
+    for result in report['results']:
+        before = baseline_times.get((result['case'], result['n_facts']))
+        after = result.get('wall_time')
+        if before and after and after / before > threshold:
+            regressions.append({'case': result['case'], 'n_facts': result['n_facts'], 'before': before, 'after': after, 'ratio': after / before})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='fact counts, e.g. 1000 100000 1000000')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help='cases to run, defaults to all')
+    parser.add_argument('--work-dir', help='directory for generated data, reused across runs')
+    parser.add_argument('--max-workbook-rows', type=int, default=50_000, help='cap on Mapping rows for the spreadsheet cases')
+    parser.add_argument('--output', default='benchmark_results.json', help='json results path')
+    parser.add_argument('--compare', help='baseline json results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.25, help='wall time ratio counted as a regression')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.cases, args.work_dir, args.max_workbook_rows)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f'results written to {args.output}')
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression['case']} at {regression['n_facts']} facts, "
+                  f"{regression['before']:.4f}s -> {regression['after']:.4f}s ({regression['ratio']:.2f}x)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Synthetic taxonomies, instances and workbooks for the benchmarks
+
+The taxonomy and instance builders are shared with the tests, in
+tests/synthetic.py; the workbook is written here.  Output is deterministic
+for a given size.
+
+Usage:
+    data = generate_dataset(work_dir, n_facts=100_000)
+    data['instance'], data['taxonomy'], data['workbook']
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from tests.synthetic import (
+    PREFIX, NAMESPACE, dataset_shape, count_contexts, concept_name, context_id, context_period, context_dims, iter_facts,
+    generate_synthetic_taxonomy, generate_synthetic_instance,
+    )
+
+from pathlib import Path
+
+
+def generate_synthetic_workbook(filepath, instance_name, schema_href, n_rows, n_facts):
+    """Write a workbook in the layout of the instance-doc VBA ports: Setup,
+    Taxonomies, Contexts, Units, Dimensions, Mapping and a Data sheet with
+    one mapped cell per row.  Mapping rows follow the instance's facts."""
+    from openpyxl import Workbook
+
+    shape = dataset_shape(n_facts)
+    wb = Workbook(write_only=True)
+    ws_setup = wb.create_sheet('Setup')
+    ws_setup.append(['Setting', 'Value'])
+    ws_setup.append(['Instance', instance_name])
+    ws_taxonomies = wb.create_sheet('Taxonomies')
+    ws_taxonomies.append(['Prefix', 'Namespace', 'Location', 'SchemaRef', 'SchemaLocation'])
+    ws_taxonomies.append([PREFIX, NAMESPACE, schema_href, 'Yes', 'Yes'])
+    n_contexts = count_contexts(min(n_rows, n_facts), shape['n_concepts'])
+    ws_contexts = wb.create_sheet('Contexts')
+    ws_contexts.append(['ID', 'Entity', 'Scheme', 'Type', 'Start', 'End'])
+    ws_dimensions = wb.create_sheet('Dimensions')
+    ws_dimensions.append(['Context', 'Entity', 'Dimension', 'Member'])
+    for idx in range(n_contexts):
+        start, end = context_period(idx)
+        ws_contexts.append([
+            context_id(idx), '0000000001', 'http://www.sec.gov/CIK',
+            'Instant' if start is None else 'Duration',
+            None if start is None else start.isoformat(), end.isoformat(),
+            ])
+        for dimension, member in context_dims(idx, shape['n_axes'], shape['n_members']).items():
+            ws_dimensions.append([context_id(idx), '0000000001', dimension, member])
+    ws_units = wb.create_sheet('Units')
+    ws_units.append(['ID', 'Measure'])
+    ws_units.append(['USD', 'iso4217:USD'])
+    ws_mapping = wb.create_sheet('Mapping')
+    ws_mapping.append(['Sheet', 'Cell', 'Concept', 'Context', 'Unit', 'Decimals', 'Scale'])
+    ws_data = wb.create_sheet('Data')
+    for idx, (concept_idx, context_idx) in enumerate(iter_facts(min(n_rows, n_facts), shape['n_concepts'])):
+        ws_mapping.append(['Data', f'A{idx + 1}', f'{PREFIX}:{concept_name(concept_idx)}', context_id(context_idx), 'USD', 0, 1])
+        ws_data.append([(idx * 7919) % 1_000_000])
+    wb.save(str(filepath))
+    return Path(filepath)
+
+
+def generate_dataset(work_dir, n_facts, max_workbook_rows=50_000):
+    """Generate (or reuse) the taxonomy, instance and workbook for a size.
+
+    Returns:
+        dict: paths and shape
+    """
+    data_dir = Path(work_dir) / f'facts_{n_facts}'
+    data_dir.mkdir(parents=True, exist_ok=True)
+    taxonomy = data_dir / 'bench.xsd'
+    instance = data_dir / 'bench.xbrl'
+    workbook = data_dir / 'bench.xlsx'
+    shape = dataset_shape(n_facts)
+    if not taxonomy.is_file():
+        generate_synthetic_taxonomy(taxonomy.resolve(), shape['n_concepts'], shape['n_axes'], shape['n_members'])
+    if not instance.is_file():
+        generate_synthetic_instance(instance, taxonomy.name, n_facts, shape['n_axes'], shape['n_members'])
+    n_rows = min(n_facts, max_workbook_rows)
+    if not workbook.is_file():
+        generate_synthetic_workbook(workbook, instance.name, taxonomy.name, n_rows, n_facts)
+    return dict(shape, taxonomy=taxonomy, instance=instance, workbook=workbook, workbook_rows=n_rows)
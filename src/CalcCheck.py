@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+
+CalcCheck Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import DECIMALS_NONE, DECIMALS_INF
+from .Query import csr
+from .Validation import ValidationResult
+
+import numpy as np
+
+from decimal import Decimal, ROUND_HALF_EVEN, localcontext
+
+
+SUMMATION_ITEM = '/summation-item'     #xbrl 2.1 and calculation 1.1 arcroles end with it
+INCONSISTENT = 'calc:inconsistentCalculation'
+
+
+def expand(starts, lengths):
+    """Get (group, position) for every element of the ranges
+    `starts[i]:starts[i] + lengths[i]`, without a python loop."""
+    group = np.repeat(np.arange(len(lengths)), lengths)
+    position = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return group, position
+
+
+def round_to(values, decimals):
+    """Round each value to its decimals (half to even); DECIMALS_INF is
+    exact."""
+    exact = decimals == DECIMALS_INF
+    scale = 10.0 ** np.where(exact, 0, decimals)
+    return np.where(exact, values, np.round(values * scale) / scale)
+
+
+def round_exact(value, decimals):
+    """Round a Decimal to its decimals (half to even), as round_to."""
+    if decimals == DECIMALS_INF:
+        return value
+    return value.quantize(Decimal(1).scaleb(-int(decimals)), rounding=ROUND_HALF_EVEN)
+
+
+class CalcCheck:
+    """Calculation linkbase consistency, for every summation of a
+    TaxonomyIndex in every context of an instance.
+
+    The calculation network is compiled once into a sparse weight matrix:
+    one row per summation (total concept in an extended link role), in CSR
+    form over its (item concept, weight) columns.  A check binds the
+    matrix to a FactStore with array lookups: each total fact is paired
+    with its summations, each pair expanded to the summation's items, and
+    the items' facts found by (concept, context, unit) with a searchsorted.
+    Weighted sums are one np.bincount, so a check costs a few passes over
+    the facts, whatever the number of contexts.
+
+    Rounding follows calculations 1.1 (round-to-nearest): the total and its
+    items are rounded to the lowest decimals among them, and the sum of the
+    weighted, rounded items must equal the rounded total.
+
+    Note:
+        * only numeric, non-nil facts bind; a summation is checked in a
+        context and unit when its total and at least one item are reported
+        * of duplicate facts, the most precise is used
+        * summations with a fact at or beyond FactStore.EXACT_LIMIT (2**53)
+        are rechecked on the exact Decimal values; 'reported' and
+        'computed' stay float64
+        * facts without decimals are treated as exact
+        * concepts are matched by 'prefix:Name', as in the Renderer
+
+    Usage:
+        check = CalcCheck(taxonomy.get_index())
+        result = check.validate(table.get_fact_store(), entrypoint=table.filepath)
+        summations = check.check(store)
+        summations['consistent'].all()
+    """
+
+    def __init__(self, index):
+        self.index = index
+        network = index.networks.get('calculation')
+        if network is None:
+            network = {field: np.empty(0, dtype=np.int32) for field in ('parent', 'child', 'role', 'arcrole')}
+            network['weight'] = np.empty(0, dtype=np.float32)
+        arcroles = np.array([index.roles[idx].endswith(SUMMATION_ITEM) for idx in range(len(index.roles))], dtype=bool)
+        edges = np.flatnonzero(arcroles[network['arcrole']]) if len(arcroles) else np.empty(0, dtype=np.int64)
+        #edges are sorted by (parent, role, order), so each summation is a run
+        parent, role = network['parent'][edges], network['role'][edges]
+        starts = np.flatnonzero(np.concatenate(([True], (parent[1:] != parent[:-1]) | (role[1:] != role[:-1])))) if len(edges) else np.empty(0, dtype=np.int64)
+        self.sum_concept = parent[starts]
+        self.sum_role = role[starts]
+        self.indptr = np.concatenate((starts, [len(edges)])).astype(np.int64)
+        self.item_concept = network['child'][edges]
+        self.weight = network['weight'][edges].astype(np.float64)
+
+    def __repr__(self):
+        return f'CalcCheck(summations={len(self.sum_concept)}, items={len(self.item_concept)})'
+
+    def __len__(self):
+        return len(self.sum_concept)
+
+    # CHECK
+
+    def check(self, store):
+        """Check every summation bound in a FactStore.
+
+        Returns:
+            dict: numpy columns, one row per checked (summation, context,
+            unit) - 'concept', 'role' (ids into the index's `concepts` and
+            `roles`), 'row' (the total's fact row), 'context', 'unit' (as in
+            the store), 'items' (items reported), 'decimals', 'reported',
+            'computed' and 'consistent'
+        """
+        store = store.freeze()
+        concept_map = store.ids(self.index.concepts.strings) if len(self.index.concepts) else np.empty(0, dtype=np.int32)
+        #bind numeric facts by (context, unit); keep the most precise of duplicates
+        rows = np.flatnonzero(~np.isnan(store.value) & (store.unit >= 0))
+        decimals = store.decimals[rows].astype(np.int64)
+        decimals[decimals == DECIMALS_NONE] = DECIMALS_INF
+        binding = np.unique(store.context[rows].astype(np.int64) * len(store.names) + store.unit[rows], return_inverse=True)[1]
+        n_bindings = int(binding.max()) + 1 if len(binding) else 0
+        fact_key = store.concept[rows].astype(np.int64) * n_bindings + binding
+        ordering = np.lexsort((-decimals, fact_key))
+        fact_key, first = np.unique(fact_key[ordering], return_index=True)
+        rows, decimals, binding = rows[ordering][first], decimals[ordering][first], binding[ordering][first]
+        concepts = store.concept[rows]
+        #pair each total fact with its summations
+        sum_store_concept = concept_map[self.sum_concept] if len(self.sum_concept) else np.empty(0, dtype=np.int32)
+        by_concept, concept_indptr = csr(concepts, len(store.names))
+        summations = np.flatnonzero(sum_store_concept >= 0)
+        concept_starts = concept_indptr[sum_store_concept[summations]]
+        pair_sum, position = expand(concept_starts, concept_indptr[sum_store_concept[summations] + 1] - concept_starts)
+        pair_sum = summations[pair_sum]
+        pair_fact = by_concept[position]
+        #expand each pair to its summation's items, and look up their facts
+        item_pair, item_edge = expand(self.indptr[pair_sum], np.diff(self.indptr)[pair_sum])
+        item_store_concept = concept_map[self.item_concept[item_edge]] if len(item_edge) else np.empty(0, dtype=np.int32)
+        wanted = item_store_concept.astype(np.int64) * n_bindings + binding[pair_fact[item_pair]]
+        found = np.minimum(np.searchsorted(fact_key, wanted), max(len(fact_key) - 1, 0))
+        bound = (item_store_concept >= 0) & (fact_key[found] == wanted) if len(fact_key) else np.zeros(len(wanted), dtype=bool)
+        item_pair, item_edge, item_fact = item_pair[bound], item_edge[bound], found[bound]
+        n_pairs = len(pair_sum)
+        items = np.bincount(item_pair, minlength=n_pairs)
+        pair_decimals = decimals[pair_fact].copy()
+        np.minimum.at(pair_decimals, item_pair, decimals[item_fact])
+        item_values = round_to(store.value[rows[item_fact]], pair_decimals[item_pair]) * self.weight[item_edge]
+        computed = round_to(np.bincount(item_pair, weights=item_values, minlength=n_pairs), pair_decimals)
+        reported = round_to(store.value[rows[pair_fact]], pair_decimals)
+        checked = items > 0
+        consistent = np.isclose(reported, computed, rtol=1e-12, atol=0)
+        #float64 is not exact beyond 2**53: recheck those pairs on the lexical values
+        exact = store.text[rows] >= 0
+        pair_exact = exact[pair_fact].copy()
+        np.logical_or.at(pair_exact, item_pair, exact[item_fact])
+        for pair in np.flatnonzero(pair_exact & checked).tolist():
+            consistent[pair] = self.check_exact(store, rows, pair_fact[pair], item_fact[item_pair == pair], item_edge[item_pair == pair], pair_decimals[pair])
+        fact_rows = rows[pair_fact[checked]]
+        return {
+            'concept': self.sum_concept[pair_sum[checked]],
+            'role': self.sum_role[pair_sum[checked]],
+            'row': fact_rows,
+            'context': store.context[fact_rows],
+            'unit': store.unit[fact_rows],
+            'items': items[checked],
+            'decimals': pair_decimals[checked],
+            'reported': reported[checked],
+            'computed': computed[checked],
+            'consistent': consistent[checked],
+            }
+
+    def check_exact(self, store, rows, total, items, edges, decimals):
+        """Check one summation on the facts' exact Decimal values."""
+        with localcontext() as context:
+            context.prec = 64
+            computed = sum(
+                round_exact(store.exact_value(rows[item]), decimals) * Decimal(repr(float(self.weight[edge])))
+                for item, edge in zip(items.tolist(), edges.tolist())
+                )
+            return round_exact(computed, decimals) == round_exact(store.exact_value(rows[total]), decimals)
+
+    def inconsistencies(self, store):
+        """Get a message for each inconsistent summation, in the form of
+        ValidationResult messages."""
+        store = store.freeze()
+        result = self.check(store)
+        messages = []
+        for idx in np.flatnonzero(~result['consistent']).tolist():
+            concept = self.index.concepts[result['concept'][idx]]
+            role = self.index.roles[result['role'][idx]]
+            context = store.context_ids[result['context'][idx]]
+            messages.append({
+                'code': INCONSISTENT,
+                'level': 'ERROR',
+                'message': (
+                    f"{concept} does not foot in context {context}!  Reported total = {result['reported'][idx]:,}, "
+                    f"whereas the sum of its {result['items'][idx]} items is {result['computed'][idx]:,} ({role})."
+                    ),
+                'document': store.filings[store.ctx_filing[result['context'][idx]]] if store.filings else '',
+            })
+        return messages
+
+    def validate(self, store, entrypoint=None):
+        """Get the inconsistencies as a ValidationResult, to report or
+        aggregate alongside arelle's."""
+        store = store.freeze()
+        entrypoint = entrypoint or (store.filings[0] if store.filings else '')
+        return ValidationResult(entrypoint, self.inconsistencies(store))
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+
+DtsCache Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .InstanceReader import InstanceReader
+
+from lxml import etree
+from pathlib import Path
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+
+def hash_file(filepath, chunk_size=1 << 20):
+    """Get the sha256 hex digest of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DtsCache:
+    """Cache of discovered DTS (ModelXbrl) keyed by entry-point url and
+    content hash, with a taxonomy tier shared by the instances that
+    reference one taxonomy.
+
+    There are three tiers:
+    * memory: live ModelXbrl objects in least-recently-used order, bounded
+    by `max_entries`
+    * disk: a json manifest per key under `cache_dir`, bounded by
+    `max_disk_entries`, recording every local DTS document with its size,
+    mtime and content hash
+    * taxonomy: a manifest of the DTS without its instance document, keyed
+    by the instance's schemaRefs and linkbaseRefs and their content hashes
+    (see taxonomy_key), so every instance against one taxonomy (e.g. a
+    us-gaap release) shares it, and the artifacts derived from it
+
+    Note:
+        * arelle discovers a DTS into one ModelXbrl per entry point, tied to
+        its lxml trees, which can neither be pickled nor shared between
+        instances: the memory tier avoids discovery only for the same entry
+        point, and a new process always rediscovers.  What the taxonomy
+        tier shares across instances is the work derived from a discovered
+        taxonomy: its TaxonomyIndex (see artifact_path) and its documents'
+        validation results (see ValidationCache)
+        * an entry is invalidated when the entry point, or any local document
+        in its DTS, changes content.  Files are hashed once per content:
+        hashes are kept by path, and only recomputed when size or mtime
+        changed (see hash).
+        * a cached model is shared by every Table handed it; a Table that
+        mutates its model must `release` it first, and take a private copy
+        if others still share it (see Table.detach_xbrl_model)
+        * evicted models are not closed, because a Table may still hold them.
+
+    Usage:
+        cache = DtsCache(working_dir / 'cache' / 'dts')
+        xbrl_model = cache.get(filepath)
+        if xbrl_model is None:
+            xbrl_model = ...  #load with arelle
+            cache.put(filepath, xbrl_model)
+        index_path = cache.artifact_path(cache.taxonomy_key(filepath), 'taxonomy.npz')
+    """
+
+    def __init__(self, cache_dir, max_entries=8, max_disk_entries=256):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._models = OrderedDict()
+        self._shares = {}   #id(model) -> number of Tables handed the model
+        self._hashes = {}   #filepath -> (size, mtime_ns, sha256)
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0, 'hashed': 0}
+
+    def __repr__(self):
+        return f'DtsCache(entries={len(self._models)}, stats={self.stats})'
+
+    def __len__(self):
+        return len(self._models)
+
+    # KEYS
+
+    def hash(self, filepath):
+        """Get a file's content hash, re-hashed only when its size or mtime
+        changed since it was last hashed."""
+        filepath = str(filepath)
+        stat = os.stat(filepath)
+        cached = self._hashes.get(filepath)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        content_hash = hash_file(filepath)
+        self._hashes[filepath] = (stat.st_size, stat.st_mtime_ns, content_hash)
+        self.stats['hashed'] += 1
+        return content_hash
+
+    def make_key(self, filepath):
+        """Get the cache key for an entry point: the hash of its url plus
+        its content hash."""
+        filepath = Path(filepath)
+        url = str(filepath.resolve())
+        return hashlib.sha256(f'{url}\0{self.hash(filepath)}'.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def taxonomy_refs(filepath):
+        """Get an instance's schemaRefs and linkbaseRefs, or None if the
+        entry point is not an instance."""
+        try:
+            sniffed = InstanceReader(filepath).sniff()
+        except etree.XMLSyntaxError:
+            return None
+        if sniffed['root'] != 'xbrl':
+            return None
+        return sniffed['schema_refs'] + sniffed['linkbase_refs']
+
+    def taxonomy_key(self, filepath):
+        """Get the taxonomy key of an entry point: the hash of the
+        schemaRefs and linkbaseRefs of an instance (the entry point itself,
+        for a schema), each with its content hash.  Remote references are
+        keyed by url, as published taxonomies are not edited in place."""
+        filepath = Path(filepath)
+        hrefs = self.taxonomy_refs(filepath)
+        if hrefs is None:
+            hrefs = [filepath.name]
+        digest = hashlib.sha256()
+        for href in sorted(hrefs):
+            if '://' in href:
+                digest.update(f'{href}\n'.encode('utf-8'))
+                continue
+            path = (filepath.parent / href.split('#')[0]).resolve()
+            content_hash = self.hash(path) if path.is_file() else ''
+            digest.update(f'{path}\0{content_hash}\n'.encode('utf-8'))
+        return 'taxonomy-' + digest.hexdigest()
+
+    def manifest_path(self, key):
+        return self.cache_dir / f'{key}.json'
+
+    def artifact_path(self, key, name):
+        """Get the path of a file derived from the key's DTS, e.g.
+        'taxonomy.npz'; it is only valid while `is_current(key)`."""
+        return self.cache_dir / f'{key}.{name}'
+
+    def remove_files(self, key):
+        """Remove a key's manifest and artifacts."""
+        for path in self.cache_dir.glob(f'{key}.*'):
+            path.unlink(missing_ok=True)
+
+    # GETTERS
+
+    def get(self, filepath):
+        """Get the cached ModelXbrl for an entry point, or None if it is
+        missing or any of its DTS documents changed."""
+        key = self.make_key(filepath)
+        xbrl_model = self._models.get(key)
+        if xbrl_model is None:
+            self.stats['misses'] += 1
+            return None
+        if not self.is_current(key):
+            self.invalidate(key)
+            self.stats['misses'] += 1
+            return None
+        self._models.move_to_end(key)
+        self._shares[id(xbrl_model)] = self._shares.get(id(xbrl_model), 0) + 1
+        self.stats['hits'] += 1
+        return xbrl_model
+
+    def holds(self, xbrl_model):
+        """Check whether a ModelXbrl is held in the memory tier."""
+        return any(model is xbrl_model for model in self._models.values())
+
+    def get_manifest(self, filepath, key=None):
+        """Get the persisted DTS manifest for an entry point (or for a key,
+        e.g. a taxonomy_key), or None."""
+        manifest_path = self.manifest_path(key or self.make_key(filepath))
+        if not manifest_path.is_file():
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def is_current(self, key):
+        """Check that every local document in the key's manifest is unchanged."""
+        manifest = self.get_manifest(None, key=key)
+        if manifest is None:
+            return False
+        for doc in manifest['documents']:
+            try:
+                stat = os.stat(doc['filepath'])
+            except OSError:
+                return False
+            if stat.st_size == doc['size'] and stat.st_mtime_ns == doc['mtime_ns']:
+                continue
+            if self.hash(doc['filepath']) != doc['sha256']:
+                return False
+        return True
+
+    # SETTERS
+
+    def put(self, filepath, xbrl_model):
+        """Add a loaded ModelXbrl and persist its DTS manifest, and the
+        manifest of its taxonomy."""
+        key = self.make_key(filepath)
+        entrypoint = str(Path(filepath).resolve())
+        documents = []
+        for doc in xbrl_model.urlDocs.values():
+            doc_path = getattr(doc, 'filepath', None)
+            if not doc_path or not os.path.isfile(doc_path):
+                continue
+            content_hash = self.hash(doc_path)
+            size, mtime_ns, _ = self._hashes[str(doc_path)]
+            documents.append({
+                'uri': doc.uri,
+                'filepath': doc_path,
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'sha256': content_hash,
+            })
+        documents.sort(key=lambda doc: doc['uri'])
+        taxonomy_key = self.taxonomy_key(filepath)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.write_manifest(key, {'entrypoint': entrypoint, 'key': key, 'taxonomy_key': taxonomy_key, 'documents': documents})
+        taxonomy_documents = documents
+        if self.taxonomy_refs(filepath) is not None:
+            taxonomy_documents = [doc for doc in documents if os.path.normpath(doc['filepath']) != os.path.normpath(entrypoint)]
+        if not self.is_current(taxonomy_key):
+            #a taxonomy document changed: its artifacts are stale
+            self.remove_files(taxonomy_key)
+            self.write_manifest(taxonomy_key, {'entrypoint': None, 'key': taxonomy_key, 'documents': taxonomy_documents})
+        self._models[key] = xbrl_model
+        self._models.move_to_end(key)
+        self._shares[id(xbrl_model)] = 1
+        self.evict()
+        return key
+
+    def write_manifest(self, key, manifest):
+        manifest_path = self.manifest_path(key)
+        temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    def release(self, xbrl_model):
+        """Give up a Table's share of a model, before the Table mutates or
+        closes it.  The model leaves the memory tier, so later loads
+        rediscover the DTS rather than get the mutated model; the manifest
+        is kept, since the files are unchanged.
+
+        Returns:
+            bool: True if other Tables still share the model
+        """
+        for key in [key for key, model in self._models.items() if model is xbrl_model]:
+            del self._models[key]
+        shares = self._shares.pop(id(xbrl_model), 0)
+        if shares > 1:
+            self._shares[id(xbrl_model)] = shares - 1
+            return True
+        return False
+
+    def invalidate(self, key):
+        """Remove a key from both tiers."""
+        self.stats['invalidations'] += 1
+        self._models.pop(key, None)
+        self.remove_files(key)
+
+    def evict(self):
+        """Enforce the size bounds: least-recently-used models first, then
+        the oldest manifests on disk."""
+        while len(self._models) > self.max_entries:
+            self._models.popitem(last=False)
+            self.stats['evictions'] += 1
+        if self.cache_dir.is_dir():
+            manifests = sorted(self.cache_dir.glob('*.json'), key=lambda p: p.stat().st_mtime_ns)
+            for manifest_path in manifests[:max(0, len(manifests) - self.max_disk_entries)]:
+                self.remove_files(manifest_path.stem)
+
+    def clear(self):
+        """Remove all entries from both tiers."""
+        self._models.clear()
+        self._shares.clear()
+        if self.cache_dir.is_dir():
+            for manifest_path in self.cache_dir.glob('*.json'):
+                self.remove_files(manifest_path.stem)
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+
+FactStore Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .Interning import unit_measure
+
+import numpy as np
+
+from array import array
+from decimal import Decimal
+
+
+DECIMALS_INF = np.iinfo(np.int16).max
+DECIMALS_NONE = np.iinfo(np.int16).min
+EXACT_LIMIT = 2 ** 53     #float64 holds every integer below it exactly
+
+
+class Vocabulary:
+    """Two-way mapping of symbol strings (concepts, units, entities,
+    dimensions, members) to int32 ids."""
+
+    def __init__(self, strings=()):
+        self.strings = []
+        self.index = {}
+        for string in strings:
+            self.add(string)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getitem__(self, idx):
+        return self.strings[idx]
+
+    def add(self, string):
+        idx = self.index.get(string)
+        if idx is None:
+            idx = len(self.strings)
+            self.index[string] = idx
+            self.strings.append(string)
+        return idx
+
+    def get(self, string, default=-1):
+        return self.index.get(string, default)
+
+
+class StringPool:
+    """Arrow-style pool of fact text values: one utf-8 buffer plus int64
+    offsets.  Duplicate strings are stored once while building; `freeze()`
+    drops the python strings."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('q', [0])
+        self._index = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        return bytes(self.data[self.offsets[idx]:self.offsets[idx + 1]]).decode('utf-8')
+
+    def add(self, string):
+        idx = self._index.get(string) if self._index is not None else None
+        if idx is None:
+            idx = len(self)
+            self.data += string.encode('utf-8')
+            self.offsets.append(len(self.data))
+            if self._index is not None:
+                self._index[string] = idx
+        return idx
+
+    def freeze(self):
+        self.data = bytes(self.data)
+        self.offsets = np.frombuffer(self.offsets, dtype=np.int64).copy()
+        self._index = None
+        return self
+
+    @property
+    def nbytes(self):
+        return len(self.data) + len(self.offsets) * 8
+
+
+class FactStore:
+    """Columnar fact table, built once per instance so the arelle model can
+    be dropped.
+
+    Fact columns (numpy, one row per fact):
+    * concept (int32) - id into `names`
+    * context (int32) - row of the context table
+    * unit (int32) - id into `names`, -1 if not numeric
+    * measure (int32) - id into `names` of the unit's canonical measures
+    (e.g. 'USD / shares', see Interning.unit_measure), -1 if not numeric or
+    the unit is not declared
+    * decimals (int16) - DECIMALS_INF for INF, DECIMALS_NONE if absent
+    * value (float64) - numeric value, NaN if not numeric or nil; exact
+    for integers below EXACT_LIMIT (2**53) only
+    * text (int32) - id into the `texts` StringPool, -1 if nil or numeric;
+    numeric facts at or beyond EXACT_LIMIT keep their lexical value here
+    too (see `exact_value`)
+
+    Context table (one row per context):
+    * context_ids (list of str), ctx_filing (int32), ctx_entity (int32, id
+    into `names` of 'scheme|identifier'), ctx_start and ctx_end
+    (datetime64[D], NaT for an instant's start), ctx_instant (bool), ctx_key
+    (uint64, the Interner's stable context hash, 0 if not interned)
+    * dimensions in long form: dim_context, dim_dimension, dim_member (int32)
+
+    Usage:
+        store = table.get_facts(columnar=True)
+        revenue = store.select(store.mask(concept='us-gaap:Revenues'))
+        totals = store.aggregate(by='concept')
+        rows, cols, matrix = store.pivot(index='concept', columns='context')
+    """
+
+    columns = ['concept', 'context', 'unit', 'measure', 'decimals', 'value', 'text']
+
+    def __init__(self, filing=None):
+        self.names = Vocabulary()
+        self.texts = StringPool()
+        self.filings = [] if filing is None else [str(filing)]
+        self.context_ids = []
+        self.context_index = {}
+        self.unit_index = {}    #(filing, unit id) -> measure name id
+        self.frozen = False
+        #builders, replaced by numpy arrays in freeze()
+        self.concept = array('i')
+        self.context = array('i')
+        self.unit = array('i')
+        self.measure = array('i')
+        self.decimals = array('h')
+        self.value = array('d')
+        self.text = array('i')
+        self.filing = array('i')
+        self.ctx_filing = array('i')
+        self.ctx_entity = array('i')
+        self.ctx_start = []
+        self.ctx_end = []
+        self.ctx_instant = array('b')
+        self.ctx_key = array('Q')
+        self.dim_context = array('i')
+        self.dim_dimension = array('i')
+        self.dim_member = array('i')
+
+    def __repr__(self):
+        return f'FactStore(facts={len(self)}, contexts={len(self.context_ids)}, filings={len(self.filings)})'
+
+    def __len__(self):
+        return len(self.concept)
+
+    # BUILD
+
+    @classmethod
+    def from_summary(cls, summary):
+        """Build from a Table.get_summary() dict."""
+        store = cls(filing=summary.get('path'))
+        for context_id, context in summary['contexts'].items():
+            store.add_context(context_id, **context)
+        for unit_id, measure in summary.get('units', {}).items():
+            store.add_unit(unit_id, measure)
+        for fact in summary['facts']:
+            store.add_fact(*fact)
+        return store.freeze()
+
+    def context_row(self, context_id, filing=0):
+        """Get (or reserve) the context table row for a context id, so facts
+        may precede their context."""
+        key = (filing, context_id)
+        row = self.context_index.get(key)
+        if row is None:
+            row = len(self.context_ids)
+            self.context_index[key] = row
+            self.context_ids.append(context_id)
+            self.ctx_filing.append(filing)
+            self.ctx_entity.append(-1)
+            self.ctx_start.append(None)
+            self.ctx_end.append(None)
+            self.ctx_instant.append(0)
+            self.ctx_key.append(0)
+        return row
+
+    def add_context(self, context_id, entity=None, start=None, end=None, instant=False, dims=None, filing=0, key=0):
+        """Add a context: entity (scheme, identifier), period start/end as
+        iso dates (an instant has only `end`), dims {dimension: member}, and
+        the interned context hash `key`, if any."""
+        row = self.context_row(context_id, filing)
+        if entity is not None:
+            self.ctx_entity[row] = self.names.add('|'.join(entity))
+        self.ctx_start[row] = start
+        self.ctx_end[row] = end
+        self.ctx_instant[row] = int(bool(instant))
+        self.ctx_key[row] = key
+        for dimension, member in (dims or {}).items():
+            self.dim_context.append(row)
+            self.dim_dimension.append(self.names.add(dimension))
+            self.dim_member.append(self.names.add(member))
+        return row
+
+    def add_unit(self, unit_id, measure, filing=0):
+        """Add a unit: its measures as a string, e.g. 'USD' or 'USD /
+        shares'."""
+        self.unit_index[(filing, unit_id)] = self.names.add(unit_measure(measure))
+
+    def add_fact(self, concept, context_id, unit_id=None, decimals=None, value=None, filing=0):
+        """Add a fact from its lexical values."""
+        self.concept.append(self.names.add(concept))
+        self.context.append(self.context_row(context_id, filing))
+        self.unit.append(-1 if unit_id is None else self.names.add(unit_id))
+        if decimals is None:
+            self.decimals.append(DECIMALS_NONE)
+        elif decimals == 'INF':
+            self.decimals.append(DECIMALS_INF)
+        else:
+            self.decimals.append(int(decimals))
+        number = np.nan
+        if unit_id is not None and value is not None:
+            try:
+                number = float(value)
+            except ValueError:
+                pass
+        self.value.append(number)
+        if value is None or (number == number and abs(number) < EXACT_LIMIT):
+            self.text.append(-1)
+        else:
+            self.text.append(self.texts.add(value))
+        self.filing.append(filing)
+
+    def freeze(self):
+        """Convert the builders to numpy arrays; the store is read-only after."""
+        if self.frozen:
+            return self
+        self.concept = np.frombuffer(self.concept, dtype=np.int32).copy()
+        self.context = np.frombuffer(self.context, dtype=np.int32).copy()
+        self.unit = np.frombuffer(self.unit, dtype=np.int32).copy()
+        self.decimals = np.frombuffer(self.decimals, dtype=np.int16).copy()
+        self.value = np.frombuffer(self.value, dtype=np.float64).copy()
+        self.text = np.frombuffer(self.text, dtype=np.int32).copy()
+        self.filing = np.frombuffer(self.filing, dtype=np.int32).copy()
+        #units may follow their facts, so measures are resolved once here
+        self.measure = np.full(len(self.unit), -1, dtype=np.int32)
+        numeric = np.flatnonzero(self.unit >= 0)
+        pairs, inverse = np.unique(np.stack((self.filing[numeric], self.unit[numeric]), axis=1), axis=0, return_inverse=True)
+        measures = np.array([self.unit_index.get((int(filing), self.names[unit]), -1) for filing, unit in pairs.tolist()], dtype=np.int32)
+        self.measure[numeric] = measures[inverse.reshape(-1)] if len(pairs) else -1
+        self.ctx_filing = np.frombuffer(self.ctx_filing, dtype=np.int32).copy()
+        self.ctx_entity = np.frombuffer(self.ctx_entity, dtype=np.int32).copy()
+        self.ctx_start = np.array([d[:10] if d else 'NaT' for d in self.ctx_start], dtype='datetime64[D]')
+        self.ctx_end = np.array([d[:10] if d else 'NaT' for d in self.ctx_end], dtype='datetime64[D]')
+        self.ctx_instant = np.frombuffer(self.ctx_instant, dtype=np.int8).astype(bool)
+        self.ctx_key = np.frombuffer(self.ctx_key, dtype=np.uint64).copy()
+        self.dim_context = np.frombuffer(self.dim_context, dtype=np.int32).copy()
+        self.dim_dimension = np.frombuffer(self.dim_dimension, dtype=np.int32).copy()
+        self.dim_member = np.frombuffer(self.dim_member, dtype=np.int32).copy()
+        self.texts.freeze()
+        self.frozen = True
+        return self
+
+    @classmethod
+    def concat(cls, stores):
+        """Combine frozen stores, e.g. one per filing, into one store with
+        shared names; each input's filings keep their own contexts."""
+        combined = cls()
+        concepts, contexts, units, measures, decimals, values, texts, filings = [], [], [], [], [], [], [], []
+        ctx_filing, ctx_entity, ctx_start, ctx_end, ctx_instant, ctx_key = [], [], [], [], [], []
+        dim_context, dim_dimension, dim_member = [], [], []
+        for store in stores:
+            store.freeze()
+            name_map = np.array([combined.names.add(name) for name in store.names.strings] + [-1], dtype=np.int32)
+            text_map = np.array([combined.texts.add(store.texts[idx]) for idx in range(len(store.texts))] + [-1], dtype=np.int32)
+            filing_offset = len(combined.filings)
+            context_offset = len(combined.context_ids)
+            combined.filings.extend(store.filings or [None])
+            for row, context_id in enumerate(store.context_ids):
+                combined.context_index[(int(store.ctx_filing[row]) + filing_offset, context_id)] = context_offset + row
+            for (filing, unit_id), measure in store.unit_index.items():
+                combined.unit_index[(filing + filing_offset, unit_id)] = int(name_map[measure])
+            combined.context_ids.extend(store.context_ids)
+            concepts.append(name_map[store.concept])
+            contexts.append(store.context + context_offset)
+            units.append(name_map[store.unit])
+            measures.append(name_map[store.measure])
+            decimals.append(store.decimals)
+            values.append(store.value)
+            texts.append(text_map[store.text])
+            filings.append(store.filing + filing_offset)
+            ctx_filing.append(store.ctx_filing + filing_offset)
+            ctx_entity.append(name_map[store.ctx_entity])
+            ctx_start.append(store.ctx_start)
+            ctx_end.append(store.ctx_end)
+            ctx_instant.append(store.ctx_instant)
+            ctx_key.append(store.ctx_key)
+            dim_context.append(store.dim_context + context_offset)
+            dim_dimension.append(name_map[store.dim_dimension])
+            dim_member.append(name_map[store.dim_member])
+        combined.texts.freeze()
+
+        def join(parts, dtype):
+            return np.concatenate(parts).astype(dtype, copy=False) if parts else np.empty(0, dtype=dtype)
+        combined.concept = join(concepts, np.int32)
+        combined.context = join(contexts, np.int32)
+        combined.unit = join(units, np.int32)
+        combined.measure = join(measures, np.int32)
+        combined.decimals = join(decimals, np.int16)
+        combined.value = join(values, np.float64)
+        combined.text = join(texts, np.int32)
+        combined.filing = join(filings, np.int32)
+        combined.ctx_filing = join(ctx_filing, np.int32)
+        combined.ctx_entity = join(ctx_entity, np.int32)
+        combined.ctx_start = join(ctx_start, 'datetime64[D]')
+        combined.ctx_end = join(ctx_end, 'datetime64[D]')
+        combined.ctx_instant = join(ctx_instant, bool)
+        combined.ctx_key = join(ctx_key, np.uint64)
+        combined.dim_context = join(dim_context, np.int32)
+        combined.dim_dimension = join(dim_dimension, np.int32)
+        combined.dim_member = join(dim_member, np.int32)
+        combined.frozen = True
+        return combined
+
+    # QUERY
+
+    def exact_value(self, row):
+        """Get a numeric fact's value as a Decimal: its lexical value if
+        float64 is not exact for it, else its float value."""
+        if self.text[row] >= 0:
+            return Decimal(self.texts[self.text[row]].strip())
+        return Decimal(repr(float(self.value[row])))
+
+    def ids(self, names):
+        """Get the name ids for a name or list of names (-1 if unknown)."""
+        if isinstance(names, str):
+            names = [names]
+        return np.array([self.names.get(name) for name in names], dtype=np.int32)
+
+    def mask(self, concept=None, unit=None, context=None, filing=None, numeric=None):
+        """Get a boolean fact mask; each argument may be a value or a list."""
+        mask = np.ones(len(self), dtype=bool)
+        if concept is not None:
+            mask &= np.isin(self.concept, self.ids(concept))
+        if unit is not None:
+            mask &= np.isin(self.unit, self.ids(unit))
+        if context is not None:
+            context = {context} if isinstance(context, str) else set(context)
+            rows = [row for row, context_id in enumerate(self.context_ids) if context_id in context]
+            mask &= np.isin(self.context, np.array(rows, dtype=np.int32))
+        if filing is not None:
+            mask &= np.isin(self.filing, np.atleast_1d(filing))
+        if numeric is not None:
+            mask &= ~np.isnan(self.value) == numeric
+        return mask
+
+    def select(self, mask):
+        """Get a store of the facts in `mask`, sharing names, texts and the
+        context table."""
+        subset = FactStore.__new__(FactStore)
+        subset.__dict__.update(self.__dict__)
+        for column in FactStore.columns + ['filing']:
+            setattr(subset, column, getattr(self, column)[mask])
+        return subset
+
+    def labels(self, key):
+        """Get the per-fact integer keys and a function naming them, for
+        `key` in concept, unit, context, entity, filing."""
+        match key:
+            case 'concept' | 'unit':
+                return getattr(self, key), lambda idx: self.names[idx] if idx >= 0 else None
+            case 'context':
+                return self.context, lambda idx: self.context_ids[idx]
+            case 'entity':
+                return self.ctx_entity[self.context], lambda idx: self.names[idx] if idx >= 0 else None
+            case 'filing':
+                return self.filing, lambda idx: self.filings[idx]
+            case _:
+                raise ValueError(f'unknown key: {key}')
+
+    def aggregate(self, by='concept', func='sum'):
+        """Aggregate numeric values by a key, vectorized with bincount.
+
+        Returns:
+            dict: {label: value}, for func in sum, count, mean
+        """
+        keys, name = self.labels(by)
+        numeric = ~np.isnan(self.value)
+        keys = keys[numeric]
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(uniques))
+        match func:
+            case 'sum':
+                result = np.bincount(inverse, weights=self.value[numeric], minlength=len(uniques))
+            case 'count':
+                result = counts
+            case 'mean':
+                result = np.bincount(inverse, weights=self.value[numeric], minlength=len(uniques)) / counts
+            case _:
+                raise ValueError(f'unknown func: {func}')
+        return {name(int(key)): result[idx].item() for idx, key in enumerate(uniques)}
+
+    def pivot(self, index='concept', columns='context'):
+        """Pivot numeric values into a matrix; duplicates are summed and
+        missing cells are NaN.
+
+        Returns:
+            tuple: (row labels, column labels, 2-d float64 array)
+        """
+        row_keys, row_name = self.labels(index)
+        col_keys, col_name = self.labels(columns)
+        numeric = ~np.isnan(self.value)
+        row_uniques, row_inverse = np.unique(row_keys[numeric], return_inverse=True)
+        col_uniques, col_inverse = np.unique(col_keys[numeric], return_inverse=True)
+        matrix = np.full((len(row_uniques), len(col_uniques)), np.nan)
+        flat = row_inverse * len(col_uniques) + col_inverse
+        sums = np.bincount(flat, weights=self.value[numeric], minlength=matrix.size)
+        present = np.bincount(flat, minlength=matrix.size) > 0
+        matrix.flat[present] = sums[present]
+        return [row_name(int(k)) for k in row_uniques], [col_name(int(k)) for k in col_uniques], matrix
+
+    def to_records(self, mask=None):
+        """Get facts as (concept, context_id, unit_id, decimals, value) tuples,
+        the form of Table.get_summary()['facts']."""
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        records = []
+        for row in rows:
+            unit = self.unit[row]
+            decimals = self.decimals[row]
+            if decimals == DECIMALS_NONE:
+                decimals = None
+            elif decimals == DECIMALS_INF:
+                decimals = 'INF'
+            else:
+                decimals = str(decimals)
+            if self.text[row] >= 0:
+                value = self.texts[self.text[row]]
+            elif np.isnan(self.value[row]):
+                value = None
+            else:
+                value = self.value[row].item()
+            records.append((
+                self.names[self.concept[row]],
+                self.context_ids[self.context[row]],
+                self.names[unit] if unit >= 0 else None,
+                decimals,
+                value,
+            ))
+        return records
+
+    @property
+    def nbytes(self):
+        """Approximate resident bytes of the columns, context table and texts."""
+        arrays = [getattr(self, column) for column in FactStore.columns + ['filing']]
+        arrays += [self.ctx_filing, self.ctx_entity, self.ctx_start, self.ctx_end, self.ctx_instant, self.ctx_key,
+                   self.dim_context, self.dim_dimension, self.dim_member]
+        return sum(a.nbytes for a in arrays) + self.texts.nbytes
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+
+FactWriter Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from arelle import XmlUtil, XmlValidate, XbrlConst
+from arelle.ModelValue import qname
+
+import datetime
+import itertools
+
+
+FACT_FIELDS = ('concept', 'entity', 'period', 'dims', 'unit', 'decimals', 'value')
+FACT_CACHES = ('_factsByQname', '_nonNilFactsInInstance', '_factsByDatatype', '_factsByPeriodType', '_factsByDimQname')
+
+
+def as_date(value):
+    """Get a 'yyyy-mm-dd' string of a date or string."""
+    return value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else str(value)
+
+
+class FactWriter:
+    """Bulk fact writer for an instance's ModelXbrl, used by
+    `Table.add_facts`.
+
+    Contexts and units are deduplicated through hash maps keyed by
+    (entity, period, dims) and measures, seeded with the instance's own,
+    so each distinct one is created once; instance contexts with a
+    scenario, typed dims or other segment content are not reused.  Facts
+    are appended in batches, and arelle's cached fact indexes are reset
+    once per batch, rather than per fact as with `createFact`.
+
+    Usage:
+        writer = FactWriter(xbrl_model)
+        writer.add(facts)
+        writer.stats
+    """
+
+    def __init__(self, xbrl_model, scheme='http://www.sec.gov/CIK', validate=True):
+        self.xbrl_model = xbrl_model
+        self.document = xbrl_model.modelDocument
+        self.root = self.document.xmlRootElement
+        self.scheme = scheme
+        self.validate = validate
+        self.stats = {'facts': 0, 'contexts': 0, 'units': 0}
+        self.namespaces = dict(xbrl_model.prefixedNamespaces)
+        self.namespaces.update((prefix, ns) for prefix, ns in self.root.nsmap.items() if prefix)
+        self.qnames = {}
+        self.tags = {}
+        #memos on the raw inputs, before normalizing them to keys
+        self.context_ids = {}
+        self.unit_ids = {}
+        self.contexts = self.seed_contexts()
+        self.units = {
+            (tuple(unit.measures[0]), tuple(unit.measures[1])): unit.id
+            for unit in xbrl_model.units.values()
+            }
+        self.last_context = XmlUtil.lastChild(self.root, XbrlConst.xbrli, ('schemaRef', 'linkbaseRef', 'roleRef', 'arcroleRef', 'context'))
+        self.last_unit = XmlUtil.lastChild(self.root, XbrlConst.xbrli, ('schemaRef', 'linkbaseRef', 'roleRef', 'arcroleRef', 'context', 'unit'))
+
+    def seed_contexts(self):
+        """Get the hash map of the instance's contexts.
+
+        Contexts with a scenario, typed dims or non-dimensional segment
+        content have more than (entity, period, explicit dims), so new facts
+        never share them.
+        """
+        contexts = {}
+        for context in self.xbrl_model.contexts.values():
+            if context.hasScenario or context.segNonDimValues or \
+                    not all(member.isExplicit for member in context.qnameDims.values()):
+                continue
+            if context.isForeverPeriod:
+                period = None
+            elif context.isInstantPeriod:
+                period = XmlUtil.text(XmlUtil.child(context.period, XbrlConst.xbrli, 'instant'))
+            else:
+                period = (
+                    XmlUtil.text(XmlUtil.child(context.period, XbrlConst.xbrli, 'startDate')),
+                    XmlUtil.text(XmlUtil.child(context.period, XbrlConst.xbrli, 'endDate')),
+                    )
+            dims = tuple(sorted((dim, member.memberQname) for dim, member in context.qnameDims.items()))
+            contexts[(context.entityIdentifier, period, dims)] = context.id
+        return contexts
+
+    # KEYS
+    def get_qname(self, name):
+        """Get the QName of 'prefix:Name' or '{namespace}Name'."""
+        if not isinstance(name, str):
+            return name
+        if name not in self.qnames:
+            if name.startswith('{'):
+                self.qnames[name] = qname(name)
+            else:
+                prefix, _, local_name = name.rpartition(':')
+                if prefix not in self.namespaces:
+                    raise ValueError(f'undeclared prefix in {name!r}')
+                self.qnames[name] = qname(self.namespaces[prefix], name)
+        return self.qnames[name]
+
+    def get_tag(self, concept):
+        """Get the clark notation of a concept, declaring its namespace
+        once, rather than per element."""
+        if concept not in self.tags:
+            concept_qname = self.get_qname(concept)
+            XmlUtil.addQnameValue(self.root, concept_qname)
+            self.tags[concept] = concept_qname.clarkNotation
+        return self.tags[concept]
+
+    # GETTERS
+    def get_context(self, entity, period, dims):
+        """Get the id of the context, created if there is none."""
+        entity = (self.scheme, str(entity)) if isinstance(entity, str) else tuple(entity)
+        if isinstance(period, (tuple, list)):
+            period = (as_date(period[0]), as_date(period[1])) if period[0] is not None else as_date(period[1])
+        elif period is not None:
+            period = as_date(period)
+        dims = tuple(sorted((self.get_qname(dim), self.get_qname(member)) for dim, member in (dims or {}).items()))
+        key = (entity, period, dims)
+        context_id = self.contexts.get(key)
+        if context_id is None:
+            context_id = self.create_context(entity, period, dims)
+            self.contexts[key] = context_id
+        return context_id
+
+    def get_unit(self, measure):
+        """Get the id of the unit of a measure, e.g. 'iso4217:USD' or
+        'iso4217:USD/xbrli:shares', created if there is none."""
+        numerator, _, denominator = str(measure).partition('/')
+        key = (
+            tuple(sorted(self.get_qname(name) for name in numerator.split('*'))),
+            tuple(sorted(self.get_qname(name) for name in denominator.split('*') if name)),
+            )
+        unit_id = self.units.get(key)
+        if unit_id is None:
+            unit_id = f'u-{len(self.xbrl_model.units) + 1:02}'
+            while unit_id in self.xbrl_model.units:
+                unit_id += '_'
+            self.last_unit = self.xbrl_model.createUnit(list(key[0]), list(key[1]), afterSibling=self.last_unit, id=unit_id)
+            self.units[key] = unit_id
+            self.stats['units'] += 1
+        return unit_id
+
+    # CREATE
+    def create_context(self, entity, period, dims):
+        """Create a context element from normalized (entity, period, dims)."""
+        root = self.root
+        context_id = f'c-{len(self.xbrl_model.contexts) + 1:02}'
+        while context_id in self.xbrl_model.contexts:
+            context_id += '_'
+        context = XmlUtil.addChild(root, XbrlConst.xbrli, 'context', attributes=('id', context_id), afterSibling=self.last_context)
+        entity_elt = XmlUtil.addChild(context, XbrlConst.xbrli, 'entity')
+        XmlUtil.addChild(entity_elt, XbrlConst.xbrli, 'identifier', attributes=('scheme', entity[0]), text=entity[1])
+        if dims:
+            segment = XmlUtil.addChild(entity_elt, XbrlConst.xbrli, 'segment')
+            for dim, member in dims:
+                XmlUtil.addChild(segment, XbrlConst.xbrldi, 'xbrldi:explicitMember',
+                    attributes=('dimension', XmlUtil.addQnameValue(root, dim)), text=XmlUtil.addQnameValue(root, member))
+        period_elt = XmlUtil.addChild(context, XbrlConst.xbrli, 'period')
+        if period is None:
+            XmlUtil.addChild(period_elt, XbrlConst.xbrli, 'forever')
+        elif isinstance(period, tuple):
+            XmlUtil.addChild(period_elt, XbrlConst.xbrli, 'startDate', text=period[0])
+            XmlUtil.addChild(period_elt, XbrlConst.xbrli, 'endDate', text=period[1])
+        else:
+            XmlUtil.addChild(period_elt, XbrlConst.xbrli, 'instant', text=period)
+        self.document.contextDiscover(context)
+        self.last_context = context
+        self.stats['contexts'] += 1
+        return context_id
+
+    def add_batch(self, batch):
+        """Append a batch of fact tuples to the instance."""
+        document, root = self.document, self.root
+        makeelement = document.parser.makeelement
+        for concept, entity, period, dims, unit, decimals, value in batch:
+            raw_context = (entity if isinstance(entity, str) else tuple(entity), period if not isinstance(period, list) else tuple(period), tuple(dims.items()) if dims else ())
+            context_id = self.context_ids.get(raw_context)
+            if context_id is None:
+                context_id = self.context_ids[raw_context] = self.get_context(entity, period, dims)
+            attributes = {'contextRef': context_id}
+            if unit is not None:
+                unit_id = self.unit_ids.get(unit)
+                if unit_id is None:
+                    unit_id = self.unit_ids[unit] = self.get_unit(unit)
+                attributes['unitRef'] = unit_id
+            if decimals is not None and value is not None:
+                attributes['decimals'] = str(decimals)
+            if value is None:
+                XmlUtil.setXmlns(document, 'xsi', XbrlConst.xsi)
+                attributes[XbrlConst.qnXsiNil.clarkNotation] = 'true'
+            fact = makeelement(self.get_tag(concept), attributes)
+            if value is not None:
+                fact.text = str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+            root.append(fact)
+            fact.init(document)
+            if self.validate:
+                XmlValidate.validate(self.xbrl_model, fact)
+            document.factDiscover(fact, parentElement=root)
+        #reset arelle's cached fact indexes once per batch
+        for cache in FACT_CACHES:
+            if hasattr(self.xbrl_model, cache):
+                delattr(self.xbrl_model, cache)
+        self.stats['facts'] += len(batch)
+
+    def add(self, facts, batch_size=10_000):
+        """Add facts, in the forms accepted by `Table.add_facts`.
+
+        Returns:
+            dict: counts of facts added, and contexts and units created
+        """
+        if isinstance(facts, dict):
+            facts = zip(*(facts.get(field, itertools.repeat(None)) for field in FACT_FIELDS))
+        batch = []
+        for fact in facts:
+            batch.append(tuple(fact.get(field) for field in FACT_FIELDS) if isinstance(fact, dict) else fact)
+            if len(batch) >= batch_size:
+                self.add_batch(batch)
+                batch = []
+        if batch:
+            self.add_batch(batch)
+        self.xbrl_model.setIsModified()
+        return self.stats
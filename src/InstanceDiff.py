@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+
+InstanceDiff Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import FactStore
+from .InstanceReader import InstanceReader
+
+import numpy as np
+
+from pathlib import Path
+import hashlib
+
+
+FACT_FIELDS = ('concept', 'context', 'unit', 'decimals', 'value')
+MIX_PRIME = np.uint64(0x100000001B3)
+MIX_SEED = np.uint64(0xCBF29CE484222325)
+
+
+def stable_hashes(strings):
+    """Get stable 64-bit hashes (independent of PYTHONHASHSEED) of
+    strings, plus a trailing 0 so that id -1 indexes to 0."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(str(string).encode('utf-8'), digest_size=8).digest(), 'big')
+        for string in strings
+        ]
+    return np.array(hashes + [0], dtype=np.uint64)
+
+
+def mix(*columns):
+    """Combine uint64 columns into one 64-bit hash per row (FNV-style
+    multiply with an xorshift, so column order matters)."""
+    size = max(np.size(column) for column in columns)
+    h = np.full(size, MIX_SEED, dtype=np.uint64)
+    for column in columns:
+        h ^= np.asarray(column).astype(np.uint64, copy=False)
+        h *= MIX_PRIME
+        h ^= h >> np.uint64(29)
+    return h
+
+
+class InstanceDiff:
+    """Semantic diff of instance versions: added, removed and changed
+    facts by (concept, context, unit).
+
+    Facts are hashed to 64-bit keys (concept, context, unit) and values
+    (decimals, value), vectorized over the FactStore columns, and the two
+    versions are hash-joined with numpy, so 500k-fact filings diff in
+    seconds.  Duplicate facts for a key are combined into one
+    order-independent value hash.
+
+    Args:
+        context_key (str):
+            * 'semantic' (default): contexts match by entity, period and
+            dimensions, and units by measures, so renamed context and unit
+            ids are not changes
+            * 'id': contexts and units match by id
+
+    Note:
+        * equal hashes are taken as equal facts; with 64-bit hashes a
+        collision among a million facts has a probability near 3e-8
+        * each fact in the output carries its `key` (hex), so downstream
+        jobs can reprocess only the facts that changed
+
+    Usage:
+        differ = InstanceDiff()
+        result = differ.diff(previous_table, table)
+        result['counts']
+        for fact in result['changed']:
+            fact['before']['value'], fact['after']['value']
+        result = differ.diff3(original, amendment, restated)
+        result['conflicts']
+    """
+
+    def __init__(self, context_key='semantic'):
+        if context_key not in ('semantic', 'id'):
+            raise ValueError(f'unknown context_key: {context_key}')
+        self.context_key = context_key
+
+    def __repr__(self):
+        return f'InstanceDiff(context_key={self.context_key!r})'
+
+    # INDEX
+
+    @staticmethod
+    def as_fact_store(source):
+        """Get a FactStore from a Table, FactStore or instance path."""
+        if isinstance(source, FactStore):
+            return source.freeze()
+        if isinstance(source, (str, Path)):
+            return InstanceReader(source).to_fact_store()
+        store = source.get_facts(columnar=True)
+        if store is None:
+            raise ValueError(f'no facts loaded for {source!r}')
+        return store
+
+    def context_hashes(self, store):
+        """Get one hash per context row."""
+        if self.context_key == 'id':
+            return stable_hashes(store.context_ids)[:-1]
+        name_hashes = stable_hashes(store.names.strings)
+        dims = np.zeros(len(store.context_ids), dtype=np.uint64)
+        #dimensions are summed, so their order does not matter
+        np.add.at(dims, store.dim_context, mix(name_hashes[store.dim_dimension], name_hashes[store.dim_member]))
+        return mix(
+            name_hashes[store.ctx_entity],
+            store.ctx_start.view(np.int64),
+            store.ctx_end.view(np.int64),
+            dims,
+            )
+
+    def unit_hashes(self, store, name_hashes):
+        """Get one unit hash per fact: of its measures, or of its unit id
+        when matching by id or the unit is not declared."""
+        if self.context_key == 'id':
+            return name_hashes[store.unit]
+        return name_hashes[np.where(store.measure >= 0, store.measure, store.unit)]
+
+    def index(self, source):
+        """Hash a version's facts.
+
+        Returns:
+            dict: store, keys (sorted unique uint64), values (uint64 per
+            key) and rows (first fact row per key)
+        """
+        store = self.as_fact_store(source)
+        name_hashes = stable_hashes(store.names.strings)
+        text_hashes = stable_hashes(store.texts[idx] for idx in range(len(store.texts)))
+        keys = mix(
+            name_hashes[store.concept],
+            self.context_hashes(store)[store.context],
+            self.unit_hashes(store, name_hashes),
+            )
+        values = mix(
+            store.decimals.astype(np.int64),
+            store.value.view(np.uint64),
+            text_hashes[store.text],
+            )
+        unique_keys, rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        combined = np.zeros(len(unique_keys), dtype=np.uint64)
+        np.add.at(combined, inverse, values)
+        return {'store': store, 'keys': unique_keys, 'values': combined, 'rows': rows}
+
+    # EXPORT
+
+    @staticmethod
+    def facts_at(index, positions):
+        """Get fact dicts for key positions of an index."""
+        store = index['store']
+        rows = index['rows'][positions]
+        mask = np.zeros(len(store), dtype=bool)
+        mask[rows] = True
+        records = dict(zip(np.flatnonzero(mask).tolist(), store.to_records(mask)))
+        return [
+            dict(zip(FACT_FIELDS, records[row]), key=f'{key:016x}')
+            for row, key in zip(rows.tolist(), index['keys'][positions].tolist())
+            ]
+
+    @staticmethod
+    def locate(index, keys):
+        """Find keys in an index.
+
+        Returns:
+            tuple: (found mask, value per key (0 if absent), position per key)
+        """
+        if not len(index['keys']):
+            zeros = np.zeros(len(keys), dtype=np.int64)
+            return zeros.astype(bool), zeros.astype(np.uint64), zeros
+        positions = np.minimum(np.searchsorted(index['keys'], keys), len(index['keys']) - 1)
+        found = index['keys'][positions] == keys
+        return found, np.where(found, index['values'][positions], np.uint64(0)), positions
+
+    # DIFF
+
+    def diff(self, base, other):
+        """Diff two versions.
+
+        Returns:
+            dict: {
+                'added': [fact], 'removed': [fact],
+                'changed': [{'key', 'before': fact, 'after': fact}],
+                'counts': {'added', 'removed', 'changed', 'unchanged'}
+            }
+        """
+        base, other = self.index(base), self.index(other)
+        common, base_pos, other_pos = np.intersect1d(base['keys'], other['keys'], assume_unique=True, return_indices=True)
+        removed = np.ones(len(base['keys']), dtype=bool)
+        removed[base_pos] = False
+        added = np.ones(len(other['keys']), dtype=bool)
+        added[other_pos] = False
+        changed = base['values'][base_pos] != other['values'][other_pos]
+        before = self.facts_at(base, base_pos[changed])
+        after = self.facts_at(other, other_pos[changed])
+        return {
+            'base': next(iter(base['store'].filings), None),
+            'other': next(iter(other['store'].filings), None),
+            'added': self.facts_at(other, np.flatnonzero(added)),
+            'removed': self.facts_at(base, np.flatnonzero(removed)),
+            'changed': [
+                {'key': fact_before['key'], 'before': fact_before, 'after': fact_after}
+                for fact_before, fact_after in zip(before, after)
+                ],
+            'counts': {
+                'added': int(added.sum()),
+                'removed': int(removed.sum()),
+                'changed': int(changed.sum()),
+                'unchanged': int(len(common) - changed.sum()),
+            },
+        }
+
+    def diff3(self, base, left, right):
+        """Three-way diff, e.g. an original filing (`base`) against an
+        amendment (`left`) and another revision (`right`).
+
+        Each key changed (added, removed or revalued) on either side is
+        classified as:
+        * left_only / right_only: changed on one side
+        * both: changed identically on both sides
+        * conflicts: changed differently on both sides
+
+        Returns:
+            dict: {class: [{'key', 'base', 'left', 'right'}], 'counts': {...}},
+            where a fact absent from a version is None
+        """
+        indexes = [self.index(source) for source in (base, left, right)]
+        keys = np.unique(np.concatenate([index['keys'] for index in indexes]))
+        present, values, positions = zip(*(self.locate(index, keys) for index in indexes))
+        (base_present, left_present, right_present) = present
+        (base_values, left_values, right_values) = values
+        left_changed = (base_present != left_present) | (base_values != left_values)
+        right_changed = (base_present != right_present) | (base_values != right_values)
+        same = (left_present == right_present) & (left_values == right_values)
+        classes = {
+            'left_only': left_changed & ~right_changed,
+            'right_only': right_changed & ~left_changed,
+            'both': left_changed & right_changed & same,
+            'conflicts': left_changed & right_changed & ~same,
+        }
+        result = {'counts': {name: int(mask.sum()) for name, mask in classes.items()}}
+        result['counts']['unchanged'] = int((~left_changed & ~right_changed).sum())
+        for name, mask in classes.items():
+            selected = np.flatnonzero(mask)
+            sides = {}
+            for side, index, found, pos in zip(('base', 'left', 'right'), indexes, present, positions):
+                facts = iter(self.facts_at(index, pos[selected[found[selected]]]))
+                sides[side] = [next(facts) if is_found else None for is_found in found[selected]]
+            result[name] = [
+                {'key': f'{key:016x}', 'base': base_fact, 'left': left_fact, 'right': right_fact}
+                for key, base_fact, left_fact, right_fact in zip(keys[selected].tolist(), sides['base'], sides['left'], sides['right'])
+                ]
+        return result
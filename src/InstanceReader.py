@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+
+InstanceReader Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import FactStore
+
+from lxml import etree
+
+from pathlib import Path
+
+
+XBRLI = 'http://www.xbrl.org/2003/instance'
+LINK = 'http://www.xbrl.org/2003/linkbase'
+XLINK = 'http://www.w3.org/1999/xlink'
+XBRLDI = 'http://xbrl.org/2006/xbrldi'
+XSI = 'http://www.w3.org/2001/XMLSchema-instance'
+ISO4217 = 'http://www.xbrl.org/2003/iso4217'
+
+TAG_CONTEXT = f'{{{XBRLI}}}context'
+TAG_UNIT = f'{{{XBRLI}}}unit'
+TAG_SCHEMA_REF = f'{{{LINK}}}schemaRef'
+TAG_LINKBASE_REF = f'{{{LINK}}}linkbaseRef'
+XSD = 'http://www.w3.org/2001/XMLSchema'
+#elements that may precede the body of an instance or schema
+PROLOG_TAGS = (
+    TAG_SCHEMA_REF, TAG_LINKBASE_REF, f'{{{LINK}}}roleRef', f'{{{LINK}}}arcroleRef',
+    f'{{{XSD}}}import', f'{{{XSD}}}include', f'{{{XSD}}}annotation',
+    )
+ATTR_HREF = f'{{{XLINK}}}href'
+ATTR_NIL = f'{{{XSI}}}nil'
+SKIP_NAMESPACES = (XBRLI, LINK)
+
+
+class InstanceReader:
+    """Streaming reader of xbrl instance documents, built on
+    `lxml.etree.iterparse`, that bypasses arelle and DTS discovery.
+
+    Contexts, units and facts are emitted as each top-level element ends,
+    and consumed elements are cleared, so memory stays constant in the size
+    of the document.  Output uses the plain forms of Table.get_summary().
+
+    Note:
+        * nothing is validated; use it for trusted, pre-validated filings and
+        run arelle (Table.load_xbrl) as an opt-in second pass
+        * facts nested in tuples are emitted as individual facts
+
+    Usage:
+        reader = InstanceReader(filepath)
+        for kind, item in reader:
+            match kind:
+                case 'schemaRef': href = item
+                case 'context': context_id, context = item
+                case 'unit': unit_id, measure = item
+                case 'fact': concept, context_id, unit_id, decimals, value = item
+        store = InstanceReader(filepath).to_fact_store()
+        InstanceReader(filepath).sniff()['schema_refs']
+    """
+
+    sniff_chunk_size = 1 << 10
+
+    def __init__(self, path_or_file, huge_tree=True):
+        self.path_or_file = path_or_file
+        self.huge_tree = huge_tree
+
+    def __iter__(self):
+        source = self.path_or_file
+        if isinstance(source, Path):
+            source = str(source)
+        root = None
+        for event, elem in etree.iterparse(source, events=('start', 'end'), huge_tree=self.huge_tree, remove_comments=True):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            if elem.getparent() is not root:
+                continue
+            tag = elem.tag
+            if tag == TAG_CONTEXT:
+                yield 'context', (elem.get('id'), self.read_context(elem))
+            elif tag == TAG_UNIT:
+                yield 'unit', (elem.get('id'), self.read_unit(elem))
+            elif tag == TAG_SCHEMA_REF:
+                yield 'schemaRef', elem.get(ATTR_HREF)
+            elif isinstance(tag, str) and etree.QName(tag).namespace not in SKIP_NAMESPACES:
+                for fact in self.read_facts(elem):
+                    yield 'fact', fact
+            #release the consumed element and its preceding siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del root[0]
+
+    def sniff(self):
+        """Read only the root element, its namespaces and the references
+        that precede the document body (schemaRefs and linkbaseRefs of an
+        instance; imports, includes and linkbaseRefs of a schema).
+        The file is fed in small chunks and parsing stops at the first body
+        element, e.g. a context or fact.
+
+        Returns:
+            dict: {'root', 'namespace', 'namespaces', 'target_namespace',
+            'schema_refs', 'linkbase_refs'}
+        """
+        sniffed = {'root': None, 'namespace': None, 'namespaces': {}, 'target_namespace': None, 'schema_refs': [], 'linkbase_refs': []}
+        parser = etree.XMLPullParser(events=('start', 'end'), huge_tree=self.huge_tree, remove_comments=True)
+        depth = 0
+        in_prolog = False
+        source = self.path_or_file
+        f = open(source, 'rb') if isinstance(source, (str, Path)) else source
+        try:
+            for chunk in iter(lambda: f.read(self.sniff_chunk_size), b''):
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if event == 'end':
+                        depth -= 1
+                        continue
+                    depth += 1
+                    if depth == 1:
+                        qname = etree.QName(elem)
+                        sniffed['root'] = qname.localname
+                        sniffed['namespace'] = qname.namespace
+                        sniffed['namespaces'] = {prefix or '': uri for prefix, uri in elem.nsmap.items()}
+                        sniffed['target_namespace'] = elem.get('targetNamespace')
+                        continue
+                    if depth == 2:
+                        in_prolog = elem.tag in PROLOG_TAGS
+                        if not in_prolog:
+                            return sniffed
+                    if not in_prolog:
+                        continue
+                    if elem.tag == TAG_SCHEMA_REF:
+                        sniffed['schema_refs'].append(elem.get(ATTR_HREF))
+                    elif elem.tag == TAG_LINKBASE_REF:
+                        sniffed['linkbase_refs'].append(elem.get(ATTR_HREF))
+                    elif elem.tag in (f'{{{XSD}}}import', f'{{{XSD}}}include') and elem.get('schemaLocation'):
+                        sniffed['schema_refs'].append(elem.get('schemaLocation'))
+        finally:
+            if f is not source:
+                f.close()
+        return sniffed
+
+    # PARSERS
+
+    @staticmethod
+    def prefixed_name(elem):
+        qname = etree.QName(elem)
+        return f'{elem.prefix}:{qname.localname}' if elem.prefix else qname.text
+
+    @staticmethod
+    def read_context(elem):
+        context = {'entity': None, 'start': None, 'end': None, 'instant': False, 'dims': {}}
+        for child in elem.iter():
+            if not isinstance(child.tag, str):
+                continue
+            local = etree.QName(child).localname
+            namespace = etree.QName(child).namespace
+            if namespace == XBRLI:
+                match local:
+                    case 'identifier':
+                        context['entity'] = (child.get('scheme'), (child.text or '').strip())
+                    case 'startDate':
+                        context['start'] = (child.text or '').strip()
+                    case 'endDate':
+                        context['end'] = (child.text or '').strip()
+                    case 'instant':
+                        context['end'] = (child.text or '').strip()
+                        context['instant'] = True
+            elif namespace == XBRLDI:
+                match local:
+                    case 'explicitMember':
+                        context['dims'][child.get('dimension')] = (child.text or '').strip()
+                    case 'typedMember':
+                        context['dims'][child.get('dimension')] = ''.join(child.itertext()).strip()
+        return context
+
+    @staticmethod
+    def read_unit(elem):
+        """Get the unit's measures as arelle renders them (ModelUnit.value)."""
+        multiply, divide = [], []
+        for measure in elem.iter(f'{{{XBRLI}}}measure'):
+            text = (measure.text or '').strip()
+            prefix, _, local = text.rpartition(':')
+            if measure.nsmap.get(prefix or None) in (XBRLI, ISO4217):
+                text = local
+            parent = etree.QName(measure.getparent()).localname
+            (divide if parent == 'unitDenominator' else multiply).append(text)
+        return ' '.join(multiply + (['/'] + divide if divide else []))
+
+    @classmethod
+    def read_facts(cls, elem):
+        if elem.get('contextRef') is None:
+            #tuple: emit its nested facts
+            for child in elem.iterchildren():
+                if isinstance(child.tag, str):
+                    yield from cls.read_facts(child)
+            return
+        value = None if elem.get(ATTR_NIL) == 'true' else (elem.text or '').strip()
+        yield (
+            cls.prefixed_name(elem),
+            elem.get('contextRef'),
+            elem.get('unitRef'),
+            elem.get('decimals'),
+            value,
+        )
+
+    # EXPORT
+
+    def to_fact_store(self):
+        """Stream the instance straight into a FactStore."""
+        store = FactStore(filing=self.path_or_file if isinstance(self.path_or_file, (str, Path)) else None)
+        for kind, item in self:
+            match kind:
+                case 'fact':
+                    store.add_fact(*item)
+                case 'context':
+                    context_id, context = item
+                    store.add_context(context_id, **context)
+                case 'unit':
+                    store.add_unit(*item)
+        return store.freeze()
+
+    def to_summary(self):
+        """Get the instance in the form of Table.get_summary()."""
+        summary = {
+            'path': str(self.path_or_file),
+            'error': None,
+            'errors': [],
+            'schema_refs': [],
+            'contexts': {},
+            'units': {},
+            'facts': [],
+        }
+        for kind, item in self:
+            match kind:
+                case 'fact':
+                    summary['facts'].append(item)
+                case 'context':
+                    summary['contexts'][item[0]] = item[1]
+                case 'unit':
+                    summary['units'][item[0]] = item[1]
+                case 'schemaRef':
+                    summary['schema_refs'].append(item)
+        return summary
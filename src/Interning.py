@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+
+Interner Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+import hashlib
+
+
+def stable_hash(key):
+    """Get a stable 64-bit hash (independent of PYTHONHASHSEED) of a
+    canonical key of strings, bools, None and tuples."""
+    return int.from_bytes(hashlib.blake2b(repr(key).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def context_key(context):
+    """Get the canonical key of a context dict, in the form of
+    Table.get_summary()['contexts']: entity, period and dimensions, with
+    dimension order ignored."""
+    entity = context.get('entity')
+    return (
+        tuple(entity) if entity is not None else None,
+        context.get('start') or None,
+        context.get('end') or None,
+        bool(context.get('instant')),
+        tuple(sorted((context.get('dims') or {}).items())),
+        )
+
+
+def unit_key(measure):
+    """Get the canonical key of a unit's measures, e.g. 'USD / shares',
+    with measure order ignored on each side."""
+    numerator, _, denominator = str(measure).partition('/')
+    return (tuple(sorted(numerator.split())), tuple(sorted(denominator.split())))
+
+
+def unit_measure(measure):
+    """Get the canonical string of a unit's measures, e.g. 'USD / shares',
+    with measure order ignored on each side."""
+    numerator, denominator = unit_key(measure)
+    return ' '.join(numerator + (('/',) + denominator if denominator else ()))
+
+
+class Interner:
+    """Canonical contexts and units, shared by every table a TableFactory
+    loads.
+
+    Each distinct context (entity, period, dimensions) and unit (measures)
+    gets a stable 64-bit hash, and is stored once.  Interned summaries
+    reference the shared context dicts and id strings, so thousands of
+    filings held together carry each distinct context once, and contexts
+    compare across filings as integers (FactStore `ctx_key`).
+
+    Ids are 'c-<hash hex>' and 'u-<hash hex>': equal for equal contexts and
+    units in any filing, process or run.
+
+    Note:
+        * dimensions and measures are compared as written ('prefix:Name'),
+        so filings must share prefixes for their contexts to match
+        * interned contexts are shared: treat them as read-only
+
+    Usage:
+        interner = Interner()
+        summary = interner.intern_summary(table.get_summary())
+        summary['contexts'][context_id]['key']
+        interner.context_id(interner.intern_context({'entity': ('http://www.sec.gov/CIK', '0000000001'), 'end': '2024-12-31', 'instant': True}))
+    """
+
+    def __init__(self):
+        self.contexts = {}  #hash -> canonical context dict
+        self.units = {}     #hash -> canonical measure string
+        self.ids = {}       #hash -> id string
+        self._context_hashes = {}   #canonical key -> hash
+        self._unit_hashes = {}
+        self.stats = {'contexts': 0, 'context_refs': 0, 'units': 0, 'unit_refs': 0}
+
+    def __repr__(self):
+        return f'Interner(contexts={len(self.contexts)}, units={len(self.units)}, stats={self.stats})'
+
+    @staticmethod
+    def context_id(key):
+        return f'c-{key:016x}'
+
+    @staticmethod
+    def unit_id(key):
+        return f'u-{key:016x}'
+
+    # SETTERS
+
+    def intern_context(self, context):
+        """Intern a context dict.
+
+        Returns:
+            int: the context's stable hash
+        """
+        canonical = context_key(context)
+        self.stats['context_refs'] += 1
+        key = self._context_hashes.get(canonical)
+        if key is None:
+            key = stable_hash(canonical)
+            self._context_hashes[canonical] = key
+            if key not in self.contexts:
+                entity, start, end, instant, dims = canonical
+                self.contexts[key] = {'entity': entity, 'start': start, 'end': end, 'instant': instant, 'dims': dict(dims), 'key': key}
+                self.ids[key] = self.context_id(key)
+                self.stats['contexts'] += 1
+        return key
+
+    def intern_unit(self, measure):
+        """Intern a unit's measures, e.g. 'USD' or 'USD / shares'.
+
+        Returns:
+            int: the unit's stable hash
+        """
+        canonical = unit_key(measure)
+        self.stats['unit_refs'] += 1
+        key = self._unit_hashes.get(canonical)
+        if key is None:
+            key = stable_hash(('unit', canonical))
+            self._unit_hashes[canonical] = key
+            if key not in self.units:
+                self.units[key] = unit_measure(measure)
+                self.ids[key] = self.unit_id(key)
+                self.stats['units'] += 1
+        return key
+
+    def intern_summary(self, summary):
+        """Get a summary (see Table.get_summary) with its contexts and units
+        replaced by the interned ones, keyed by canonical id; facts refer to
+        the canonical ids, and duplicate contexts and units collapse.
+
+        Returns:
+            dict: the interned summary, with `interned` True
+        """
+        if summary.get('interned') or summary.get('error'):
+            return summary
+        context_keys = {context_id: self.intern_context(context) for context_id, context in summary['contexts'].items()}
+        unit_keys = {unit_id: self.intern_unit(measure) for unit_id, measure in summary['units'].items()}
+        context_ids = {context_id: self.ids[key] for context_id, key in context_keys.items()}
+        unit_ids = {unit_id: self.ids[key] for unit_id, key in unit_keys.items()}
+        interned = dict(summary, interned=True)
+        interned['contexts'] = {self.ids[key]: self.contexts[key] for key in context_keys.values()}
+        interned['units'] = {self.ids[key]: self.units[key] for key in unit_keys.values()}
+        interned['facts'] = [
+            (concept, context_ids.get(context_id, context_id), unit_ids.get(unit_id, unit_id), decimals, value)
+            for concept, context_id, unit_id, decimals, value in summary['facts']
+            ]
+        return interned
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+
+Ledger Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import Vocabulary
+
+import numpy as np
+
+from decimal import Decimal
+
+
+COLUMNS = {
+    'account': np.int32,
+    'counterparty': np.int32,
+    'amount': np.int64,
+    'period': np.int32,
+    'batch': np.int32,
+}
+
+
+def period_key(period):
+    """Get the canonical form of a period: 'yyyy-mm-dd', or a (start,
+    end) tuple of them."""
+    if isinstance(period, (tuple, list)):
+        return tuple(str(bound) for bound in period)
+    return str(period)
+
+
+class Ledger:
+    """Double-entry ledger of postings, held in array-backed columns.
+
+    A posting debits `account` and credits `counterparty` with `amount`, in
+    integer minor units (e.g. cents), for a period.  Postings are appended
+    in batches: names are mapped to ids once per batch, the columns grow
+    geometrically, and the balance deltas of a whole batch are one
+    np.add.at, so a batch of a million postings costs a few array passes.
+
+    Balances are kept incrementally, by (period, account), debits positive;
+    every posting moves its amount from one account to another, so the
+    balances of a period always sum to zero.  Constraints bound accounts'
+    total balances, and are checked once per batch against the balances
+    the batch would leave: a batch that breaks one is rejected whole.
+
+    Posting columns (numpy, one row per posting):
+    * account, counterparty (int32) - ids into `accounts`
+    * amount (int64) - minor units
+    * period (int32) - id into `periods`
+    * batch (int32) - the batch that posted it
+
+    Args:
+        decimals (int): minor units per unit, as 10 ** decimals (2 for
+        cents); used as the facts' decimals on export
+
+    Note:
+        * postings are append-only: correct with `reverse`, which posts
+        the opposite entries
+        * periods are as Table.add_facts takes them: an end date for an
+        instant, (start, end) for a duration
+
+    Usage:
+        ledger = Ledger(decimals=2)
+        ledger.add_constraint('Cash', minimum=0)
+        ledger.post([('Cash', 'Equity', 100_000_00, ('2024-01-01', '2024-12-31'))])
+        ledger.post({'account': accounts, 'counterparty': counterparties, 'amount': amounts, 'period': periods})
+        ledger.get_balance('Cash')
+        table.add_facts(ledger.to_facts({'Cash': 'us-gaap:Cash'}, entity='0000000001'))
+    """
+
+    def __init__(self, decimals=2):
+        self.decimals = decimals
+        self.accounts = Vocabulary()
+        self.periods = Vocabulary()
+        self.constraints = {}   #account id -> (minimum, maximum), None for unbounded
+        self.size = 0
+        self.n_batches = 0
+        self._columns = {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+        self._balances = np.zeros((0, 0), dtype=np.int64)    #period x account
+        self.stats = {'postings': 0, 'batches': 0, 'rejected': 0}
+
+    def __repr__(self):
+        return f'Ledger(postings={self.size}, accounts={len(self.accounts)}, periods={len(self.periods)}, stats={self.stats})'
+
+    def __len__(self):
+        return self.size
+
+    def __getattr__(self, name):
+        #posting columns, as views of the filled rows
+        columns = self.__dict__.get('_columns')
+        if columns is not None and name in columns:
+            return columns[name][:self.size]
+        raise AttributeError(name)
+
+    # SETTERS
+
+    def get_ids(self, names, vocabulary):
+        """Map names (or existing int ids) to ids, adding new names."""
+        names = np.asarray(names) if not isinstance(names, np.ndarray) else names
+        if np.issubdtype(names.dtype, np.integer):
+            if len(names) and (names.min() < 0 or names.max() >= len(vocabulary)):
+                raise ValueError('unknown id')
+            return names.astype(np.int32, copy=False)
+        add = vocabulary.add
+        uniques, inverse = np.unique(names.astype(str), return_inverse=True)
+        return np.array([add(name) for name in uniques.tolist()], dtype=np.int32)[inverse]
+
+    def get_period_ids(self, periods):
+        """Map periods (end date, or (start, end)) to ids, adding new ones."""
+        if (isinstance(periods, np.ndarray) and np.issubdtype(periods.dtype, np.integer)) or \
+                (len(periods) and isinstance(periods[0], (int, np.integer))):
+            return self.get_ids(np.asarray(periods), self.periods)
+        index, add = {}, self.periods.add
+        ids = np.empty(len(periods), dtype=np.int32)
+        for idx, period in enumerate(periods):
+            if isinstance(period, list):
+                period = tuple(period)
+            period_id = index.get(period)
+            if period_id is None:
+                period_id = index[period] = add(period_key(period))
+            ids[idx] = period_id
+        return ids
+
+    def add_constraint(self, account, minimum=None, maximum=None):
+        """Bound an account's total balance (debits positive, minor units),
+        e.g. minimum=0 for an asset that cannot be overdrawn."""
+        self.constraints[self.accounts.add(account)] = (minimum, maximum)
+        self.grow_balances(len(self.periods), len(self.accounts))
+
+    def remove_constraint(self, account):
+        self.constraints.pop(self.accounts.get(account), None)
+
+    def grow_balances(self, n_periods, n_accounts):
+        rows, cols = self._balances.shape
+        if n_periods > rows or n_accounts > cols:
+            balances = np.zeros((max(n_periods, rows), max(n_accounts, cols)), dtype=np.int64)
+            balances[:rows, :cols] = self._balances
+            self._balances = balances
+
+    def append(self, columns):
+        """Append posting columns, growing the arrays geometrically."""
+        n = len(columns['amount'])
+        capacity = len(self._columns['amount'])
+        if self.size + n > capacity:
+            capacity = max(self.size + n, 2 * capacity, 1024)
+            for column, array in self._columns.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.size] = array[:self.size]
+                self._columns[column] = grown
+        for column, values in columns.items():
+            self._columns[column][self.size:self.size + n] = values
+        self.size += n
+
+    def post(self, postings):
+        """Post a batch: check the constraints against the balances it
+        would leave, then append it and update the balances.
+
+        Args:
+            postings: an iterable of (account, counterparty, amount, period)
+            tuples, or a columnar dict of sequences with those keys; names
+            are str, or int ids of known accounts and periods; amounts are
+            int minor units
+        Returns:
+            int: the batch number
+        Raises:
+            ValueError: if an amount is not an integer, the columns differ
+            in length, or the batch would break a constraint; nothing is
+            posted
+        """
+        if not isinstance(postings, dict):
+            postings = dict(zip(('account', 'counterparty', 'amount', 'period'), zip(*postings))) or \
+                {'account': (), 'counterparty': (), 'amount': (), 'period': ()}
+        amount = np.asarray(postings['amount'])
+        if len(amount) and not np.issubdtype(amount.dtype, np.integer):
+            raise ValueError('amounts must be integer minor units')
+        #before names are added, so a malformed batch leaves no trace
+        if not (len(postings['account']) == len(postings['counterparty']) == len(amount) == len(postings['period'])):
+            raise ValueError('posting columns differ in length')
+        n_accounts, n_periods = len(self.accounts), len(self.periods)
+        account = self.get_ids(postings['account'], self.accounts)
+        counterparty = self.get_ids(postings['counterparty'], self.accounts)
+        period = self.get_period_ids(postings['period'])
+        amount = amount.astype(np.int64, copy=False)
+        #balance deltas of the whole batch, by (period, account)
+        self.grow_balances(len(self.periods), len(self.accounts))
+        n_cols = self._balances.shape[1]
+        delta = np.zeros(self._balances.size, dtype=np.int64)
+        np.add.at(delta, period.astype(np.int64) * n_cols + account, amount)
+        np.subtract.at(delta, period.astype(np.int64) * n_cols + counterparty, amount)
+        delta = delta.reshape(self._balances.shape)
+        violations = self.check_constraints(self._balances.sum(axis=0) + delta.sum(axis=0))
+        if violations:
+            #roll back names new to the rejected batch
+            for vocabulary, size in ((self.accounts, n_accounts), (self.periods, n_periods)):
+                for name in vocabulary.strings[size:]:
+                    del vocabulary.index[name]
+                del vocabulary.strings[size:]
+            self.stats['rejected'] += 1
+            raise ValueError('batch breaks constraints: ' + ', '.join(
+                f'{account} balance {balance} outside [{minimum}, {maximum}]'
+                for account, balance, minimum, maximum in violations
+                ))
+        batch = self.n_batches
+        self.append({'account': account, 'counterparty': counterparty, 'amount': amount, 'period': period, 'batch': batch})
+        self._balances += delta
+        self.n_batches += 1
+        self.stats['postings'] += len(amount)
+        self.stats['batches'] += 1
+        return batch
+
+    def reverse(self, rows):
+        """Post the opposite of posting rows, as one batch.
+
+        Returns:
+            int: the batch number
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return self.post({
+            'account': self.counterparty[rows],
+            'counterparty': self.account[rows],
+            'amount': self.amount[rows],
+            'period': self.period[rows],
+            })
+
+    def check_constraints(self, balances):
+        """Get (account, balance, minimum, maximum) for each constraint the
+        total balances break."""
+        violations = []
+        for account, (minimum, maximum) in self.constraints.items():
+            balance = int(balances[account]) if account < len(balances) else 0
+            if (minimum is not None and balance < minimum) or (maximum is not None and balance > maximum):
+                violations.append((self.accounts[account], balance, minimum, maximum))
+        return violations
+
+    # GETTERS
+
+    @property
+    def balances(self):
+        """Get the (period, account) balances, in minor units."""
+        return self._balances[:len(self.periods), :len(self.accounts)]
+
+    def get_balance(self, account, period=None):
+        """Get an account's balance in minor units, in a period or in
+        total."""
+        account_id = self.accounts.get(account)
+        if account_id < 0:
+            return 0
+        if period is None:
+            return int(self.balances[:, account_id].sum())
+        period_id = self.periods.get(period_key(period))
+        return int(self.balances[period_id, account_id]) if period_id >= 0 else 0
+
+    def get_trial_balance(self):
+        """Get {account: total balance} in minor units; the balances sum to
+        zero."""
+        return dict(zip(self.accounts.strings, self.balances.sum(axis=0).tolist()))
+
+    def postings(self, account=None, period=None):
+        """Get the posting rows debiting or crediting an account, in a
+        period."""
+        mask = np.ones(self.size, dtype=bool)
+        if account is not None:
+            account_id = self.accounts.get(account)
+            mask &= (self.account == account_id) | (self.counterparty == account_id)
+        if period is not None:
+            period_id = self.periods.get(period_key(period))
+            mask &= self.period == period_id
+        return np.flatnonzero(mask)
+
+    # EXPORT
+
+    def to_facts(self, concepts, entity, unit='iso4217:USD', dims=None, credit=()):
+        """Get the balances as facts for Table.add_facts: one per mapped
+        account and period with postings.
+
+        A duration's fact is the movement in it; an instant's is the
+        balance at that date, i.e. the sum of every period ending on or
+        before it.
+
+        Args:
+            concepts (dict): {account: concept 'prefix:Name'}; other
+            accounts are not exported
+            entity: identifier, or (scheme, identifier)
+            unit (str): measure
+            dims (dict): {dimension: member} for every fact, or None
+            credit: accounts reported credit-positive (e.g. liabilities,
+            equity, revenues), whose balances are negated
+        Returns:
+            dict: columnar facts, with values as exact decimal strings
+        """
+        credit = {self.accounts.get(account) for account in credit}
+        facts = {'concept': [], 'entity': [], 'period': [], 'dims': [], 'unit': [], 'decimals': [], 'value': []}
+        touched = np.zeros(self.balances.shape, dtype=bool)
+        touched[self.period, self.account] = True
+        touched[self.period, self.counterparty] = True
+        #running balances, over periods ordered by end date
+        ends = np.array([period[1] if isinstance(period, tuple) else period for period in self.periods.strings], dtype=str)
+        order = np.argsort(ends, kind='stable')
+        running = np.cumsum(self.balances[order], axis=0)
+        upto = np.searchsorted(ends[order], ends, side='right') - 1  #per period, its last row in running
+        for account, concept in concepts.items():
+            account_id = self.accounts.get(account)
+            if account_id < 0:
+                continue
+            sign = -1 if account_id in credit else 1
+            for period_id in np.flatnonzero(touched[:, account_id]).tolist():
+                period = self.periods[period_id]
+                balance = self.balances[period_id, account_id] if isinstance(period, tuple) else running[upto[period_id], account_id]
+                facts['concept'].append(concept)
+                facts['period'].append(period)
+                facts['value'].append(f'{Decimal(sign * int(balance)).scaleb(-self.decimals):f}')
+        n = len(facts['concept'])
+        facts['entity'] = [entity] * n
+        facts['dims'] = [dims] * n
+        facts['unit'] = [unit] * n
+        facts['decimals'] = [self.decimals] * n
+        return facts
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+
+ObjectStore Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .DtsCache import hash_file
+
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+
+
+class HashingWriter:
+    """File-like that hashes what it writes, for lxml's serializer."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.digest.update(data)
+        return self.f.write(data)
+
+
+class ObjectStore:
+    """Content-addressed store of exported documents: each distinct
+    content is stored once, as `objects/<sha256[:2]>/<sha256[2:]>`, and
+    hard-linked to wherever it is exported.
+
+    An export whose destination is already a link to the object is skipped,
+    so republishing many instances against one shared DTS costs a stat per
+    unchanged taxonomy document, rather than a copy.
+
+    Note:
+        * objects are read-only, because every link shares their content;
+        replace an exported file, rather than editing it in place
+        * where hard links are unavailable (another filesystem), objects are
+        copied
+        * file hashes are memoized by (path, size, mtime)
+
+    Usage:
+        store = ObjectStore(working_dir / 'cache' / 'objects')
+        digest = store.put_file('taxonomy/schema.xsd')
+        store.link(digest, 'out/schema.xsd')
+        with store.writer() as f:
+            tree.write(f)
+        store.link(f.digest.hexdigest(), 'out/instance.xbrl')
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        self._hashes = {}   #(path, size, mtime_ns) -> sha256
+        self.stats = {'stored': 0, 'deduplicated': 0, 'linked': 0, 'copied': 0, 'unchanged': 0}
+
+    def __repr__(self):
+        return f'ObjectStore(store_dir={str(self.store_dir)!r}, stats={self.stats})'
+
+    def object_path(self, digest):
+        return self.store_dir / digest[:2] / digest[2:]
+
+    # SETTERS
+
+    def hash_file(self, filepath):
+        """Get a file's sha256, memoized while its size and mtime hold."""
+        file_stat = os.stat(filepath)
+        key = (str(filepath), file_stat.st_size, file_stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = hash_file(filepath)
+        return self._hashes[key]
+
+    def add(self, temp_path, digest):
+        """Move a written temp file into the store, unless the object
+        already exists."""
+        object_path = self.object_path(digest)
+        if object_path.exists():
+            os.unlink(temp_path)
+            self.stats['deduplicated'] += 1
+        else:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(temp_path, object_path)
+            self.stats['stored'] += 1
+        return digest
+
+    def put_file(self, filepath):
+        """Store a file's content.
+
+        Returns:
+            str: sha256 hex digest
+        """
+        digest = self.hash_file(filepath)
+        if not self.object_path(digest).exists():
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.store_dir)
+            os.close(fd)
+            shutil.copyfile(filepath, temp_path)
+            return self.add(temp_path, digest)
+        self.stats['deduplicated'] += 1
+        return digest
+
+    @contextmanager
+    def writer(self):
+        """Get a context for writing new content into the store; once it
+        exits, the HashingWriter's digest is the object's key.
+
+        Usage:
+            with store.writer() as f:
+                f.write(b'...')
+            digest = f.digest.hexdigest()
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.store_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                writer = HashingWriter(f)
+                yield writer
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.add(temp_path, writer.digest.hexdigest())
+
+    def link(self, digest, dest):
+        """Export an object to `dest` as a hard link, or a copy.
+
+        Returns:
+            str: 'unchanged', 'linked' or 'copied'
+        """
+        object_path = self.object_path(digest)
+        dest = Path(dest)
+        try:
+            if os.path.samefile(object_path, dest):
+                self.stats['unchanged'] += 1
+                return 'unchanged'
+        except OSError:
+            pass
+        if dest.is_file() and dest.stat().st_size == object_path.stat().st_size and self.hash_file(dest) == digest:
+            #a copy, from a store on another filesystem
+            self.stats['unchanged'] += 1
+            return 'unchanged'
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        temp_dest = dest.with_name(f'.{dest.name}.{os.getpid()}.tmp')
+        try:
+            os.link(object_path, temp_dest)
+            result = 'linked'
+        except OSError:
+            shutil.copyfile(object_path, temp_dest)
+            result = 'copied'
+        os.replace(temp_dest, dest)
+        self.stats[result] += 1
+        return result
+
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+
+PackageIndex Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from arelle.FileSource import FileNamedTextIOWrapper, stripDeclarationBytes
+from arelle import XmlUtil
+
+from lxml import etree
+
+from pathlib import Path
+import io
+import json
+import mmap
+import os
+import posixpath
+import struct
+import zipfile
+import zlib
+
+
+CATALOG_NS = 'urn:oasis:names:tc:entity:xmlns:xml:catalog'
+TAXONOMY_PACKAGE_NS = 'http://xbrl.org/2016/taxonomy-package'
+MEMBER_SEP = '!/'   #package member paths are '<zip path>!/<member>'
+LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+
+class PackageIndex:
+    """Persistent index of a directory of taxonomy package zips, mapping
+    remapped URL prefixes (META-INF/catalog.xml rewriteURI) to zip members,
+    so that discovery resolves schemas and linkbases offline, straight from
+    memory-mapped zips.
+
+    The index (`index_dir/index.json`) records each package's remappings
+    and the data offset of every member, keyed by zip size and mtime, so a
+    restart only re-reads new or changed zips.  A member is read as a slice
+    of the zip's mmap, inflated if deflated.
+
+    The module is also an arelle plugin: with `plugin_options()` in the
+    RuntimeOptions, remapped URLs resolve to '<zip path>!/<member>' paths,
+    which are then read through the index instead of the web cache.
+
+    Note:
+        * packages are assumed immutable while registered; a replaced zip
+        is re-indexed on the next `register`
+        * package members are not local files, so they are not in the
+        DtsCache manifests
+
+    Usage:
+        index = PackageIndex(cache_dir / 'packages')
+        index.register('path/to/packages')
+        index.resolve('http://xbrl.fasb.org/us-gaap/2024/elts/us-gaap-2024.xsd')
+        options = RuntimeOptions(plugins=PackageIndex.plugin_path(), pluginOptions=index.plugin_options(), ...)
+    """
+
+    index_version = 1
+
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        self.index_path = self.index_dir / 'index.json'
+        self.packages = {}  #zip path -> {'size', 'mtime_ns', 'identifier', 'name', 'entry_points', 'remappings', 'members'}
+        self.prefixes = []  #(url prefix, zip path, member prefix), longest prefix first
+        self._zips = {}     #zip path -> (file, mmap)
+        self.stats = {'indexed': 0, 'reused': 0, 'resolved': 0, 'unresolved': 0, 'reads': 0}
+        self.load()
+
+    def __repr__(self):
+        return f'PackageIndex(index_dir={str(self.index_dir)!r}, packages={len(self.packages)}, stats={self.stats})'
+
+    def __getstate__(self):
+        #mmaps are per process: a pickled index (e.g. in worker options) reopens from disk
+        return {'index_dir': self.index_dir}
+
+    def __setstate__(self, state):
+        self.__init__(state['index_dir'])
+
+    # SETTERS
+
+    def load(self):
+        """Load the persisted index, if present and current."""
+        if not self.index_path.is_file():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == self.index_version:
+            self.packages = index['packages']
+            self.build_prefixes()
+
+    def save(self):
+        """Persist the index; written to a temp file, then swapped in."""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.index_version, 'packages': self.packages}, f)
+        os.replace(temp_path, self.index_path)
+
+    def register(self, directory, pattern='*.zip'):
+        """Index the package zips in a directory; unchanged zips are reused
+        from the persisted index and removed zips are dropped.
+
+        Returns:
+            list: registered zip paths
+        """
+        directory = Path(directory).resolve()
+        zip_paths = [str(path) for path in sorted(directory.glob(pattern)) if path.is_file()]
+        changed = False
+        for zip_path in [path for path in self.packages if Path(path).parent == directory and path not in zip_paths]:
+            self.close_zip(zip_path)
+            del self.packages[zip_path]
+            changed = True
+        for zip_path in zip_paths:
+            stat = os.stat(zip_path)
+            package = self.packages.get(zip_path)
+            if package and package['size'] == stat.st_size and package['mtime_ns'] == stat.st_mtime_ns:
+                self.stats['reused'] += 1
+                continue
+            self.close_zip(zip_path)
+            package = self.read_package(zip_path)
+            package.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self.packages[zip_path] = package
+            self.stats['indexed'] += 1
+            changed = True
+        if changed:
+            self.build_prefixes()
+            self.save()
+        return zip_paths
+
+    def build_prefixes(self):
+        self.prefixes = sorted(
+            (
+                (url_prefix, zip_path, member_prefix)
+                for zip_path, package in self.packages.items()
+                for url_prefix, member_prefix in package['remappings'].items()
+                ),
+            key=lambda prefix: len(prefix[0]),
+            reverse=True
+            )
+
+    @staticmethod
+    def read_package(zip_path):
+        """Read a package's catalog, metadata and member offsets.
+
+        Returns:
+            dict: identifier, name, entry_points, remappings (url prefix ->
+            member prefix) and members (member -> [data offset, compressed
+            size, size, compression])
+        """
+        with open(zip_path, 'rb') as f, zipfile.ZipFile(f) as zf:
+            infos = [info for info in zf.infolist() if not info.is_dir()]
+            names = [info.filename for info in infos]
+            catalogs = sorted((name for name in names if name.endswith('META-INF/catalog.xml')), key=len)
+            if not catalogs:
+                raise ValueError(f'not a taxonomy package, no META-INF/catalog.xml: {zip_path}')
+            catalog_dir = posixpath.dirname(catalogs[0])
+            remappings = {}
+            for rewrite in etree.fromstring(zf.read(catalogs[0])).iter(f'{{{CATALOG_NS}}}rewriteURI'):
+                rewrite_prefix = rewrite.get('rewritePrefix')
+                member_prefix = posixpath.normpath(posixpath.join(catalog_dir, rewrite_prefix))
+                if rewrite_prefix.endswith('/'):
+                    member_prefix += '/'
+                remappings[rewrite.get('uriStartString')] = member_prefix
+            identifier, name, entry_points = None, None, []
+            metadata = posixpath.join(catalog_dir, 'taxonomyPackage.xml')
+            if metadata in names:
+                root = etree.fromstring(zf.read(metadata))
+                identifier = root.findtext(f'{{{TAXONOMY_PACKAGE_NS}}}identifier')
+                name = root.findtext(f'{{{TAXONOMY_PACKAGE_NS}}}name')
+                entry_points = [
+                    doc.get('href')
+                    for doc in root.iter(f'{{{TAXONOMY_PACKAGE_NS}}}entryPointDocument')
+                    ]
+            members = {}
+            for info in infos:
+                f.seek(info.header_offset)
+                header = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+                data_offset = info.header_offset + LOCAL_HEADER.size + header[-2] + header[-1]
+                members[info.filename] = [data_offset, info.compress_size, info.file_size, info.compress_type]
+        return {
+            'identifier': identifier,
+            'name': name,
+            'entry_points': entry_points,
+            'remappings': remappings,
+            'members': members,
+        }
+
+    def open_zip(self, zip_path):
+        """Get the (cached) read-only mmap of a registered zip."""
+        if zip_path not in self._zips:
+            f = open(zip_path, 'rb')
+            self._zips[zip_path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return self._zips[zip_path][1]
+
+    def close_zip(self, zip_path):
+        f, mapped = self._zips.pop(zip_path, (None, None))
+        if mapped is not None:
+            mapped.close()
+            f.close()
+
+    def close(self):
+        """Unmap every zip."""
+        for zip_path in list(self._zips):
+            self.close_zip(zip_path)
+
+    # GETTERS
+
+    def resolve(self, url):
+        """Resolve a URL through the packages' remappings.
+
+        Returns:
+            tuple: (zip path, member), or None if no package remaps the url
+            to one of its members
+        """
+        for url_prefix, zip_path, member_prefix in self.prefixes:
+            if url.startswith(url_prefix):
+                member = member_prefix + url[len(url_prefix):]
+                if member in self.packages[zip_path]['members']:
+                    self.stats['resolved'] += 1
+                    return zip_path, member
+        self.stats['unresolved'] += 1
+        return None
+
+    def member_path(self, url):
+        """Get the '<zip path>!/<member>' path for a remapped URL, or None."""
+        resolved = self.resolve(url)
+        return MEMBER_SEP.join(resolved) if resolved else None
+
+    def split_member_path(self, path):
+        """Get (zip path, member) for a '<zip path>!/<member>' path of a
+        registered zip, or None."""
+        zip_path, sep, member = str(path).partition(MEMBER_SEP)
+        if sep and zip_path in self.packages:
+            return zip_path, member
+        return None
+
+    def exists(self, path):
+        split = self.split_member_path(path)
+        return split is not None and split[1] in self.packages[split[0]]['members']
+
+    def read(self, path_or_url):
+        """Read a member, given its member path or a remapped URL.
+
+        Returns:
+            bytes
+        """
+        resolved = self.split_member_path(path_or_url) or self.resolve(path_or_url)
+        if resolved is None:
+            raise FileNotFoundError(f'not in a registered package: {path_or_url}')
+        zip_path, member = resolved
+        try:
+            data_offset, compress_size, size, compress_type = self.packages[zip_path]['members'][member]
+        except KeyError:
+            raise FileNotFoundError(f'no member {member} in {zip_path}') from None
+        self.stats['reads'] += 1
+        mapped = self.open_zip(zip_path)
+        if compress_type == zipfile.ZIP_STORED:
+            return mapped[data_offset:data_offset + size]
+        if compress_type == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(mapped[data_offset:data_offset + compress_size], -zlib.MAX_WBITS, size or zlib.DEF_BUF_SIZE)
+        #other compressions are rare in packages: fall back to zipfile
+        with zipfile.ZipFile(zip_path) as zf:
+            return zf.read(member)
+
+    def get_entry_points(self):
+        """Get {package name or identifier: [entry point url]}."""
+        return {
+            package['name'] or package['identifier'] or zip_path: package['entry_points']
+            for zip_path, package in self.packages.items()
+            }
+
+    # ARELLE
+
+    @staticmethod
+    def plugin_path():
+        """Get the path to pass as arelle's `plugins` option."""
+        return str(Path(__file__).resolve())
+
+    def plugin_options(self):
+        """Get the arelle RuntimeOptions `pluginOptions` for this index."""
+        return {'packageIndex': self}
+
+
+#arelle plugin hooks: the index comes in through the run's options, and is
+#kept on the controller for the url and file hooks
+
+def filing_start(cntlr, options, *args, **kwargs):
+    cntlr.packageIndex = getattr(options, 'packageIndex', None)
+
+
+def transform_url(cntlr, url, base=None):
+    index = getattr(cntlr, 'packageIndex', None)
+    if index is None or url is None:
+        return url, False
+    if index.split_member_path(url) is not None:
+        return url, True
+    member_path = index.member_path(url)
+    if member_path is None:
+        return url, False
+    return member_path, True
+
+
+def file_source_file(cntlr, filepath, binary, stripDeclaration):
+    index = getattr(cntlr, 'packageIndex', None)
+    if index is None or index.split_member_path(filepath) is None:
+        return None
+    b = bytes(index.read(filepath))
+    if binary:
+        return (io.BytesIO(b), )
+    encoding = XmlUtil.encoding(b)
+    if stripDeclaration:
+        b = stripDeclarationBytes(b, encoding)
+    return (FileNamedTextIOWrapper(filepath, io.BytesIO(b), encoding=encoding), encoding)
+
+
+def file_source_exists(cntlr, filepath):
+    index = getattr(cntlr, 'packageIndex', None)
+    if index is None or index.split_member_path(filepath) is None:
+        return None
+    return index.exists(filepath)
+
+
+__pluginInfo__ = {
+    'name': 'PackageIndex',
+    'version': __version__,
+    'description': 'Resolves remapped taxonomy package urls from a PackageIndex',
+    'license': __license__,
+    'author': __author__,
+    'CntlrCmdLine.Filing.Start': filing_start,
+    'WebCache.TransformURL': transform_url,
+    'FileSource.File': file_source_file,
+    'FileSource.Exists': file_source_exists,
+}
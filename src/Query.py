@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+
+Query Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import FactStore
+from .Interning import unit_measure
+
+import numpy as np
+
+import datetime
+
+
+COLUMNS = ('row', 'concept', 'context', 'entity', 'unit', 'measure', 'start', 'end', 'instant', 'decimals', 'value', 'text', 'filing')
+
+
+def csr(keys, size):
+    """Get (order, indptr): the rows grouped by key, with `order[indptr[k]:
+    indptr[k + 1]]` the rows of key k, ascending."""
+    order = np.argsort(keys, kind='stable').astype(np.int64)
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=size)))).astype(np.int64)
+    return order, indptr
+
+
+def gather(order, indptr, keys):
+    """Get the sorted rows of several keys of a csr, without a python loop
+    over the keys."""
+    keys = np.asarray(keys, dtype=np.int64)
+    starts = indptr[keys]
+    lengths = indptr[keys + 1] - starts
+    positions = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return np.sort(order[positions])
+
+
+def as_date(value):
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        value = value.isoformat()
+    return np.datetime64(str(value)[:10], 'D')
+
+
+class Query:
+    """Indexed queries over the facts of one or many Tables.
+
+    Secondary indexes are built once per store: facts grouped by concept,
+    unit measures and context (CSR over the FactStore columns), and contexts by
+    (dimension, member).  A query gathers candidate rows from the most
+    selective fact index (concept, then unit), then applies entity, period,
+    dimension and filing predicates to the context table (thousands of
+    rows, not millions) and only checks the candidates' contexts.  Only the
+    requested columns are materialized.
+
+    Args:
+        sources: a Table, a FactStore, or an iterable of them; several are
+        combined once with FactStore.concat; sources without a fact store
+        (no model loaded) are skipped, and ValueError is raised if none has
+        one
+
+    Note:
+        * names are as in the FactStore: concepts, dimensions and members as
+        'prefix:Name', entities as 'scheme|identifier' or just the
+        identifier
+        * units are matched by their measures as the source writes them:
+        arelle and InstanceReader drop the iso4217 and xbrli prefixes
+        ('USD', 'USD / shares'), other measures are 'prefix:Name'; facts
+        whose unit is not declared match by unit id
+        * a period (start, end) matches instants within it and durations
+        inside it; either bound may be None
+
+    Usage:
+        query = Query(tables)
+        result = query.select(['entity', 'end', 'value'], concept='us-gaap:Revenues', period=('2024-01-01', '2024-03-31'))
+        query.count(dims={'us-gaap:StatementBusinessSegmentsAxis': 'ex:RetailMember'})
+        table.query(['concept', 'value'], entity='0000000001')
+    """
+
+    def __init__(self, sources):
+        if isinstance(sources, FactStore) or hasattr(sources, 'get_fact_store'):
+            sources = [sources]
+        stores = [source if isinstance(source, FactStore) else source.get_fact_store() for source in sources]
+        stores = [store for store in stores if store is not None]
+        if not stores:
+            raise ValueError('no facts to query: no sources, or no source has a fact store')
+        self.store = stores[0].freeze() if len(stores) == 1 else FactStore.concat(stores)
+        self.build_indexes()
+
+    def __repr__(self):
+        return f'Query(store={self.store!r})'
+
+    def __len__(self):
+        return len(self.store)
+
+    # INDEXES
+
+    def build_indexes(self):
+        store = self.store
+        n_names = len(store.names)
+        self.by_concept = csr(store.concept, n_names)
+        units = np.where(store.measure >= 0, store.measure, store.unit)
+        self.by_unit = csr(units + 1, n_names + 1)     #-1 (no unit) is key 0
+        self.by_context = csr(store.context, len(store.context_ids))
+        dim_keys = store.dim_dimension.astype(np.int64) * n_names + store.dim_member
+        order = np.argsort(dim_keys, kind='stable')
+        self.dim_keys = dim_keys[order]
+        self.dim_contexts = store.dim_context[order]
+        #entities by identifier, as well as 'scheme|identifier'
+        self.entities = {}
+        for entity in np.unique(store.ctx_entity[store.ctx_entity >= 0]).tolist():
+            name = store.names[entity]
+            self.entities.setdefault(name, []).append(entity)
+            self.entities.setdefault(name.rpartition('|')[2], []).append(entity)
+        self.ctx_first = np.where(store.ctx_instant, store.ctx_end, store.ctx_start)
+
+    def ids(self, names):
+        if isinstance(names, str):
+            names = [names]
+        ids = self.store.ids(names)
+        return ids[ids >= 0]
+
+    # QUERY
+
+    def context_mask(self, entity=None, period=None, dims=None, filing=None):
+        """Get a context-row mask for the context-level predicates, or None
+        if there are none."""
+        store = self.store
+        mask = None
+
+        def narrow(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if entity is not None:
+            entities = [entity] if isinstance(entity, str) else entity
+            narrow(np.isin(store.ctx_entity, [idx for name in entities for idx in self.entities.get(name, [])]))
+        if period is not None:
+            start, end = (as_date(bound) for bound in period)
+            condition = ~np.isnat(store.ctx_end)
+            if start is not None:
+                condition &= self.ctx_first >= start
+            if end is not None:
+                condition &= store.ctx_end <= end
+            narrow(condition)
+        for dimension, member in (dims or {}).items():
+            dimension_id, member_id = store.names.get(dimension), store.names.get(member)
+            condition = np.zeros(len(store.context_ids), dtype=bool)
+            if dimension_id >= 0 and member_id >= 0:
+                key = dimension_id * len(store.names) + member_id
+                lo, hi = np.searchsorted(self.dim_keys, [key, key + 1])
+                condition[self.dim_contexts[lo:hi]] = True
+            narrow(condition)
+        if filing is not None:
+            narrow(np.isin(store.ctx_filing, np.atleast_1d(filing)))
+        return mask
+
+    def rows(self, concept=None, unit=None, entity=None, period=None, dims=None, filing=None):
+        """Get the sorted fact rows matching every given filter; each may be
+        a value or a list.
+
+        Args:
+            concept: 'prefix:Name'
+            unit: measures, e.g. 'USD' or 'USD / shares'
+            entity: identifier, or 'scheme|identifier'
+            period (tuple): (start, end) dates or iso strings
+            dims (dict): {dimension: member}, all of which must match
+            filing: filing index, in the order of the sources
+        """
+        rows = None
+        if concept is not None:
+            rows = gather(*self.by_concept, self.ids(concept))
+        if unit is not None:
+            units = [unit] if isinstance(unit, str) else list(unit)
+            #measures, and unit ids for facts whose unit is not declared
+            unit_ids = np.unique(self.ids([unit_measure(measure) for measure in units] + units))
+            unit_rows = gather(*self.by_unit, unit_ids + 1)
+            rows = unit_rows if rows is None else np.intersect1d(rows, unit_rows, assume_unique=True)
+        mask = self.context_mask(entity, period, dims, filing)
+        if mask is not None:
+            if rows is None:
+                rows = gather(*self.by_context, np.flatnonzero(mask))
+            else:
+                rows = rows[mask[self.store.context[rows]]]
+        if rows is None:
+            rows = np.arange(len(self.store))
+        return rows
+
+    def count(self, **filters):
+        return len(self.rows(**filters))
+
+    def select(self, columns=None, **filters):
+        """Get the requested columns of the matching facts.
+
+        Args:
+            columns (list): of 'row', 'concept', 'context', 'entity', 'unit'
+            (id), 'measure', 'start', 'end', 'instant', 'decimals', 'value',
+            'text', 'filing'; defaults to all
+            filters: see rows()
+
+        Returns:
+            dict: {column: numpy array, or list of str for names and texts}
+        """
+        store = self.store
+        rows = self.rows(**filters)
+        contexts = store.context[rows]
+        result = {}
+        for column in columns or COLUMNS:
+            match column:
+                case 'row':
+                    result[column] = rows
+                case 'concept' | 'unit' | 'measure':
+                    result[column] = [store.names[idx] if idx >= 0 else None for idx in getattr(store, column)[rows].tolist()]
+                case 'context':
+                    result[column] = [store.context_ids[idx] for idx in contexts.tolist()]
+                case 'entity':
+                    result[column] = [store.names[idx] if idx >= 0 else None for idx in store.ctx_entity[contexts].tolist()]
+                case 'start' | 'end' | 'instant':
+                    result[column] = getattr(store, f'ctx_{column}')[contexts]
+                case 'decimals' | 'value':
+                    result[column] = getattr(store, column)[rows]
+                case 'text':
+                    result[column] = [store.texts[idx] if idx >= 0 else None for idx in store.text[rows].tolist()]
+                case 'filing':
+                    result[column] = [store.filings[idx] if idx < len(store.filings) else None for idx in store.filing[rows].tolist()]
+                case _:
+                    raise ValueError(f'unknown column: {column}')
+        return result
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+
+Renderer Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import Vocabulary, DECIMALS_NONE, DECIMALS_INF
+from .TaxonomyIndex import STANDARD_LABEL
+
+import numpy as np
+
+from decimal import Decimal
+from html import escape
+from pathlib import Path
+
+
+STYLE = '''body{font-family:sans-serif}
+table.statement{border-collapse:collapse;margin-bottom:2em}
+table.statement th,table.statement td{padding:2px 8px;border-bottom:1px solid #ddd}
+table.statement td.num{text-align:right;font-variant-numeric:tabular-nums}
+table.statement tr.abstract th{font-weight:bold}
+nav.slicers a{margin-right:1em}'''
+
+
+class Renderer:
+    """HTML statements from a FactStore and the presentation network of a
+    TaxonomyIndex: one table per extended link role (e.g. balance sheet,
+    income statement), concepts as rows and periods as columns.
+
+    Each role's row tree (depth-first over the presentation CSR, with
+    preferred labels) is compiled once into row header html, and facts are
+    placed into cells with numpy masks over the store's columns, so a
+    statement costs one pass over its own facts.  Output is a generator of
+    html chunks: `write` streams them to a file, so very large reports
+    (e.g. call reports) are never held whole in memory.
+
+    Dimensions are sliced: a statement shows the facts of one dimension
+    combination (by default, none); with `dims='all'` it is rendered once
+    per combination present, with slicer links between them.
+
+    Args:
+        index (TaxonomyIndex): labels and presentation network
+        store (FactStore): the instance's facts
+        lang (str): label language
+
+    Note:
+        * concepts are matched by 'prefix:Name', so the instance and the
+        taxonomy must use the same prefixes
+        * the first fact for a cell wins; duplicates are not rendered
+
+    Usage:
+        renderer = Renderer(taxonomy.get_index(), table.get_facts(columnar=True))
+        html = renderer.render(roles=['http://example.com/role/BalanceSheet'])
+        renderer.write('statements.html', dims='all')
+    """
+
+    def __init__(self, index, store, lang='en'):
+        self.index = index
+        self.store = store.freeze()
+        self.lang = lang
+        self._rows = {}     #role -> (store concept id per row, row header html, has children per row)
+        #dimension combination (slice) and period (column) of each context row
+        dims_by_context = [[] for _ in range(len(store.context_ids))]
+        for context, dimension, member in zip(store.dim_context.tolist(), store.dim_dimension.tolist(), store.dim_member.tolist()):
+            dims_by_context[context].append((store.names[dimension], store.names[member]))
+        self.slices = Vocabulary([()])
+        self.context_slice = np.array([self.slices.add(tuple(sorted(dims))) for dims in dims_by_context], dtype=np.int32)
+        starts = np.datetime_as_string(store.ctx_start)
+        ends = np.datetime_as_string(store.ctx_end)
+        self.periods = Vocabulary()
+        self.context_period = np.array([
+            self.periods.add((None if instant else start, end))
+            for start, end, instant in zip(starts.tolist(), ends.tolist(), store.ctx_instant.tolist())
+            ], dtype=np.int32)
+
+    def __repr__(self):
+        return f'Renderer(index={self.index!r}, store={self.store!r}, lang={self.lang!r})'
+
+    # ROWS
+
+    def get_roles(self, statements_only=False):
+        """Get the presentation roles, ordered by their definitions (e.g.
+        '0002 - Statement - Balance Sheet').
+
+        Args:
+            statements_only (bool): only roles defined as '- Statement -'
+        """
+        definitions = self.index.role_definitions
+        roles = sorted(self.index.get_roles('presentation'), key=lambda role: (definitions.get(role) or role))
+        if statements_only:
+            roles = [role for role in roles if ' - Statement - ' in (definitions.get(role) or '')]
+        return roles
+
+    def get_label(self, concept, preferred_label=None):
+        label = None
+        if preferred_label:
+            label = self.index.get_label(concept, preferred_label, self.lang)
+        return label or self.index.get_label(concept, STANDARD_LABEL, self.lang, default=concept)
+
+    def get_rows(self, role):
+        """Get a role's compiled rows, depth-first from its roots.
+
+        Returns:
+            tuple: (store concept id per row, -1 if absent; row header html
+            per row; has children per row)
+        """
+        if role in self._rows:
+            return self._rows[role]
+        network = self.index.networks['presentation']
+        rows = []
+        stack = [(root, 0, None, ()) for root in reversed(self.index.roots('presentation', role))]
+        while stack:
+            concept, depth, preferred_label, ancestors = stack.pop()
+            edges = self.index.edges(concept, 'presentation', role)
+            rows.append((concept, depth, preferred_label, len(edges) > 0))
+            ancestors += (concept,)
+            for child, label_role in reversed(list(zip(network['child'][edges].tolist(), network['preferred_label'][edges].tolist()))):
+                child = self.index.concepts[child]
+                if child not in ancestors:
+                    stack.append((child, depth + 1, self.index.roles[label_role] if label_role >= 0 else None, ancestors))
+        concept_ids = self.store.ids([concept for concept, *_ in rows]) if rows else np.empty(0, dtype=np.int32)
+        heads = [
+            f'<tr class="depth-{depth}{" abstract" if has_children else ""}">'
+            f'<th style="padding-left:{depth + 0.5}em">{escape(self.get_label(concept, preferred_label))}</th>'
+            for concept, depth, preferred_label, has_children in rows
+            ]
+        self._rows[role] = (concept_ids, heads, [has_children for *_, has_children in rows])
+        return self._rows[role]
+
+    # CELLS
+
+    def get_cells(self, concept_ids, slice_id):
+        """Place the facts of a statement's concepts and slice into cells.
+
+        Returns:
+            tuple: (period ids of the columns, most recent first;
+            {(store concept id, column): cell html})
+        """
+        store = self.store
+        wanted = np.zeros(len(store.names), dtype=bool)
+        wanted[concept_ids[concept_ids >= 0]] = True
+        mask = wanted[store.concept] & (self.context_slice[store.context] == slice_id)
+        facts = np.flatnonzero(mask)
+        fact_periods = self.context_period[store.context[facts]]
+        columns = sorted(
+            np.unique(fact_periods).tolist(),
+            key=lambda period: (self.periods[period][1], self.periods[period][0] or self.periods[period][1]),
+            reverse=True
+            )
+        column_of = {period: column for column, period in enumerate(columns)}
+        cells = {}
+        for concept, period, text, value, decimals in zip(
+            store.concept[facts].tolist(), fact_periods.tolist(), store.text[facts].tolist(),
+            store.value[facts].tolist(), store.decimals[facts].tolist()
+            ):
+            key = (concept, column_of[period])
+            if key not in cells:
+                cells[key] = self.format_cell(text, value, decimals)
+        return columns, cells
+
+    def format_cell(self, text, value, decimals):
+        """Get a fact's cell html from its FactStore text id, value and
+        decimals."""
+        if value != value:
+            return f'<td class="text">{escape(self.store.texts[text])}</td>' if text >= 0 else '<td class="nil"></td>'
+        if text >= 0:
+            #beyond float64's exact integers, format the lexical value
+            value = Decimal(self.store.texts[text].strip())
+            number = f'{value:,}' if decimals in (DECIMALS_NONE, DECIMALS_INF) else f'{value:,.{max(decimals, 0)}f}'
+            return f'<td class="num">{number}</td>'
+        if decimals in (DECIMALS_NONE, DECIMALS_INF):
+            number = f'{value:,.0f}' if value.is_integer() else f'{value:,}'
+        else:
+            number = f'{value:,.{max(decimals, 0)}f}'
+        return f'<td class="num">{number}</td>'
+
+    def get_period_heading(self, period):
+        start, end = self.periods[period]
+        return end if start is None else f'{start} to {end}'
+
+    def get_slicers(self, role):
+        """Get the dimension combinations with facts in a role's
+        statement, the default (no dimensions) first.
+
+        Returns:
+            list: [{dimension: member}]
+        """
+        concept_ids, _, _ = self.get_rows(role)
+        concepts = concept_ids[concept_ids >= 0]
+        mask = np.isin(self.store.concept, concepts)
+        slice_ids = np.unique(self.context_slice[self.store.context[mask]]).tolist()
+        return [dict(self.slices[slice_id]) for slice_id in slice_ids]
+
+    # EXPORT
+
+    def iter_statement(self, role, dims=None, anchor=None):
+        """Yield a statement's html, row by row.
+
+        Args:
+            role (str): extended link role
+            dims (dict): {dimension: member} slice, None for no dimensions
+            anchor (str): html id of the table
+        """
+        concept_ids, heads, _ = self.get_rows(role)
+        slice_id = self.slices.get(tuple(sorted((dims or {}).items())))
+        columns, cells = self.get_cells(concept_ids, slice_id) if slice_id >= 0 else ([], {})
+        title = self.index.role_definitions.get(role) or role
+        caption = escape(title) + ''.join(f'<br/>{escape(dimension)}: {escape(member)}' for dimension, member in sorted((dims or {}).items()))
+        anchor = f' id="{anchor}"' if anchor else ''
+        yield (
+            f'<table class="statement"{anchor} data-role="{escape(role)}">'
+            f'<caption>{caption}</caption>\n<thead><tr><th></th>'
+            + ''.join(f'<th>{escape(self.get_period_heading(period))}</th>' for period in columns)
+            + '</tr></thead>\n<tbody>\n'
+            )
+        empty = '<td></td>' * len(columns) + '</tr>\n'
+        for concept, head in zip(concept_ids.tolist(), heads):
+            if concept < 0 or not cells:
+                yield head + empty
+            else:
+                yield head + ''.join(cells.get((concept, column), '<td></td>') for column in range(len(columns))) + '</tr>\n'
+        yield '</tbody></table>\n'
+
+    def iter_html(self, roles=None, dims=None, title='XBRL statements'):
+        """Yield an html document of statements in chunks.
+
+        Args:
+            roles (list): extended link roles, defaults to every
+            presentation role
+            dims: a {dimension: member} slice, None for no dimensions, or
+            'all' for every slice present, with slicer links
+            title (str): document title
+        """
+        yield (
+            f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"/><title>{escape(title)}</title>'
+            f'<style>\n{STYLE}\n</style></head><body>\n'
+            )
+        for role_idx, role in enumerate(roles or self.get_roles()):
+            yield f'<section class="statement" data-role="{escape(role)}">\n'
+            if dims == 'all':
+                slicers = self.get_slicers(role) or [{}]
+                if len(slicers) > 1:
+                    yield '<nav class="slicers">' + ''.join(
+                        f'<a href="#s{role_idx}-{slice_idx}">{escape(", ".join(slicer.values()) or "Default")}</a>'
+                        for slice_idx, slicer in enumerate(slicers)
+                        ) + '</nav>\n'
+                for slice_idx, slicer in enumerate(slicers):
+                    yield from self.iter_statement(role, slicer, anchor=f's{role_idx}-{slice_idx}')
+            else:
+                yield from self.iter_statement(role, dims, anchor=f's{role_idx}-0')
+            yield '</section>\n'
+        yield '</body></html>\n'
+
+    def render(self, roles=None, dims=None, title='XBRL statements'):
+        """Get the html document as a string."""
+        return ''.join(self.iter_html(roles, dims, title))
+
+    def write(self, path_or_file, roles=None, dims=None, title='XBRL statements'):
+        """Stream the html document to a path or text file.
+
+        Returns:
+            int: characters written
+        """
+        chunks = self.iter_html(roles, dims, title)
+        if hasattr(path_or_file, 'write'):
+            return sum(path_or_file.write(chunk) for chunk in chunks)
+        path = Path(path_or_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            return sum(f.write(chunk) for chunk in chunks)
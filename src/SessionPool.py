@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+
+SessionPool Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from arelle.api.Session import Session
+
+from contextlib import contextmanager
+import threading
+import time
+
+
+class SessionPool:
+    """Bounded pool of warm arelle Sessions that Tables check out and return.
+
+    A Session pays arelle's controller, plugin, config and model-manager
+    startup on its first run; a pooled Session pays it once and is reused.
+
+    Note:
+        * arelle Sessions are thread-bound, and only one can run at a time per
+        process, so a checkout only reuses Sessions created by the calling
+        thread.  Use processes (TableFactory.create_xbrl_instance_tables) for
+        parallelism.
+        * when the pool is full and every idle Session belongs to another
+        thread, one is replaced rather than waited for.  A Session can only be
+        closed by its own thread, so the replaced one is retired, and closed
+        when its thread next checks out or checks in (or dropped, if it never
+        does).
+        * models loaded during a checkout stay open (keepOpen) for the length
+        of the checkout.  On checkin they are detached from the Session's model
+        manager, so ownership passes to the Table and the next checkout starts
+        with no models.
+        * the Session's log file is set by its first run; later runs log there.
+
+    Usage:
+        pool = SessionPool(max_size=2)
+        with pool.session() as session:
+            session.run(options)
+            xbrl_model = session.get_models()[0]
+        print(pool.stats)
+    """
+
+    def __init__(self, max_size=2, timeout=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []     #(owner thread id, Session), oldest first
+        self._owners = {}   #id(Session) -> owner thread id, for every pooled Session
+        self._retired = []  #(owner thread id, Session) replaced, to be closed by their owner
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'hits': 0,
+            'creations': 0,
+            'replacements': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'detached_models': 0,
+        }
+
+    def __repr__(self):
+        return f'SessionPool(size={self._size}, idle={len(self._idle)}, retired={len(self._retired)}, stats={self.stats})'
+
+    def create_session(self, thread_id):
+        session = Session()
+        self._owners[id(session)] = thread_id
+        self.stats['creations'] += 1
+        return session
+
+    def checkout(self, timeout=None):
+        """Get an idle Session from the calling thread, create one if the
+        pool is below `max_size`, replace another thread's idle Session, or
+        wait for one to be returned."""
+        timeout = self.timeout if timeout is None else timeout
+        thread_id = threading.get_ident()
+        started_at = time.perf_counter()
+        waited = False
+        self.close_retired()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError('session pool is closed')
+                session = None
+                for idx in range(len(self._idle) - 1, -1, -1):
+                    if self._idle[idx][0] == thread_id:
+                        session = self._idle.pop(idx)[1]
+                        self.stats['hits'] += 1
+                        break
+                if session is None and self._size < self.max_size:
+                    session = self.create_session(thread_id)
+                    self._size += 1
+                elif session is None and self._idle:
+                    #every idle Session belongs to another thread: retire the oldest
+                    owner, retired = self._idle.pop(0)
+                    self._owners.pop(id(retired), None)
+                    self._retired.append((owner, retired))
+                    session = self.create_session(thread_id)
+                    self.stats['replacements'] += 1
+                if session is not None:
+                    break
+                waited = True
+                remaining = None if timeout is None else timeout - (time.perf_counter() - started_at)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f'no arelle session available after {timeout}s')
+                self._cond.wait(remaining)
+            self.stats['checkouts'] += 1
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['wait_time'] += time.perf_counter() - started_at
+        return session
+
+    def checkin(self, session):
+        """Return a Session to the pool, detaching the models it loaded."""
+        self.detach_models(session)
+        with self._cond:
+            owner = self._owners.get(id(session), threading.get_ident())
+            if self._closed:
+                self._size -= 1
+                self._owners.pop(id(session), None)
+                self._retired.append((owner, session))
+            else:
+                self._idle.append((owner, session))
+            self._cond.notify()
+        self.close_retired()
+
+    def close_retired(self):
+        """Close the retired Sessions owned by the calling thread."""
+        thread_id = threading.get_ident()
+        with self._cond:
+            owned = [session for owner, session in self._retired if owner == thread_id]
+            self._retired = [(owner, session) for owner, session in self._retired if owner != thread_id]
+        for session in owned:
+            session.close()
+        return len(owned)
+
+    def detach_models(self, session):
+        """Remove loaded models from the Session's model manager without
+        closing them."""
+        models = session.get_models()   #the model manager's own list
+        if not models:
+            return
+        model_manager = models[0].modelManager
+        self.stats['detached_models'] += len(models)
+        models.clear()
+        model_manager.modelXbrl = None
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Check out a Session for the length of a `with` block."""
+        session = self.checkout(timeout)
+        try:
+            yield session
+        finally:
+            self.checkin(session)
+
+    def close(self):
+        """Close idle Sessions of the calling thread, and retire the others;
+        checked-out Sessions are retired on checkin."""
+        with self._cond:
+            self._closed = True
+            self._retired.extend(self._idle)
+            self._size -= len(self._idle)
+            self._idle = []
+            self._owners.clear()
+            self._cond.notify_all()
+        self.close_retired()
@@ -15,17 +15,46 @@ from arelle.logging.handlers.StructuredMessageLogHandler import StructuredMessag
 from arelle.RuntimeOptions import RuntimeOptions
 from arelle.ModelXbrl import ModelXbrl
 
+from .FactStore import FactStore
+from .TaxonomyIndex import TaxonomyIndex, STANDARD_LABEL
+from .Renderer import Renderer
+from .CalcCheck import CalcCheck
+from .Ledger import Ledger
+from .Query import Query
+from .InstanceReader import InstanceReader
+from .Validation import ValidationResult, capture_messages
+from .TaxonomyPackage import TaxonomyPackage
+from .PackageIndex import MEMBER_SEP
+from .FactWriter import FactWriter
+
 import xml.etree.ElementTree as ET
 from lxml import etree
 
 from pathlib import Path
 import io
 import os
+import shutil
 import zipfile
 import copy
 import datetime
 
 
+def write_xml_document(xml_document, f):
+    """Stream an arelle document's lxml tree to a binary file.
+
+    Namespaces added after parsing (XmlUtil.setXmlns) wrap the root in an
+    'nsmap' element; its children are written in its place, each with the
+    namespaces in scope.
+    """
+    root = xml_document.getroot()
+    if root.tag != 'nsmap':
+        xml_document.write(f, xml_declaration=True, encoding='utf-8')
+        return
+    f.write(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+    for node in root:
+        etree.ElementTree(node).write(f, encoding='utf-8')
+
+
 class Table:
     """Table class
     
@@ -33,21 +62,46 @@ class Table:
         * XBRL (xbrl_model) and DTS refer to the same collection of docs
         * XBRL must be instantiated with either instance doc or taxonomy
         * session.models() contains the doc collection
+        * with `lazy=True`, construction only sniffs the root element,
+        namespaces and schemaRefs (`sniffed`); arelle discovery and
+        validation run on first access to `xbrl_model` or `validation`
     """
 
     supported_suffixes = ['.xsd', '.xbrl', '.xbrli']
     schema_suffix = supported_suffixes[:1]
     instance_suffix = supported_suffixes[1:]
 
-    def __init__(self, options, name, filepath=None):
+    def __init__(self, options, name, filepath=None, dts_cache=None, session_pool=None, trusted=False, validation_cache=None, lazy=False, object_store=None, interner=None):
         #initialize
         self.options = RuntimeOptions(**options)
         self.name = name
-        filepath = Path(filepath)
-        if filepath.is_file() and filepath.suffix in Table.instance_suffix:
+        self.dts_cache = dts_cache   #shared DtsCache, typically owned by TableFactory
+        self.session_pool = session_pool    #shared SessionPool, typically owned by TableFactory
+        self.validation_cache = validation_cache    #shared ValidationCache, typically owned by TableFactory
+        self.object_store = object_store    #shared ObjectStore for exports, typically owned by TableFactory
+        self.interner = interner    #shared Interner of contexts and units, typically owned by TableFactory
+        self._xbrl_model = None
+        self._pending_load = None   #filepath to load on first access, in lazy mode
+        self._validation = None
+        self.sniffed = None
+        self.fact_store = None
+        self.fact_query = None  #Query over fact_store, built on first query()
+        filepath = Path(filepath) if filepath is not None else None
+        self.filepath = filepath
+        is_file = filepath is not None and filepath.is_file()
+        if is_file and filepath.suffix in Table.instance_suffix and trusted:
+            #trusted instance provided: stream facts, without DTS discovery
+            self.xbrl_model = None
+            self.fact_store = self.read_xbrl(filepath)
+        elif is_file and filepath.suffix in Table.supported_suffixes and lazy:
+            #defer discovery: sniff the entry point only
+            self.options.entrypointFile = str(filepath)
+            self.sniffed = InstanceReader(filepath).sniff()
+            self._pending_load = filepath
+        elif is_file and filepath.suffix in Table.instance_suffix:
             #instance provided
             self.xbrl_model = self.load_xbrl(filepath)
-        elif filepath.is_file() and filepath.suffix in Table.schema_suffix:
+        elif is_file and filepath.suffix in Table.schema_suffix:
             #taxonomy provided
             self.xbrl_model = self.load_xbrl(filepath)
         else:
@@ -57,11 +111,53 @@ class Table:
         self.constraints = {}
 
     def __repr__(self):
-        pass    
+        return f'{type(self).__name__}(name={self.name!r}, filepath={self.filepath!r}, loaded={self.is_loaded})'
+
+    @property
+    def is_loaded(self):
+        """Check whether a lazy Table's model has been loaded."""
+        return self._pending_load is None
+
+    @property
+    def xbrl_model(self):
+        """The arelle ModelXbrl; in lazy mode it is loaded on first access."""
+        if self._pending_load is not None:
+            filepath, self._pending_load = self._pending_load, None
+            self._xbrl_model = self.load_xbrl(filepath)
+        return self._xbrl_model
+
+    @xbrl_model.setter
+    def xbrl_model(self, xbrl_model):
+        self._pending_load = None
+        self._xbrl_model = xbrl_model
+
+    @property
+    def validation(self):
+        """The ValidationResult of the last load; in lazy mode the model is
+        loaded (and validated) on first access."""
+        if self._validation is None and self._pending_load is not None:
+            self.xbrl_model
+        return self._validation
+
+    @validation.setter
+    def validation(self, validation):
+        self._validation = validation
 
     # SETTERS
 
-    def validate_xbrl(self, model_xbrls):
+    def open_session(self):
+        """Get a Session context: a checkout from the `session_pool`, if
+        provided, otherwise a new Session.
+
+        Usage:
+            with self.open_session() as session:
+                session.run(self.options)
+        """
+        if self.session_pool is not None:
+            return self.session_pool.session()
+        return Session()
+
+    def validate_xbrl(self, model_xbrls, log_messages=None, verbose=False):
         """Validate XBRL string as either instance or taxonomy.  All
         error-handling logic is contained, here.
 
@@ -72,26 +168,36 @@ class Table:
         (either locally or via a network).
 
         Args:
-            xbrl_file_path (str): The path to the XBRL instance document.
+            model_xbrls (list): loaded ModelXbrl, the first is the entry point
+            log_messages (list): structured arelle messages captured during
+            the run (see Validation.capture_messages); if None, only the
+            models' error codes are used
+            verbose (bool): print the result
 
         Returns:
-            bool: True if the document is valid and no errors are found, False otherwise.
+            ValidationResult: truthy if the document is valid and no errors are found
         
         """
         try:
-            for model_xbrl in model_xbrls:
-                xbrl_file_path = model_xbrl.fileSource.url
-                if model_xbrl.errors:
-                    print(f"Validation error found in {xbrl_file_path}:")
-                    for error in model_xbrl.errors:
-                        print(f"  - {error}")
-                    return False
-                else:
-                    print(f"Validation successful for '{xbrl_file_path}.  No errors found.")
-            return True
+            if log_messages is None:
+                result = ValidationResult.from_model_xbrls(model_xbrls)
+            else:
+                entrypoint = model_xbrls[0].fileSource.url
+                documents = [
+                    doc.filepath for model_xbrl in model_xbrls
+                    for doc in model_xbrl.urlDocs.values()
+                    ]
+                result = ValidationResult.from_log(entrypoint, log_messages, documents)
         except Exception as e:
-            print(f"an unexpected error occurred during validation: {e}")
-            return False
+            result = ValidationResult(None, [{
+                'code': 'exception',
+                'level': 'ERROR',
+                'message': f"an unexpected error occurred during validation: {e}",
+                'document': None,
+            }])
+        if verbose:
+            result.print()
+        return result
     
     def load_xbrl(self, filepath=None):
         """Load xbrl from a file path or directly from string.
@@ -114,18 +220,96 @@ class Table:
             The session.get_model() method then gives you access to the fully
             discovered and loaded DTS, represented by the ModelXbrl object.
 
+            If the Table has a `dts_cache`, an unchanged entry point (and DTS)
+            is returned from the cache without re-discovery.  The model is
+            shared with other Tables loading the same entry point, until one
+            mutates it (see detach_xbrl_model).
+
+            If the Table has a `validation_cache` (and a `dts_cache`), the
+            DTS is discovered without validation, then validated against
+            the cache: an unchanged DTS is not validated again, and taxonomy
+            documents already validated skip arelle's DTS checks, so only
+            the instance and the changed documents are checked (see
+            ValidationCache).  The result is kept in `self.validation`.
+
         """
         #prepare options
         self.options.entrypointFile = str(filepath)  #filelike_content
-        self.options.validate = True
+        #check caches
+        use_cache = self.dts_cache is not None and self.validation_cache is not None
+        cached_validation = None
+        if use_cache:
+            manifest = self.dts_cache.get_manifest(filepath)
+            cached_validation = self.validation_cache.lookup(filepath, manifest)
+        if self.dts_cache is not None:
+            xbrl_model = self.dts_cache.get(filepath)
+            if xbrl_model is not None:
+                self.validation = cached_validation if cached_validation is not None else self.validate_xbrl([xbrl_model])
+                return xbrl_model
+        self.options.validate = not use_cache
         #run
-        with Session() as session:
+        plan = None
+        with self.open_session() as session, capture_messages() as handler:
             session.run(self.options)
-            xbrl_models = session.get_models()    #.modelManager.modelXbrls
+            xbrl_models = list(session.get_models())    #copy: the pool detaches .modelManager.modelXbrls on checkin
             xbrl_model = xbrl_models[0]
-            self.validate_xbrl(xbrl_models)
+            if self.dts_cache is not None and xbrl_model.modelDocument is not None:
+                self.dts_cache.put(filepath, xbrl_model)
+            if use_cache and xbrl_model.modelDocument is not None:
+                manifest = self.dts_cache.get_manifest(filepath)
+                cached_validation = self.validation_cache.lookup(filepath, manifest)
+                if cached_validation is None:
+                    plan = self.validation_cache.plan(manifest)
+                    self.validate_incremental(xbrl_model, plan['skip'])
+        if cached_validation is not None:
+            self.validation = cached_validation
+        else:
+            self.validation = self.validate_xbrl(xbrl_models, handler.messages)
+            if plan is not None:
+                self.validation = self.validation_cache.merge(self.validation, plan)
+                self.validation_cache.store(self.validation, manifest)
         return xbrl_model
+
+    @staticmethod
+    def validate_incremental(xbrl_model, skip=()):
+        """Run arelle validation on a loaded model, skipping the DTS checks
+        of the documents in `skip` (filepaths)."""
+        from arelle import Validate
+
+        skipped = [(doc, doc.skipDTS) for doc in xbrl_model.urlDocs.values() if getattr(doc, 'filepath', None) in skip]
+        for doc, _ in skipped:
+            doc.skipDTS = True
+        try:
+            Validate.validate(xbrl_model)
+        finally:
+            for doc, skip_dts in skipped:
+                doc.skipDTS = skip_dts
     
+    def detach_xbrl_model(self):
+        """Make the model private to this Table, before mutating it: it is
+        released from the `dts_cache`, and reloaded without the cache if
+        other Tables still share it."""
+        xbrl_model = self.xbrl_model
+        if self.dts_cache is not None and xbrl_model is not None and self.dts_cache.release(xbrl_model):
+            dts_cache, self.dts_cache = self.dts_cache, None
+            try:
+                self.xbrl_model = self.load_xbrl(self.filepath)
+            finally:
+                self.dts_cache = dts_cache
+        return self.xbrl_model
+
+    def read_xbrl(self, filepath):
+        """Read a trusted instance into a FactStore with the streaming
+        InstanceReader, bypassing arelle discovery and validation.
+
+        To validate afterwards, as an opt-in second pass:
+            table.xbrl_model = table.load_xbrl(table.filepath)
+        """
+        self.options.entrypointFile = str(filepath)
+        if self.interner is not None:
+            return FactStore.from_summary(self.interner.intern_summary(InstanceReader(filepath).to_summary()))
+        return InstanceReader(filepath).to_fact_store()
+
     def create_instance_from_taxonomy(self, instance_path):
         """After XBRL is loaded with taxonomy, create the instance doc.
         
@@ -136,7 +320,7 @@ class Table:
             raise Exception(f'must provide a path for the new instance doc')
         if Path(self.options.entrypointFile).suffix != '.xsd':
             raise Exception(f'options entrypointFile suffix must be .xsd')
-        with Session() as session:
+        with self.open_session() as session:
             #prepare schema
             session.run(self.options)
             xbrl_models = [
@@ -183,6 +367,41 @@ class Table:
         self.xbrl_model = taxonomy_dts
         return True
 
+    def add_facts(self, facts, scheme='http://www.sec.gov/CIK', batch_size=10_000, validate=True):
+        """Add facts to the instance in bulk, through a FactWriter: contexts
+        and units are deduplicated, and facts are appended in batches.
+
+        Args:
+            facts: an iterable of (concept, entity, period, dims, unit,
+            decimals, value) tuples or dicts with those keys, or a columnar
+            dict of sequences with those keys
+            * concept: 'prefix:Name', '{namespace}Name' or QName
+            * entity: identifier, or (scheme, identifier)
+            * period: end date for an instant, (start, end) for a duration,
+            or None for forever; dates or 'yyyy-mm-dd' strings
+            * dims: {dimension: member} as 'prefix:Name', or None
+            * unit: measure, e.g. 'iso4217:USD', or numerator/denominator,
+            e.g. 'iso4217:USD/xbrli:shares', or None for non-numeric facts
+            * decimals: int, 'INF', or None
+            * value: number, string, or None for a nil fact
+            scheme (str): entity scheme for bare identifiers
+            batch_size (int): facts per batch
+            validate (bool): schema-validate each new element, so values
+            are typed (`xValue`); skip for trusted data
+        Returns:
+            dict: counts of facts added, and contexts and units created
+        Usage:
+            table.add_facts([
+                ('us-gaap:Revenues', '0000000001', ('2024-01-01', '2024-12-31'), None, 'iso4217:USD', 0, 1000),
+                ('us-gaap:Cash', '0000000001', '2024-12-31', {'us-gaap:StatementScenarioAxis': 'us-gaap:ScenarioActualMember'}, 'iso4217:USD', 0, 50),
+                ])
+            table.add_facts({'concept': concepts, 'entity': entities, 'period': periods, 'dims': dims, 'unit': units, 'decimals': decimals, 'value': values})
+        """
+        writer = FactWriter(self.detach_xbrl_model(), scheme=scheme, validate=validate)
+        stats = writer.add(facts, batch_size=batch_size)
+        self.fact_store = None  #rebuilt on the next get_facts(columnar=True)
+        return stats
+
     def create_default_schema(self, xbrl_model=None):
         """Get a default schema if Table not provided with either
         instance doc or taxonomy.
@@ -239,21 +458,43 @@ class Table:
     
     # GETTERS
 
+    def get_sniffed(self):
+        """Get the entry point's root, namespaces, schemaRefs and
+        linkbaseRefs (see InstanceReader.sniff); a Table that was not lazy
+        sniffs its entry point on first call."""
+        if self.sniffed is None:
+            if self.filepath is not None and self.filepath.is_file():
+                self.sniffed = InstanceReader(self.filepath).sniff()
+            else:
+                self.sniffed = {'root': None, 'namespace': None, 'namespaces': {}, 'target_namespace': None, 'schema_refs': [], 'linkbase_refs': []}
+        return self.sniffed
+
     def get_metadata(self):
         """Get the xbrl model metadata.
+
+        The sniffed entry point (root, namespaces, schemaRefs and
+        linkbaseRefs) is always included; a lazy Table that is not loaded
+        yet returns only that, without loading the model.
         
         Usage:
             metadata = table.get_metadta()
+            metadata['schema_refs']
+            if metadata['loaded']:
+                metadata['dts_doc_count']
         """
+        if not self.is_loaded:
+            return dict(self.get_sniffed(), entrypoint_doc=str(self.filepath), loaded=False)
         entry_doc = self.xbrl_model.modelDocument #the entry point ModelDocument
         all_docs = list(self.xbrl_model.urlDocs.values())
-        metadata = {
+        metadata = dict(self.get_sniffed())
+        metadata.update({
             'entrypoint_doc': entry_doc.uri,
             'dts_doc_count': len(all_docs),
             'contexts': self.xbrl_model.contexts,
             'units': self.xbrl_model.units,
-            'relationships': self.xbrl_model.relationshipSets
-        }
+            'relationships': self.xbrl_model.relationshipSets,
+            'loaded': True,
+        })
         return metadata
 
     def get_dts_docs(self, verbose=False):
@@ -297,51 +538,289 @@ class Table:
                 schema_documents = etree.tostring(schema_root, pretty_print=True, encoding='unicode')
         return schema_documents
     
-    def get_facts(self):
+    def get_facts(self, columnar=False):
         """Get xbrl instance facts.
+
+        Args:
+            columnar (bool): return the FactStore, rather than ModelFacts
         
         Usage:
             facts = table.get_facts()
             print( facts[0].qname.localName )
             print( facts[0].value )
             print( facts[0].contextID )
+
+            store = table.get_facts(columnar=True)
+            store.aggregate(by='concept')
+
+            revenues = table.query(['context', 'value'], concept='us-gaap:Revenues')
+        Note:
+            after drop_xbrl_model(), facts are (concept, context_id, unit_id,
+            decimals, value) tuples from the FactStore
         """
+        if columnar:
+            return self.get_fact_store()
         if self.xbrl_model:
             return list(self.xbrl_model.facts)
+        if self.fact_store is not None:
+            return self.fact_store.to_records()
+
+    def get_fact_store(self):
+        """Get the columnar FactStore, built once from the xbrl model.
+
+        With an `interner`, the store's contexts and units are the interned
+        ones: context ids are canonical and `ctx_key` holds their hashes.
+        """
+        if self.fact_store is None and self.xbrl_model:
+            summary = self.get_summary()
+            if self.interner is not None:
+                summary = self.interner.intern_summary(summary)
+            self.fact_store = FactStore.from_summary(summary)
+        return self.fact_store
+
+    def query(self, columns=None, **filters):
+        """Select columns of the facts matching filters, through the
+        indexes of a Query over the FactStore (built on first use).
+
+        Args:
+            columns (list): see Query.select
+            filters: concept, unit, entity, period, dims, see Query.rows
+        Usage:
+            result = table.query(['concept', 'end', 'value'], period=('2024-01-01', '2024-03-31'))
+            result = table.query(concept=['us-gaap:Assets', 'us-gaap:Liabilities'], dims={'us-gaap:StatementScenarioAxis': 'us-gaap:ScenarioActualMember'})
+        """
+        store = self.get_fact_store()
+        if self.fact_query is None or self.fact_query.store is not store:
+            self.fact_query = Query(store)
+        return self.fact_query.select(columns, **filters)
+
+    def get_summary(self):
+        """Get a lightweight, picklable summary of the instance's contexts,
+        units and facts, built from plain python types only.
+
+        Usage:
+            summary = table.get_summary()
+            concept, context_id, unit_id, decimals, value = summary['facts'][0]
+            summary['contexts'][context_id]['dims']
+        """
+        summary = {
+            'path': self.options.entrypointFile,
+            'error': None,
+            'errors': [],
+            'contexts': {},
+            'units': {},
+            'facts': [],
+        }
+        if not self.xbrl_model:
+            if self.fact_store is not None and self.filepath is not None and self.filepath.is_file():
+                #trusted instance: re-stream, since the model was never loaded
+                summary.update(InstanceReader(self.filepath).to_summary())
+            return summary
+        summary['errors'] = [str(error) for error in self.xbrl_model.errors]
+        for context_id, context in self.xbrl_model.contexts.items():
+            period = {}
+            if context.period is not None:
+                period = {
+                    etree.QName(el).localname: (el.text or '').strip()
+                    for el in context.period.iterchildren() if isinstance(el.tag, str)
+                    }
+            dims = {}
+            for dim_qname, dim_value in context.qnameDims.items():
+                if dim_value.isExplicit:
+                    dims[str(dim_qname)] = str(dim_value.memberQname)
+                else:
+                    dims[str(dim_qname)] = dim_value.typedMember.stringValue
+            summary['contexts'][context_id] = {
+                'entity': tuple(context.entityIdentifier),
+                'start': period.get('startDate'),
+                'end': period.get('endDate', period.get('instant')),
+                'instant': 'instant' in period,
+                'dims': dims,
+            }
+        for unit_id, unit in self.xbrl_model.units.items():
+            summary['units'][unit_id] = unit.value
+        #document order, with tuples' items in place
+        facts = list(reversed(self.xbrl_model.facts))
+        while facts:
+            fact = facts.pop()
+            if fact.isTuple:
+                facts.extend(reversed(fact.modelTupleFacts))
+                continue
+            summary['facts'].append((
+                str(fact.qname),
+                fact.contextID,
+                fact.unitID,
+                fact.decimals,
+                None if fact.isNil else fact.value.strip(),
+            ))
+        return summary
+
+    def drop_xbrl_model(self):
+        """Build the FactStore, then release the arelle model and its lxml
+        trees.  A model still held by the `dts_cache`, or shared with other
+        Tables, is left open for them.
+        """
+        self.get_fact_store()
+        if self.xbrl_model and not (self.dts_cache is not None and self.dts_cache.holds(self.xbrl_model)):
+            if self.dts_cache is None or not self.dts_cache.release(self.xbrl_model):
+                self.xbrl_model.close()
+        self.xbrl_model = None
+        return self.fact_store
 
     # EXPORT
       
     def to_file(self, filepath):
-        """Export Instance and DTS package to filepath.
-        
+        """Export the Instance, and its local DTS documents, to filepath.
+
+        The instance is streamed from its lxml tree by lxml's serializer,
+        hashed as it is written.  Local DTS documents keep their location
+        relative to the instance; those with a source file are exported
+        from it, unchanged, and only in-memory documents are serialized.
+        Remote documents are left to their urls, and documents outside the
+        instance's directory (e.g. '../shared.xsd') are skipped, not written
+        above filepath.
+
+        With an `object_store` (see ObjectStore), every document is stored
+        by content and hard-linked into place, so a document already
+        exported with the same content is skipped.  Republishing instances
+        against one shared DTS then writes only the instances.
+
+        Args:
+            filepath (str): instance output path
+        Returns:
+            dict: {output path: 'written', 'linked', 'copied' or 'unchanged'},
+            and {source path: 'skipped'} for documents outside the
+            instance's directory
         Usage:
             table.to_file(filepath)
         """
-        self.xbrl_model.saveInstance()
-        self.xbrl_model.saveDTSpackage()
-    
-    def to_taxonomy_package_zip(self, source_dir, output_zip_path):
+        filepath = Path(filepath)
+        if self.xbrl_model is None:
+            #trusted table: no model, export the source instance
+            return {str(filepath): self.export_document(filepath, source=self.filepath)}
+        instance = self.xbrl_model.modelDocument
+        source_dir = Path(instance.filepath).parent
+        results = {str(filepath): self.export_document(filepath, xml_document=instance.xmlDocument)}
+        for doc in self.xbrl_model.urlDocs.values():
+            doc_path = getattr(doc, 'filepath', None)
+            if doc is instance or not doc_path or doc.uri.startswith(('http://', 'https://')):
+                continue
+            dest = filepath.parent / os.path.relpath(doc_path, source_dir)
+            if not dest.resolve().is_relative_to(filepath.parent.resolve()):
+                #outside the instance's directory: do not write above filepath
+                results[str(doc_path)] = 'skipped'
+            elif os.path.isfile(doc_path):
+                results[str(dest)] = self.export_document(dest, source=doc_path)
+            elif doc.xmlDocument is not None and MEMBER_SEP not in doc_path:
+                results[str(dest)] = self.export_document(dest, xml_document=doc.xmlDocument)
+        return results
+
+    def export_document(self, dest, xml_document=None, source=None):
+        """Export one document, from its lxml tree or a source file.
+
+        Returns:
+            str: 'written', 'linked', 'copied' or 'unchanged'
+        """
+        dest = Path(dest)
+        if self.object_store is not None:
+            if source is not None:
+                digest = self.object_store.put_file(source)
+            else:
+                with self.object_store.writer() as f:
+                    write_xml_document(xml_document, f)
+                digest = f.digest.hexdigest()
+            return self.object_store.link(digest, dest)
+        if source is not None and dest.exists() and os.path.samefile(source, dest):
+            return 'unchanged'
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if source is not None:
+            shutil.copyfile(source, dest)
+        else:
+            with open(dest, 'wb') as f:
+                write_xml_document(xml_document, f)
+        return 'written'
+
+    def to_html(self, filepath=None, taxonomy=None, roles=None, dims=None, lang='en'):
+        """Render the facts as html statements (see Renderer), one per
+        presentation role, with periods as columns.
+
+        Args:
+            filepath (str): stream the document to this file; if None, the
+            html is returned as a string
+            taxonomy (Taxonomy or TaxonomyIndex): presentation and labels;
+            defaults to an index of this table's own DTS
+            roles (list): extended link roles, defaults to all
+            dims: {dimension: member} slice, or 'all' for every slice
+            lang (str): label language
+        Returns:
+            str: the html, or the number of characters written to `filepath`
+        Usage:
+            html = table.to_html(taxonomy=taxonomy, roles=[balance_sheet_role])
+            table.to_html('statements.html', dims='all')
+        """
+        index = taxonomy.get_index() if hasattr(taxonomy, 'get_index') else taxonomy
+        if index is None:
+            if not self.xbrl_model:
+                raise ValueError('a taxonomy is required to render a table without a model')
+            index = TaxonomyIndex.from_model(self.xbrl_model)
+        renderer = Renderer(index, self.get_fact_store(), lang=lang)
+        if filepath is None:
+            return renderer.render(roles, dims)
+        return renderer.write(filepath, roles, dims)
+
+    def check_calculations(self, taxonomy=None):
+        """Check the facts against the calculation linkbase (see CalcCheck):
+        every summation, in every context and unit, in one vectorized pass.
+
+        Args:
+            taxonomy (Taxonomy or TaxonomyIndex): calculation network;
+            defaults to an index of this table's own DTS
+        Returns:
+            ValidationResult: a 'calc:inconsistentCalculation' error per
+            summation that does not foot
+        Usage:
+            result = table.check_calculations(taxonomy)
+            result.print()
+        """
+        if hasattr(taxonomy, 'get_calc_check'):
+            check = taxonomy.get_calc_check()
+        else:
+            index = taxonomy.get_index() if hasattr(taxonomy, 'get_index') else taxonomy
+            if index is None:
+                if not self.xbrl_model:
+                    raise ValueError('a taxonomy is required to check a table without a model')
+                index = TaxonomyIndex.from_model(self.xbrl_model)
+            check = CalcCheck(index)
+        return check.validate(self.get_fact_store(), entrypoint=self.filepath)
+
+    def to_taxonomy_package_zip(self, source_dir, output_zip_path, update=True, **metadata):
         """Create `taxonomy package` .zip file from a source directory.
-        
+
+        Members are compressed in parallel and written in a deterministic
+        order, with generated META-INF/taxonomyPackage.xml and catalog.xml
+        (unless the source has them).  See TaxonomyPackage.
+
         Args:
             source_dir (str): The path to the directory containing the taxonomy files.
             output_zip_path (str): The desired path for the output ZIP file.
+            update (bool): copy members unchanged since an existing package
+            at `output_zip_path` without recompressing them
+            metadata: TaxonomyPackage arguments, such as identifier,
+            version, entry_points and remappings
+        Returns:
+            dict: build stats
         Usage:
             taxonomy_source_directory = 'path/to/your/taxonomy_files'
             output_zip_file = 'my_taxonomy_package.zip'
-            create_taxonomy_package_zip(taxonomy_source_directory, output_zip_file)
-        Note:
-        must use the `zipfile` module
+            table.to_taxonomy_package_zip(
+                taxonomy_source_directory, output_zip_file,
+                identifier='http://example.com/taxonomy/2024',
+                remappings={'http://example.com/taxonomy/': 'example.com/taxonomy/'},
+                )
         """
-        with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(source_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    #calculate the relative path within the zip file
-                    arcname = os.path.relpath(file_path, source_dir)
-                    zipf.write(file_path, arcname)
-        print(f'Taxonomy package created at {output_zip_path}')
-        return True
+        package = TaxonomyPackage(source_dir, **metadata)
+        package.build(output_zip_path, update=update)
+        return package.stats
 
 
 
@@ -359,8 +838,8 @@ class Instance(Table):
         * crud rules to display marking
     """
 
-    def __init__(self, options, name, path_or_str=None):
-        super().__init__(options, name, path_or_str)
+    def __init__(self, options, name, path_or_str=None, **kwargs):
+        super().__init__(options, name, path_or_str, **kwargs)
 
 
 class Taxonomy(Table):
@@ -372,41 +851,92 @@ class Taxonomy(Table):
         * update with ontology structure
     """
 
-    def __init__(self, options, name, path_or_str=None):
-        super().__init__(options, name, path_or_str)
+    def __init__(self, options, name, path_or_str=None, **kwargs):
+        super().__init__(options, name, path_or_str, **kwargs)
+        self.index = None   #TaxonomyIndex, built on first use
+        self.calc_check = None  #CalcCheck, compiled from the index on first use
 
-    def get_concept_labels(self):
-        """..."""
-        # A specific label role (e.g., standard, terse) and language can be specified.
-        # The standard label role is the default.
-        label_role = "http://www.xbrl.org/2003/role/label"
-        label_lang = "en"
-        if self.xbrl_model:
-            # Iterate over all concepts in the DTS
-            for concept in self.xbrl_model.qnameConcepts.values():
-                # Get the label for the concept based on the specified role and language
-                label = concept.label(preferredLabel=label_role, lang=label_lang, returnGen=False)
-
-                # Print the concept name and its label, if found
-                if label:
-                    print(f"Concept: {concept.name}, Label: {label}")
-                else:
-                    print(f"Concept: {concept.name}, Label: No label found for role '{label_role}' and language '{label_lang}'")
+    def get_index(self):
+        """Get the TaxonomyIndex of labels and relationship networks,
+        built once per DTS.
+
+        With a `dts_cache`, the index is saved next to the taxonomy manifest
+        (see DtsCache.taxonomy_key) and reloaded while the taxonomy is
+        unchanged, so a lazy Taxonomy answers label and relationship lookups
+        without loading the model, and instances against one taxonomy share
+        one index.
+        """
+        if self.index is not None:
+            return self.index
+        index_path = None
+        if self.dts_cache is not None and self.filepath is not None and self.filepath.is_file():
+            key = self.dts_cache.taxonomy_key(self.filepath)
+            index_path = self.dts_cache.artifact_path(key, 'taxonomy.npz')
+            if index_path.is_file() and self.dts_cache.is_current(key):
+                self.index = TaxonomyIndex.load(index_path)
+                return self.index
+        self.index = TaxonomyIndex.from_model(self.xbrl_model)
+        if index_path is not None and self.dts_cache.is_current(key):
+            self.index.save(index_path)
+        return self.index
+
+    def get_calc_check(self):
+        """Get the CalcCheck of the calculation network, compiled once."""
+        if self.calc_check is None:
+            self.calc_check = CalcCheck(self.get_index())
+        return self.calc_check
+
+    def get_concept_labels(self, label_role=STANDARD_LABEL, label_lang='en'):
+        """Get the concepts' labels, from the TaxonomyIndex.
+
+        Args:
+            label_role (str): label role, the standard label by default
+            label_lang (str): language; 'en' also matches 'en-US'
+
+        Returns:
+            dict: {concept ('prefix:Name'): label}, for concepts with a
+            label in the role and language
+
+        Usage:
+            labels = taxonomy.get_concept_labels(label_role='http://www.xbrl.org/2003/role/terseLabel')
+        """
+        return self.get_index().get_labels(label_role, label_lang)
 
 
 class Taccount(Table):
     """T-account class
 
+    Postings are kept in a double-entry Ledger (array-backed columns,
+    incremental balances, constraints checked per batch), and exported as
+    balance facts into this table's instance with `add_facts`.
+
     TODO:godley table, or another?
     
     Needs:
-        * crud rows
-        * crud constraints to ensure compliance
         * display
         * link with other T-accounts for quadruple accounting
+
+    Usage:
+        tacct = Taccount(options, 'tacct', instance_path)
+        tacct.ledger.add_constraint('Cash', minimum=0)
+        tacct.post([('Cash', 'Equity', 100_000_00, ('2024-01-01', '2024-12-31'))])
+        tacct.export_ledger({'Cash': 'us-gaap:Cash', 'Equity': 'us-gaap:StockholdersEquity'}, entity='0000000001', credit=['Equity'])
     """
 
-    def __init__(self, options, name, path_or_str=None):
-        super().__init__(options, name, path_or_str)
+    def __init__(self, options, name, path_or_str=None, ledger=None, **kwargs):
+        super().__init__(options, name, path_or_str, **kwargs)
+        self.ledger = ledger if ledger is not None else Ledger()
+
+    def post(self, postings):
+        """Post a batch of (account, counterparty, amount, period) to the
+        ledger; see Ledger.post."""
+        return self.ledger.post(postings)
 
-        
\ No newline at end of file
+    def export_ledger(self, concepts, entity, unit='iso4217:USD', dims=None, credit=(), **kwargs):
+        """Add the ledger's balances to the instance, one fact per mapped
+        account and period; see Ledger.to_facts and add_facts.
+
+        Returns:
+            dict: add_facts counts
+        """
+        return self.add_facts(self.ledger.to_facts(concepts, entity, unit, dims, credit), **kwargs)
@@ -15,6 +15,13 @@ from .Table import (
     Taxonomy,
     Taccount
     )
+from .DtsCache import DtsCache
+from .SessionPool import SessionPool
+from .InstanceReader import InstanceReader
+from .Validation import ValidationCache
+from .PackageIndex import PackageIndex
+from .ObjectStore import ObjectStore
+from .Interning import Interner
 
 import arelle
 from arelle.api.Session import Session
@@ -25,6 +32,10 @@ from arelle.ModelXbrl import ModelXbrl
 import xml.etree.ElementTree as ET
 from lxml import etree
 
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import itertools
 from pathlib import Path
 import io
 import os
@@ -33,13 +44,71 @@ import copy
 import datetime
 
 
+#per-process factory used by create_xbrl_instance_tables() workers
+worker_factory = None
+
+
+def init_worker(working_dir, options):
+    """Create the worker process' factory, so its arelle Sessions and
+    DtsCache stay warm across the files it loads."""
+    global worker_factory
+    worker_factory = TableFactory(working_dir)
+    worker_factory.options = options
+    worker_factory.logfile_dir.mkdir(parents=True, exist_ok=True)
+
+
+def error_summary(filepath, error):
+    """Get the summary of a file that failed to load: the keys of
+    Table.get_summary, with no contexts, units or facts."""
+    return {'path': str(filepath), 'error': error, 'errors': [], 'contexts': {}, 'units': {}, 'facts': []}
+
+
+def load_instance_summary(filepath, trusted=False):
+    """Load one instance in a worker process and return its picklable
+    summary.  Failures are returned, rather than raised, to isolate them."""
+    try:
+        if trusted:
+            return InstanceReader(filepath).to_summary()
+        table = worker_factory.create_xbrl_instance_table(filepath)
+        summary = table.get_summary()
+    except Exception as e:
+        summary = error_summary(filepath, f'{type(e).__name__}: {e}')
+    return summary
+
+
 class TableFactory():
-    """..."""
+    """...
+
+    Note:
+        * the factory owns a DtsCache (`dts_cache`) under `local_cache_path`
+        and hands it to every Table, so reloading an unchanged entry point
+        skips discovery; different instances are discovered separately, but
+        share their taxonomy's index and validation results
+        * the factory owns a SessionPool (`session_pool`) of warm arelle
+        Sessions, so each load pays for parsing, but not session startup
+        * the factory owns a ValidationCache (`validation_cache`), so an
+        unchanged DTS is not revalidated, and instances only revalidate
+        what changed against their taxonomy
+        * the factory owns an ObjectStore (`object_store`) under
+        `local_cache_path`, so Table.to_file hard-links unchanged documents
+        * the factory owns an Interner (`interner`), so every table's
+        columnar facts share one canonical copy of each context and unit
+        * with `packages_dir` (see register_packages), the factory owns a
+        PackageIndex (`package_index`) and loads offline, resolving remapped
+        urls from the taxonomy package zips
+    """
 
-    def __init__(self, working_dir):
+    def __init__(self, working_dir, dts_cache_size=8, session_pool_size=2, packages_dir=None):
         working_dir = Path(working_dir)
+        self.working_dir = working_dir
         self.local_cache_path = working_dir / 'cache'
         self.logfile_dir = working_dir / 'logs'
+        self.dts_cache = DtsCache(self.local_cache_path / 'dts', max_entries=dts_cache_size)
+        self.session_pool = SessionPool(max_size=session_pool_size)
+        self.validation_cache = ValidationCache(self.local_cache_path / 'validation')
+        self.object_store = ObjectStore(self.local_cache_path / 'objects')
+        self.package_index = None
+        self.interner = Interner()
         self.options = {
             'entrypointFile': None,
             'disclosureSystemName': None, #ex: 'esef',
@@ -56,24 +125,155 @@ class TableFactory():
             
             'plugins': None, #ex: 'validate/ESEF', 'inlineXbrlDocumentSet (processing iXBRL)
         }
+        if packages_dir is not None:
+            self.register_packages(packages_dir)
+
+    def register_packages(self, packages_dir):
+        """Register a directory of taxonomy package zips, and load offline.
+
+        The PackageIndex under `local_cache_path` maps each package's
+        remapped url prefixes to its zip members and persists across
+        factories, so only new or changed zips are read.  Remapped schemas
+        and linkbases are read straight from the memory-mapped zips.
+
+        Args:
+            packages_dir (str): directory of package zips
+        Returns:
+            list: registered zip paths
+        Usage:
+            tblfactory = TableFactory(working_dir, packages_dir='path/to/packages')
+            tblfactory.register_packages('path/to/more/packages')
+        """
+        if self.package_index is None:
+            self.package_index = PackageIndex(self.local_cache_path / 'packages')
+        zip_paths = self.package_index.register(packages_dir)
+        plugins = [plugin for plugin in (self.options['plugins'] or '').split('|') if plugin]
+        if PackageIndex.plugin_path() not in plugins:
+            plugins.append(PackageIndex.plugin_path())
+        self.options['plugins'] = '|'.join(plugins)
+        self.options['pluginOptions'] = self.package_index.plugin_options()
+        self.options['internetConnectivity'] = 'offline'
+        return zip_paths
 
     def prepare_options(self, filepath):
         filepath = Path(filepath)
-        options = copy.deepcopy(self.options)
+        options = dict(self.options)
         options['entrypointFile'] = filepath
         options['logFile'] = str(self.logfile_dir / filepath.stem)
-        options = {k:str(v) for k,v in options.items()}
+        #only paths are stringified: None, bools and lists keep their types for arelle
+        options = {k: str(v) if isinstance(v, Path) else v for k, v in options.items()}
         return options
 
-    def create_xbrl_instance_table(self, filepath):
-        """Create instance."""
+    def create_xbrl_instance_table(self, filepath, trusted=False, lazy=False):
+        """Create instance.
+
+        Args:
+            filepath (str): instance path
+            trusted (bool): stream facts with the InstanceReader, without
+            arelle discovery or validation, for pre-validated filings
+            lazy (bool): only sniff the entry point; discovery and
+            validation run on first access to the model
+        Usage:
+            tables = [tblfactory.create_xbrl_instance_table(path, lazy=True) for path in paths]
+            triaged = [table for table in tables if 'us-gaap' in table.get_metadata()['namespaces']]
+        """
         options = self.prepare_options(filepath)
         table = Instance(
             options=options,
             name='instance',
-            path_or_str=filepath
+            path_or_str=filepath,
+            dts_cache=self.dts_cache,
+            session_pool=self.session_pool,
+            trusted=trusted,
+            validation_cache=self.validation_cache,
+            lazy=lazy,
+            object_store=self.object_store,
+            interner=self.interner
         )
         return table
+
+    def create_xbrl_instance_tables(self, filepaths, workers=None, max_pending=None, trusted=False, loader=load_instance_summary):
+        """Load many instances across a process pool, yielding each file's
+        summary (see Table.get_summary) as it completes.
+
+        arelle parsing and validation are CPU-bound and hold the GIL, so
+        files are fanned out to processes, not threads.  Each worker keeps
+        its own TableFactory, with warm Sessions and DtsCache.
+
+        Args:
+            filepaths (iterable): instance paths; consumed lazily
+            workers (int): number of processes, defaults to the cpu count
+            max_pending (int): files in flight, defaults to 2 * workers
+            trusted (bool): stream with the InstanceReader, without arelle
+            loader (callable): module-level function run in the worker,
+            `loader(filepath, trusted)` -> summary
+        Usage:
+            for summary in tblfactory.create_xbrl_instance_tables(paths, workers=8):
+                if summary['error']:
+                    print(summary['path'], summary['error'])
+        Note:
+            * results are yielded in completion order, not input order, and
+            are interned (see Interner.intern_summary): context and unit ids
+            are canonical across every file.
+            * if a worker process dies, the pool breaks and the files then in
+            flight cannot be told apart: each gets an error summary, and the
+            remaining files continue in a new pool
+        """
+        workers = workers or os.cpu_count()
+        max_pending = max_pending or 2 * workers
+        filepaths = iter(filepaths)
+
+        def new_executor():
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(self.working_dir, self.options)
+            )
+
+        executor = new_executor()
+        pending = {}
+
+        def submit(count):
+            for filepath in itertools.islice(filepaths, count):
+                pending[executor.submit(loader, filepath, trusted)] = filepath
+
+        try:
+            submit(max_pending)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    filepath = pending.pop(future)
+                    try:
+                        summary = future.result()
+                    except BrokenProcessPool as e:
+                        #a worker process died
+                        broken = True
+                        summary = error_summary(filepath, f'{type(e).__name__}: {e}')
+                    except Exception as e:
+                        summary = error_summary(filepath, f'{type(e).__name__}: {e}')
+                    yield self.interner.intern_summary(summary)
+                if broken:
+                    for future, filepath in list(pending.items()):
+                        if future.done() and not future.cancelled() and future.exception() is None:
+                            yield self.interner.intern_summary(future.result())
+                        else:
+                            yield error_summary(filepath, 'BrokenProcessPool: a worker process died while the file was in flight')
+                    pending.clear()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_executor()
+                    submit(max_pending)
+                else:
+                    submit(len(done))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        """Close the pooled arelle Sessions and unmap registered packages."""
+        self.session_pool.close()
+        if self.package_index is not None:
+            self.package_index.close()
     '''
     def create_xbrl_schema_table(self, path_or_str):
         """Create schema."""
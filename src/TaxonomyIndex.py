@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+
+TaxonomyIndex Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .FactStore import Vocabulary
+
+import numpy as np
+
+from pathlib import Path
+import json
+import os
+
+
+STANDARD_LABEL = 'http://www.xbrl.org/2003/role/label'
+LINK = 'http://www.xbrl.org/2003/linkbase'
+NETWORKS = {
+    'presentation': f'{{{LINK}}}presentationLink',
+    'calculation': f'{{{LINK}}}calculationLink',
+    'definition': f'{{{LINK}}}definitionLink',
+}
+EDGE_FIELDS = {
+    'parent': np.int32,
+    'child': np.int32,
+    'role': np.int32,
+    'arcrole': np.int32,
+    'order': np.float32,
+    'weight': np.float32,
+    'preferred_label': np.int32,
+}
+
+
+class TaxonomyIndex:
+    """Labels and relationship networks of a DTS, built once from the
+    arelle model into dicts and integer arrays.
+
+    Labels are {role: {lang: {concept: text}}}, so a lookup is three dict
+    gets.  Each network (presentation, calculation, definition) is a CSR
+    adjacency: edges sorted by (parent, role, order), with `indptr[i]:
+    indptr[i + 1]` the edges from concept i, plus a reverse CSR by child.
+    Concepts, roles and arcroles are ids into Vocabularies.
+
+    Edge columns (numpy, one row per relationship):
+    * parent, child (int32) - ids into `concepts`
+    * role (int32) - id into `roles`, the extended link role
+    * arcrole (int32) - id into `roles`
+    * order (float32)
+    * weight (float32) - calculation weight, NaN in other networks
+    * preferred_label (int32) - id into `roles`, -1 if none
+
+    Note:
+        * concepts are named 'prefix:Name', as in the FactStore
+        * the index is saved as one .npz (arrays, plus the strings as json),
+        loaded without pickle
+
+    Usage:
+        index = TaxonomyIndex.from_model(xbrl_model)
+        index.get_label('us-gaap:Revenues', lang='en')
+        index.children('us-gaap:AssetsAbstract', 'presentation', role='http://example.com/role/BalanceSheet')
+        index.save(path)
+        index = TaxonomyIndex.load(path)
+    """
+
+    def __init__(self, concepts=(), roles=(), labels=None, networks=None, role_definitions=None):
+        self.concepts = Vocabulary(concepts)
+        self.roles = Vocabulary(roles)
+        self.labels = labels or {}  #role -> lang -> concept -> text
+        self.role_definitions = role_definitions or {}  #extended link role -> roleType definition
+        self.networks = {}          #network -> {edge field: array, 'indptr', 'by_child', 'child_indptr'}
+        for network, edges in (networks or {}).items():
+            self.add_network(network, edges)
+
+    def __repr__(self):
+        edges = {network: len(arrays['child']) for network, arrays in self.networks.items()}
+        return f'TaxonomyIndex(concepts={len(self.concepts)}, labels={len(self.labels)}, edges={edges})'
+
+    # BUILD
+
+    @classmethod
+    def from_model(cls, xbrl_model):
+        """Build from a loaded ModelXbrl, traversing each linkbase once."""
+        from arelle import XbrlConst
+        from arelle.ModelDtsObject import ModelConcept
+
+        index = cls(str(qname) for qname in xbrl_model.qnameConcepts)
+        concept_id = index.concepts.add
+        for rel in xbrl_model.relationshipSet(XbrlConst.conceptLabel).modelRelationships:
+            concept, label = rel.fromModelObject, rel.toModelObject
+            if isinstance(concept, ModelConcept) and label is not None:
+                index.labels.setdefault(label.role or STANDARD_LABEL, {}).setdefault(label.xmlLang or '', {})[str(concept.qname)] = label.textValue
+        edges = {network: {field: [] for field in EDGE_FIELDS} for network in NETWORKS}
+        link_networks = {link: network for network, link in NETWORKS.items()}
+        for arcrole, role, link, arc in xbrl_model.baseSets:
+            #baseSets also holds partial keys (None role, link or arc) over the same arcs
+            if role is None or link is None or arc is None:
+                continue
+            network = link_networks.get(link.clarkNotation)
+            if network is None:
+                continue
+            columns = edges[network]
+            for rel in xbrl_model.relationshipSet(arcrole, role, link, arc).modelRelationships:
+                parent, child = rel.fromModelObject, rel.toModelObject
+                if not isinstance(parent, ModelConcept) or not isinstance(child, ModelConcept):
+                    continue
+                columns['parent'].append(concept_id(str(parent.qname)))
+                columns['child'].append(concept_id(str(child.qname)))
+                columns['role'].append(index.roles.add(rel.linkrole))
+                columns['arcrole'].append(index.roles.add(rel.arcrole))
+                columns['order'].append(rel.order)
+                columns['weight'].append(rel.weight if network == 'calculation' else np.nan)
+                columns['preferred_label'].append(index.roles.add(rel.preferredLabel) if rel.preferredLabel else -1)
+        for network, columns in edges.items():
+            index.add_network(network, columns)
+        for role, role_types in xbrl_model.roleTypes.items():
+            definition = next((role_type.definition for role_type in role_types if role_type.definition), None)
+            if definition:
+                index.role_definitions[role] = definition
+        return index
+
+    def add_network(self, network, edges):
+        """Sort a network's edge columns and build its CSR offsets."""
+        arrays = {field: np.asarray(edges[field], dtype=dtype) for field, dtype in EDGE_FIELDS.items()}
+        if len(self.concepts) and len(arrays['parent']) and max(arrays['parent'].max(), arrays['child'].max()) >= len(self.concepts):
+            raise ValueError(f'{network} edges refer to unknown concepts')
+        ordering = np.lexsort((arrays['order'], arrays['role'], arrays['parent']))
+        arrays = {field: array[ordering] for field, array in arrays.items()}
+        size = len(self.concepts)
+        arrays['indptr'] = np.concatenate(([0], np.cumsum(np.bincount(arrays['parent'], minlength=size)))).astype(np.int64)
+        arrays['by_child'] = np.argsort(arrays['child'], kind='stable').astype(np.int32)
+        arrays['child_indptr'] = np.concatenate(([0], np.cumsum(np.bincount(arrays['child'], minlength=size)))).astype(np.int64)
+        self.networks[network] = arrays
+
+    # PERSIST
+
+    def save(self, path):
+        """Save as .npz; written to a temp file, then swapped in."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'concepts': self.concepts.strings,
+            'roles': self.roles.strings,
+            'labels': self.labels,
+            'role_definitions': self.role_definitions,
+            'networks': list(self.networks),
+        }
+        arrays = {
+            f'{network}.{field}': self.networks[network][field]
+            for network in self.networks for field in EDGE_FIELDS
+            }
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            networks = {
+                network: {field: data[f'{network}.{field}'] for field in EDGE_FIELDS}
+                for network in meta['networks']
+                }
+        return cls(meta['concepts'], meta['roles'], meta['labels'], networks, meta['role_definitions'])
+
+    # GETTERS
+
+    def get_label(self, concept, role=STANDARD_LABEL, lang='en', default=None):
+        """Get a concept's label; `lang` 'en' also matches 'en-US' and the
+        reverse, when there is no exact match."""
+        by_lang = self.labels.get(role)
+        if not by_lang:
+            return default
+        labels = by_lang.get(lang)
+        if labels is None or concept not in labels:
+            base = lang.split('-')[0]
+            labels = next((by_lang[other] for other in by_lang if other.split('-')[0] == base and concept in by_lang[other]), None)
+        return labels.get(concept, default) if labels is not None else default
+
+    def get_labels(self, role=STANDARD_LABEL, lang='en'):
+        """Get {concept: label} for a role and language (with the same
+        language matching as get_label)."""
+        labels = {}
+        base = lang.split('-')[0]
+        for other, texts in sorted(self.labels.get(role, {}).items(), key=lambda item: item[0] == lang):
+            if other.split('-')[0] == base:
+                labels.update(texts)
+        return labels
+
+    def get_roles(self, network):
+        """Get the extended link roles with edges in a network."""
+        return [self.roles[role] for role in np.unique(self.networks[network]['role'])]
+
+    def edges(self, concept, network='presentation', role=None, reverse=False):
+        """Get the edge rows from a concept (or into it, with `reverse`),
+        in (role, order) order; index `networks[network]` columns with them."""
+        arrays = self.networks[network]
+        idx = self.concepts.get(concept)
+        if idx < 0:
+            return np.empty(0, dtype=np.int64)
+        if reverse:
+            rows = arrays['by_child'][arrays['child_indptr'][idx]:arrays['child_indptr'][idx + 1]]
+        else:
+            rows = np.arange(arrays['indptr'][idx], arrays['indptr'][idx + 1])
+        if role is not None:
+            rows = rows[arrays['role'][rows] == self.roles.get(role)]
+        return rows
+
+    def children(self, concept, network='presentation', role=None):
+        """Get a concept's children names, in order."""
+        arrays = self.networks[network]
+        return [self.concepts[idx] for idx in arrays['child'][self.edges(concept, network, role)]]
+
+    def parents(self, concept, network='presentation', role=None):
+        arrays = self.networks[network]
+        return [self.concepts[idx] for idx in arrays['parent'][self.edges(concept, network, role, reverse=True)]]
+
+    def roots(self, network='presentation', role=None):
+        """Get the concepts with children but no parent in a network (or
+        one of its roles)."""
+        arrays = self.networks[network]
+        mask = np.ones(len(arrays['parent']), dtype=bool) if role is None else arrays['role'] == self.roles.get(role)
+        parents = np.unique(arrays['parent'][mask])
+        roots = parents[~np.isin(parents, arrays['child'][mask])]
+        return [self.concepts[idx] for idx in roots]
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+
+TaxonomyPackage Class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .PackageIndex import CATALOG_NS, TAXONOMY_PACKAGE_NS, LOCAL_HEADER
+
+from lxml import etree
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from pathlib import Path
+import os
+import struct
+import zipfile
+import zlib
+
+
+CENTRAL_HEADER = struct.Struct('<4s4B4HL2L5H2L')
+END_RECORD = struct.Struct('<4s4H2LH')
+FLAG_UTF8 = 0x800
+EXTERNAL_ATTR = 0o100644 << 16   #regular file, rw-r--r--
+ZIP_LIMIT = 0xFFFFFFFF
+
+
+def dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (year - 1980) << 9 | month << 5 | day, hour << 11 | minute << 5 | second // 2
+
+
+def compress_member(path, compresslevel, previous=None):
+    """Compress one file to a raw deflate stream, unless its (crc, size)
+    matches `previous`, the member in the package being updated.
+
+    Returns:
+        tuple: (crc, size, compressed bytes, or None if unchanged)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    crc = zlib.crc32(data)
+    if previous is not None and previous == (crc, len(data)):
+        return crc, len(data), None
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return crc, len(data), compressor.compress(data) + compressor.flush()
+
+
+class TaxonomyPackage:
+    """Taxonomy package builder: members are deflated in parallel and
+    written in sorted order with fixed timestamps, so a source tree always
+    builds to the same bytes.
+
+    `META-INF/taxonomyPackage.xml` and `META-INF/catalog.xml` are generated
+    from the arguments, unless the source tree has its own.  When updating
+    an existing package, members with an unchanged CRC and size are copied
+    raw from it, without recompression.
+
+    Args:
+        source_dir (str): taxonomy files
+        identifier (str): package identifier, a url
+        name (str): package name, defaults to the source directory's name
+        version (str): package version
+        publisher (str): publisher name
+        publication_date (str): yyyy-mm-dd
+        entry_points (dict): {name: entry point url}
+        remappings (dict): {url prefix: directory relative to `source_dir`},
+        written as catalog rewriteURI entries
+        top_dir (str): the package's top-level directory, defaults to `name`
+        compresslevel (int): zlib level
+        workers (int): compression threads, defaults to the cpu count
+        date_time (tuple): timestamp of every member
+
+    Note:
+        * compression runs in threads: zlib releases the GIL, so threads
+        compress in parallel without pickling file contents to processes
+        * zip64 is not written; members and archives must be under 4GiB
+
+    Usage:
+        package = TaxonomyPackage(
+            'path/to/taxonomy', identifier='http://example.com/taxonomy/2024',
+            entry_points={'Example 2024': 'http://example.com/taxonomy/2024/example.xsd'},
+            remappings={'http://example.com/taxonomy/': 'example.com/taxonomy/'},
+            )
+        package.build('example-2024.zip', update=True)
+        package.stats
+    """
+
+    def __init__(self, source_dir, identifier=None, name=None, version=None, publisher=None, publication_date=None,
+                 entry_points=None, remappings=None, top_dir=None, compresslevel=6, workers=None, date_time=(1980, 1, 1, 0, 0, 0)):
+        self.source_dir = Path(source_dir)
+        self.name = name or self.source_dir.resolve().name
+        self.identifier = identifier or self.name
+        self.version = version
+        self.publisher = publisher
+        self.publication_date = publication_date
+        self.entry_points = entry_points or {}
+        self.remappings = remappings or {}
+        self.top_dir = top_dir or self.name
+        self.compresslevel = compresslevel
+        self.workers = workers or os.cpu_count()
+        self.date_time = date_time
+        self.stats = {'members': 0, 'compressed': 0, 'copied': 0, 'generated': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+    def __repr__(self):
+        return f'TaxonomyPackage(source_dir={str(self.source_dir)!r}, identifier={self.identifier!r})'
+
+    # GETTERS
+
+    def get_members(self):
+        """Get {arcname: source path}, sorted by arcname."""
+        members = {}
+        for root, _, files in os.walk(self.source_dir):
+            for file in files:
+                path = Path(root) / file
+                members[f'{self.top_dir}/{path.relative_to(self.source_dir).as_posix()}'] = path
+        return dict(sorted(members.items()))
+
+    def get_package_metadata(self):
+        """Get taxonomyPackage.xml bytes."""
+        tp = f'{{{TAXONOMY_PACKAGE_NS}}}'
+        root = etree.Element(f'{tp}taxonomyPackage', nsmap={'tp': TAXONOMY_PACKAGE_NS})
+        etree.SubElement(root, f'{tp}identifier').text = self.identifier
+        etree.SubElement(root, f'{tp}name').text = self.name
+        for tag, value in (('version', self.version), ('publisher', self.publisher), ('publicationDate', self.publication_date)):
+            if value:
+                etree.SubElement(root, f'{tp}{tag}').text = value
+        if self.entry_points:
+            entry_points = etree.SubElement(root, f'{tp}entryPoints')
+            for name, href in self.entry_points.items():
+                entry_point = etree.SubElement(entry_points, f'{tp}entryPoint')
+                etree.SubElement(entry_point, f'{tp}name').text = name
+                etree.SubElement(entry_point, f'{tp}entryPointDocument', href=href)
+        return etree.tostring(root, xml_declaration=True, encoding='utf-8', pretty_print=True)
+
+    def get_catalog(self):
+        """Get catalog.xml bytes; rewrite prefixes are relative to META-INF."""
+        root = etree.Element(f'{{{CATALOG_NS}}}catalog', nsmap={None: CATALOG_NS})
+        for uri_start, directory in self.remappings.items():
+            prefix = '../' + Path(directory).as_posix().strip('/')
+            etree.SubElement(root, f'{{{CATALOG_NS}}}rewriteURI', uriStartString=uri_start, rewritePrefix=prefix.rstrip('/') + '/')
+        return etree.tostring(root, xml_declaration=True, encoding='utf-8', pretty_print=True)
+
+    @staticmethod
+    def read_previous(zip_path):
+        """Get {arcname: (crc, size, compress_type, raw offset, compressed
+        size)} of an existing package, for raw copies."""
+        previous = {}
+        if zip_path is None or not Path(zip_path).is_file():
+            return previous
+        with open(zip_path, 'rb') as f, zipfile.ZipFile(f) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                f.seek(info.header_offset)
+                header = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+                data_offset = info.header_offset + LOCAL_HEADER.size + header[-2] + header[-1]
+                previous[info.filename] = (info.CRC, info.file_size, info.compress_type, data_offset, info.compress_size)
+        return previous
+
+    # EXPORT
+
+    def iter_compressed(self, members, previous):
+        """Yield (arcname, crc, size, data or None) in member order, with at
+        most 2 * workers files in flight."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for arcname, path in members.items():
+                prior = previous.get(arcname)
+                prior = prior[:2] if prior and prior[2] == zipfile.ZIP_DEFLATED else None
+                pending.append((arcname, executor.submit(compress_member, path, self.compresslevel, prior)))
+                if len(pending) >= 2 * self.workers:
+                    arcname, future = pending.popleft()
+                    yield (arcname, *future.result())
+            while pending:
+                arcname, future = pending.popleft()
+                yield (arcname, *future.result())
+
+    def build(self, output_zip_path, update=True):
+        """Write the package.
+
+        Args:
+            output_zip_path (str): zip path; written to a temp file, then
+            swapped in
+            update (bool): copy unchanged members raw from an existing
+            package at `output_zip_path`
+
+        Returns:
+            Path: output_zip_path
+        """
+        output_zip_path = Path(output_zip_path)
+        previous = self.read_previous(output_zip_path) if update else {}
+        members = self.get_members()
+        generated = {}
+        for filename, make in (('taxonomyPackage.xml', self.get_package_metadata), ('catalog.xml', self.get_catalog)):
+            arcname = f'{self.top_dir}/META-INF/{filename}'
+            if arcname not in members:
+                generated[arcname] = make()
+        date, time = dos_date_time(self.date_time)
+        central = []
+        temp_path = output_zip_path.with_name(output_zip_path.name + '.tmp')
+        output_zip_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(temp_path, 'wb') as out, open(output_zip_path if previous else os.devnull, 'rb') as prior_file:
+
+                def write_member(arcname, crc, size, compress_type, data):
+                    name = arcname.encode('utf-8')
+                    flags = FLAG_UTF8 if not arcname.isascii() else 0
+                    offset = out.tell()
+                    if max(offset, len(data), size) > ZIP_LIMIT:
+                        raise ValueError(f'package exceeds 4GiB zip limits at {arcname}')
+                    out.write(LOCAL_HEADER.pack(b'PK\x03\x04', 20, 0, flags, compress_type, time, date, crc, len(data), size, len(name), 0))
+                    out.write(name)
+                    out.write(data)
+                    central.append(CENTRAL_HEADER.pack(
+                        b'PK\x01\x02', 20, 3, 20, 0, flags, compress_type, time, date, crc, len(data), size,
+                        len(name), 0, 0, 0, 0, EXTERNAL_ATTR, offset) + name)
+                    self.stats['members'] += 1
+                    self.stats['bytes_in'] += size
+
+                for arcname, data in generated.items():
+                    compressed = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+                    write_member(arcname, zlib.crc32(data), len(data), zipfile.ZIP_DEFLATED, compressed.compress(data) + compressed.flush())
+                    self.stats['generated'] += 1
+                for arcname, crc, size, data in self.iter_compressed(members, previous):
+                    if data is None:
+                        _, _, compress_type, data_offset, compress_size = previous[arcname]
+                        prior_file.seek(data_offset)
+                        write_member(arcname, crc, size, compress_type, prior_file.read(compress_size))
+                        self.stats['copied'] += 1
+                    else:
+                        write_member(arcname, crc, size, zipfile.ZIP_DEFLATED, data)
+                        self.stats['compressed'] += 1
+                central_offset = out.tell()
+                for record in central:
+                    out.write(record)
+                central_size = out.tell() - central_offset
+                if len(central) > 0xFFFF or central_offset > ZIP_LIMIT:
+                    raise ValueError('package exceeds zip limits: 65535 members or 4GiB')
+                out.write(END_RECORD.pack(b'PK\x05\x06', 0, 0, len(central), len(central), central_size, central_offset, 0))
+                self.stats['bytes_out'] = out.tell()
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        os.replace(temp_path, output_zip_path)
+        return output_zip_path
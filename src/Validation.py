@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+
+ValidationResult and ValidationCache Classes
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from .DtsCache import hash_file
+
+from arelle.logging.handlers.StructuredMessageLogHandler import StructuredMessageLogHandler
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import logging
+import hashlib
+import json
+import os
+
+
+REPORTED_LEVELS = ('WARNING', 'ERROR', 'CRITICAL')
+ERROR_LEVELS = ('ERROR', 'CRITICAL')
+
+
+@contextmanager
+def capture_messages():
+    """Collect arelle's structured log messages for the length of a `with`
+    block.  arelle logs to the 'arelle' logger, so this also works with
+    pooled Sessions whose log file was set by an earlier run.
+
+    Usage:
+        with capture_messages() as handler:
+            session.run(options)
+        handler.messages
+    """
+    handler = StructuredMessageLogHandler()
+    handler.setLevel(logging.WARNING)
+    logger = logging.getLogger('arelle')
+    logger.addHandler(handler)
+    try:
+        yield handler
+    finally:
+        logger.removeHandler(handler)
+
+
+class ValidationResult:
+    """Structured validation result for one entry point (instance or
+    taxonomy), with messages attributed to DTS documents.
+
+    Each message is a dict: {'code', 'level', 'message', 'document'}.
+
+    Usage:
+        result = table.validation
+        if not result:
+            print(result.counts())
+        ValidationResult.aggregate(results)
+    """
+
+    def __init__(self, entrypoint, messages=(), cached=False):
+        self.entrypoint = str(entrypoint)
+        self.messages = list(messages)
+        self.cached = cached
+
+    def __repr__(self):
+        return f'ValidationResult(entrypoint={self.entrypoint!r}, errors={len(self.errors)}, cached={self.cached})'
+
+    def __bool__(self):
+        return self.is_valid
+
+    @classmethod
+    def from_log(cls, entrypoint, log_messages, documents=()):
+        """Build from StructuredMessageLogHandler messages, attributing each
+        to a DTS document by its first ref."""
+        entry_dir = os.path.dirname(str(entrypoint))
+        known = {os.path.normpath(str(doc)): str(doc) for doc in documents}
+        known_names = {os.path.basename(path): doc for path, doc in known.items()}
+        messages = []
+        for log_message in log_messages:
+            if log_message['levelname'] not in REPORTED_LEVELS:
+                continue
+            document = str(entrypoint)
+            for ref in log_message.get('refs') or []:
+                href = (ref.get('href') or '').split('#')[0]
+                if not href:
+                    continue
+                path = href if '://' in href or os.path.isabs(href) else os.path.join(entry_dir, href)
+                path = os.path.normpath(path) if '://' not in path else path
+                document = known.get(path) or known_names.get(os.path.basename(path)) or path
+                break
+            messages.append({
+                'code': log_message['messageCode'],
+                'level': log_message['levelname'],
+                'message': str(log_message['msg']),
+                'document': document,
+            })
+        return cls(entrypoint, messages)
+
+    @classmethod
+    def from_model_xbrls(cls, model_xbrls):
+        """Build from the error codes of loaded models, when no log messages
+        were captured."""
+        messages = []
+        entrypoint = None
+        for model_xbrl in model_xbrls:
+            url = model_xbrl.fileSource.url
+            entrypoint = entrypoint or url
+            for error in model_xbrl.errors:
+                messages.append({'code': str(error), 'level': 'ERROR', 'message': '', 'document': url})
+        return cls(entrypoint, messages)
+
+    @property
+    def errors(self):
+        return [message for message in self.messages if message['level'] in ERROR_LEVELS]
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    def by_document(self):
+        """Get messages grouped by document."""
+        documents = {}
+        for message in self.messages:
+            documents.setdefault(message['document'], []).append(message)
+        return documents
+
+    def counts(self):
+        """Get message counts by code."""
+        return Counter(message['code'] for message in self.messages)
+
+    def to_dict(self):
+        return {
+            'entrypoint': self.entrypoint,
+            'valid': self.is_valid,
+            'cached': self.cached,
+            'messages': self.messages,
+        }
+
+    @staticmethod
+    def aggregate(results):
+        """Summarize many results, e.g. from a batch pipeline."""
+        summary = {'entrypoints': 0, 'valid': 0, 'cached': 0, 'codes': Counter()}
+        for result in results:
+            summary['entrypoints'] += 1
+            summary['valid'] += int(result.is_valid)
+            summary['cached'] += int(result.cached)
+            summary['codes'].update(result.counts())
+        return summary
+
+    def print(self):
+        """Print the result, in the form validate_xbrl() used to."""
+        if self.is_valid:
+            print(f"Validation successful for '{self.entrypoint}.  No errors found.")
+        else:
+            print(f"Validation error found in {self.entrypoint}:")
+            for error in self.errors:
+                print(f"  - {error['code']}")
+
+
+class ValidationCache:
+    """Validation results cached per document content hash, with the
+    taxonomy's documents kept apart from the instance.
+
+    A result is split by the document each message is attributed to:
+    * taxonomy: every DTS document but the entry point has an entry keyed
+    by its own content hash, holding its messages (none, if it is clean),
+    so it is shared by every instance whose DTS includes it
+    * instance: the entry point's messages, and those of no known
+    document, are keyed by the hash of the whole DTS, i.e. the instance in
+    the context of its taxonomy
+
+    An unchanged DTS is a full hit: its result is assembled from the cache
+    without arelle validation.  Otherwise `plan` tells which documents are
+    already validated: their arelle DTS checks can be skipped (see
+    ModelDocument.skipDTS) and their cached messages `merge`d back, so an
+    edited instance, or a new instance against a validated taxonomy, only
+    reruns the instance, fact, context and unit checks, and the checks of
+    changed taxonomy documents.
+
+    Note:
+        * document hashes come from the DtsCache manifest, re-hashed only
+        when size or mtime changed
+        * checks that span the DTS (e.g. concepts, calculations) are rerun
+        by arelle; their messages about skipped documents are replaced by
+        the cached ones
+
+    Usage:
+        cache = ValidationCache(working_dir / 'cache' / 'validation')
+        result = cache.lookup(entrypoint, manifest)
+        if result is None:
+            plan = cache.plan(manifest)
+            ...  #validate with plan['skip'] documents' skipDTS set
+            result = cache.merge(fresh_result, plan)
+            cache.store(result, manifest)
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.stats = {'hits': 0, 'misses': 0, 'reused': 0}
+
+    def __repr__(self):
+        return f'ValidationCache(stats={self.stats})'
+
+    def entry_path(self, dts_hash):
+        return self.cache_dir / 'instances' / f'{dts_hash}.json'
+
+    def document_path(self, content_hash):
+        return self.cache_dir / 'documents' / f'{content_hash}.json'
+
+    @staticmethod
+    def current_hashes(manifest):
+        """Get {filepath: sha256} for the manifest's documents, as they are
+        now; None if a document is missing."""
+        hashes = {}
+        for doc in manifest['documents']:
+            try:
+                stat = os.stat(doc['filepath'])
+            except OSError:
+                return None
+            if stat.st_size == doc['size'] and stat.st_mtime_ns == doc['mtime_ns']:
+                hashes[doc['filepath']] = doc['sha256']
+            else:
+                hashes[doc['filepath']] = hash_file(doc['filepath'])
+        return hashes
+
+    @staticmethod
+    def dts_hash(hashes):
+        """Get one sha256 over the sorted (filepath, content hash) pairs of
+        a DTS."""
+        digest = hashlib.sha256()
+        for filepath, content_hash in sorted(hashes.items()):
+            digest.update(f'{filepath}\0{content_hash}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def taxonomy_hashes(manifest, hashes):
+        """Get {filepath: sha256} of the DTS documents other than the entry
+        point."""
+        entrypoint = os.path.normpath(manifest.get('entrypoint') or '')
+        return {filepath: content_hash for filepath, content_hash in hashes.items() if os.path.normpath(filepath) != entrypoint}
+
+    @staticmethod
+    def read(path):
+        if not path.is_file():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['messages']
+
+    @staticmethod
+    def write(path, content):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        os.replace(temp_path, path)
+
+    def document_messages(self, filepath, content_hash):
+        """Get a document's cached messages, attributed to its current
+        path, or None."""
+        messages = self.read(self.document_path(content_hash))
+        if messages is None:
+            return None
+        return [dict(message, document=filepath) for message in messages]
+
+    # LOOKUP
+
+    def lookup(self, entrypoint, manifest):
+        """Get the cached ValidationResult for a DTS as it is now, or None."""
+        hashes = self.current_hashes(manifest) if manifest else None
+        messages = self.read(self.entry_path(self.dts_hash(hashes))) if hashes else None
+        if messages is not None:
+            for filepath, content_hash in self.taxonomy_hashes(manifest, hashes).items():
+                document_messages = self.document_messages(filepath, content_hash)
+                if document_messages is None:
+                    messages = None
+                    break
+                messages += document_messages
+        if messages is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return ValidationResult(entrypoint, messages, cached=True)
+
+    def plan(self, manifest):
+        """Get the taxonomy documents already validated, as they are now.
+
+        Returns:
+            dict: {'skip': set of their filepaths, 'messages': their cached
+            messages}
+        """
+        hashes = self.current_hashes(manifest) if manifest else None
+        plan = {'skip': set(), 'messages': []}
+        for filepath, content_hash in self.taxonomy_hashes(manifest, hashes or {}).items():
+            document_messages = self.document_messages(filepath, content_hash)
+            if document_messages is not None:
+                plan['skip'].add(filepath)
+                plan['messages'] += document_messages
+        self.stats['reused'] += len(plan['skip'])
+        return plan
+
+    def merge(self, result, plan):
+        """Get a result validated with the plan's documents skipped, with
+        their messages replaced by the cached ones."""
+        skip = {os.path.normpath(filepath) for filepath in plan['skip']}
+        messages = [
+            message for message in result.messages
+            if not (message['document'] and os.path.normpath(message['document']) in skip)
+            ]
+        return ValidationResult(result.entrypoint, messages + plan['messages'])
+
+    # STORE
+
+    def store(self, result, manifest):
+        """Store a result's messages: each taxonomy document's under its
+        content hash, the rest under the DTS's hash."""
+        hashes = self.current_hashes(manifest) if manifest else None
+        if not hashes:
+            return False
+        taxonomy = {os.path.normpath(filepath): content_hash for filepath, content_hash in self.taxonomy_hashes(manifest, hashes).items()}
+        by_hash = {content_hash: [] for content_hash in taxonomy.values()}
+        instance_messages = []
+        for message in result.messages:
+            content_hash = taxonomy.get(os.path.normpath(message['document'])) if message['document'] else None
+            if content_hash is None:
+                instance_messages.append(message)
+            else:
+                by_hash[content_hash].append(message)
+        for content_hash, messages in by_hash.items():
+            self.write(self.document_path(content_hash), {'messages': messages})
+        self.write(self.entry_path(self.dts_hash(hashes)), {'documents': hashes, 'messages': instance_messages})
+        return True
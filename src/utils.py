@@ -1,28 +1,106 @@
+import filecmp
+import hashlib
+import itertools
 import json
 from lxml import etree
 import xml.etree.ElementTree as ET
 
 
-def are_xml_files_identical_lxml(file1_path, file2_path):
-    """Determine if two xml files are identical."""
-    try:
-        parser = etree.XMLParser(remove_comments=True)
-        tree1 = etree.parse(file1_path, parser)
-        tree2 = etree.parse(file2_path, parser)
-
-        # Canonicalize the XML trees for a robust comparison
-        # This handles differences in whitespace, attribute order, etc.
-        xml_string1 = etree.tostring(tree1, pretty_print=True, encoding='utf-8', xml_declaration=True).decode('utf-8')
-        xml_string2 = etree.tostring(tree2, pretty_print=True, encoding='utf-8', xml_declaration=True).decode('utf-8')
+def canonical_subtrees(file_path, huge_tree=True):
+    """Stream a document's canonical form (C14N, without comments) one
+    top-level subtree at a time: first the root's name, attributes and
+    namespaces, then each child of the root.  Consumed subtrees are
+    cleared, so memory is bounded by the largest subtree.
 
-        return xml_string1 == xml_string2
+    Note:
+        whitespace-only text between top-level elements is formatting and
+        is ignored
+    """
+    root = None
+    for event, elem in etree.iterparse(str(file_path), events=('start', 'end'), remove_comments=True, huge_tree=huge_tree):
+        if event == 'start':
+            if root is None:
+                root = elem
+                yield repr((elem.tag, sorted(elem.attrib.items()), sorted(elem.nsmap.items(), key=str))).encode('utf-8')
+            continue
+        if elem is root:
+            yield (elem.text or '').strip().encode('utf-8')
+        elif elem.getparent() is root:
+            yield etree.tostring(elem, method='c14n', with_comments=False, with_tail=False) + (elem.tail or '').strip().encode('utf-8')
+            #release the consumed subtree and its preceding siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del root[0]
+
+
+def first_difference(file1_path, file2_path):
+    """Get the index of the first differing top-level subtree of two
+    documents (0 is the root's start tag), or None if they are canonically
+    equal.  Parsing stops at the difference."""
+    subtrees = itertools.zip_longest(canonical_subtrees(file1_path), canonical_subtrees(file2_path))
+    for idx, (subtree1, subtree2) in enumerate(subtrees):
+        if subtree1 != subtree2:
+            return idx
+    return None
+
+
+def xbrl_digest(file_path):
+    """Get an order-independent digest of an instance's schemaRefs,
+    contexts, units and facts, streamed with the InstanceReader.
+
+    Each item is hashed and the hashes are summed (a multiset hash), so
+    memory stays constant however large the instance is.
+
+    Returns:
+        dict: {kind: (count, hash)}
+    """
+    from .InstanceReader import InstanceReader
+
+    digest = {}
+    for kind, item in InstanceReader(file_path):
+        if kind == 'context':
+            context_id, context = item
+            item = (context_id, context['entity'], context['start'], context['end'], context['instant'], sorted(context['dims'].items()))
+        item_hash = int.from_bytes(hashlib.blake2b(repr(item).encode('utf-8'), digest_size=16).digest(), 'big')
+        count, total = digest.get(kind, (0, 0))
+        digest[kind] = (count + 1, (total + item_hash) % (1 << 128))
+    return digest
+
+
+def are_xml_files_identical_lxml(file1_path, file2_path, mode='c14n'):
+    """Determine if two xml files are identical.
+
+    Args:
+        file1_path (str): first file
+        file2_path (str): second file
+        mode (str):
+            * 'c14n': compare the canonical forms (C14N, without comments),
+            streamed subtree by subtree and stopping at the first difference
+            * 'xbrl': compare xbrl instances' schemaRefs, contexts, units and
+            facts as unordered sets, so document order does not matter
+    Note:
+        * in 'xbrl' mode, contexts and units are compared with their ids, so
+        renamed contexts are a difference; see InstanceDiff for a fact diff
+        * memory is bounded in both modes
+    """
+    try:
+        #byte-identical files are equal in every mode
+        if filecmp.cmp(file1_path, file2_path, shallow=False):
+            return True
+        match mode:
+            case 'c14n':
+                return first_difference(file1_path, file2_path) is None
+            case 'xbrl':
+                return xbrl_digest(file1_path) == xbrl_digest(file2_path)
+            case _:
+                raise ValueError(f'unknown comparison mode: {mode}')
     except etree.XMLSyntaxError as e:
         print(f"Error parsing XML: {e}")
         return False
     except FileNotFoundError:
         print("One or both files not found.")
         return False
-    
+
 
 def json_to_xml(json_obj, line_padding=""):
     """Convert .json to .xml
@@ -6,6 +6,20 @@ Test template (default) workflow
 
 This Python code uses the `openpyxl` library to interact with Excel workbooks, which is the most popular Python library for working with Excel files. The code follows the same logical flow as the original VBA code, but with Python's syntax and conventions.
 
+The workbook is read with `read_only=True` row iteration and the instance is
+written with the incremental `lxml.etree.xmlfile` writer, so contexts, units
+and facts stream out with proper escaping.  Facts are written per target
+sheet, in the order the sheets first appear in the Mapping: each is one
+more streamed pass over the Mapping, reading the sheet forward alongside it,
+so memory does not grow with the number of mapped cells.  A Mapping that
+goes back up a sheet restarts that sheet's stream.  No timestamp is
+written, so the output is byte-identical across runs.
+
+Contexts and units are interned: a row equal to an earlier one (same entity,
+period and Dimensions rows, or same measure) is not written again, and facts
+referring to it use the first row's id.  A context's Dimensions rows are
+written as explicit members of its entity segment.
+
 """
 
 __author__ = "Jason Beach"
@@ -14,122 +28,255 @@ __license__ = "AGPL-3.0"
 
 
 import os
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
 import openpyxl
-from openpyxl.utils import get_column_letter
-
-def generate_xbrl():
-    # Get the active workbook and sheet
-    wb = openpyxl.load_workbook(filename='your_workbook.xlsx')  # Replace with your workbook path
-    started_at_sheet = wb.active.title
+from lxml import etree
+
+from ...Interning import Interner
+from .mapping import Mapping, is_filled
+
+XBRLI = 'http://www.xbrl.org/2003/instance'
+LINK = 'http://www.xbrl.org/2003/linkbase'
+XLINK = 'http://www.w3.org/1999/xlink'
+XSI = 'http://www.w3.org/2001/XMLSchema-instance'
+ISO4217 = 'http://www.xbrl.org/2003/iso4217'
+XBRLDI = 'http://xbrl.org/2006/xbrldi'
+
+
+def format_date(value):
+    """Format a date cell as an xs:date."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def format_value(value, s_scale=None):
+    """Format a numeric fact value, applying the mapping's scale, without
+    float noise (e.g. '1147000', not '1147000.0')."""
+    try:
+        number = Decimal(str(value))
+        if s_scale not in (None, ''):
+            number *= Decimal(str(s_scale))
+    except InvalidOperation:
+        return str(value)
+    if number == number.to_integral_value():
+        return str(number.quantize(Decimal(1)))
+    return format(number.normalize(), 'f')
+
+
+def read_dimensions(wb):
+    """Read the Dimensions sheet, if present.
+
+    Returns:
+        dict: {context id: {dimension: member}}
+    """
+    dimensions = {}
+    if 'Dimensions' in wb.sheetnames:
+        for row in wb['Dimensions'].iter_rows(min_row=2, max_col=4, values_only=True):
+            if row[0] is not None and row[2] is not None:
+                dimensions.setdefault(str(row[0]), {})[str(row[2])] = str(row[3])
+    return dimensions
+
+
+class CellReader:
+    """Read the cells of a read-only worksheet in one forward stream.
+
+    Cells are read in the order asked for; asking for a row above the
+    current one restarts the stream at that row.
+
+    Args:
+        ws: read-only worksheet, or None for a missing sheet (every cell is
+        None)
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._rows = None
+        self._row_idx = 0
+        self._row = ()
+        self.stats = {'cells': 0, 'rows': 0, 'restarts': 0}
+
+    def __repr__(self):
+        return f'CellReader(ws={getattr(self.ws, "title", None)!r}, stats={self.stats})'
+
+    def get(self, s_cell):
+        """Get the value of a cell, e.g. 'B12'."""
+        self.stats['cells'] += 1
+        if self.ws is None:
+            return None
+        column, row = openpyxl.utils.cell.coordinate_from_string(s_cell)
+        col = openpyxl.utils.column_index_from_string(column)
+        if self._rows is None or row < self._row_idx:
+            if self._rows is not None:
+                self.stats['restarts'] += 1
+            self._rows = self.ws.iter_rows(min_row=row, values_only=True)
+            self._row_idx = row - 1
+        while self._row_idx < row:
+            self._row = next(self._rows, None) or ()
+            self._row_idx += 1
+            self.stats['rows'] += 1
+        return self._row[col - 1] if col <= len(self._row) else None
+
+
+def generate_xbrl(workbook_path='your_workbook.xlsx', output_file=None):
+    # Get the workbook, streamed row by row
+    wb = openpyxl.load_workbook(filename=workbook_path, read_only=True, data_only=True)
 
     # Disable screen updating (equivalent to Application.ScreenUpdating = False in VBA)
     # Note: This is not directly translatable in Python as it's an Excel-specific feature
 
-    # Select the "Mapping" worksheet
-    ws_mapping = wb['Mapping']
-
     # Get the output file path
-    output_file = os.path.dirname(os.path.abspath(__file__))
-    output_file = os.path.join(output_file, wb['Setup']['B2'].value)
-
-    if not output_file:
-        # Cancel button pressed
-        return
-
-    # Create the output file
-    with open(output_file, 'w', encoding='utf-8') as ts:
+    if output_file is None:
+        s_output = next(wb['Setup'].iter_rows(min_row=2, max_row=2, min_col=2, max_col=2, values_only=True))[0]
+        if not s_output:
+            # Cancel button pressed
+            return
+        output_file = os.path.join(os.path.dirname(os.path.abspath(workbook_path)), s_output)
+
+    # Go grab the schemas....
+    ws_taxonomies = wb['Taxonomies']
+    taxonomies = [row for row in ws_taxonomies.iter_rows(min_row=2, max_col=5, values_only=True) if is_filled(row[0])]
+    nsmap = {
+        None: XBRLI,
+        'xbrli': XBRLI,
+        'link': LINK,
+        'xlink': XLINK,
+        'xsi': XSI,
+        'iso4217': ISO4217,
+        'xbrldi': XBRLDI,
+    }
+    for row in taxonomies:
+        nsmap[str(row[0])] = str(row[1])
+    schema_locations = ' '.join(f"{row[1]} {row[2]}" for row in taxonomies if row[4] == "Yes")
+
+    # Fact values come from the mapped cells, streamed per target sheet
+    ws_mapping = wb['Mapping']
+    target_sheets = list(dict.fromkeys(row[0] for _, row in Mapping.iter_worksheet(ws_mapping)))
+
+    # Equal contexts and units are written once; refs map row ids to the written ids
+    interner = Interner()
+    dimensions = read_dimensions(wb)
+    written = {}
+    context_refs = {}
+    unit_refs = {}
+
+    def concept_tag(s_concept, row_number):
+        prefix, _, local_name = str(s_concept).rpartition(':')
+        if (prefix or None) not in nsmap:
+            raise ValueError(f"Mapping row {row_number}: concept {s_concept} has prefix '{prefix}', which is not on the Taxonomies sheet")
+        return etree.QName(nsmap[prefix or None], local_name)
+
+    def write_leaf(xf, depth, tag, text, attrib=None):
+        xf.write('\n' + '   ' * depth)
+        with xf.element(tag, attrib or {}):
+            if text is not None:
+                xf.write(text)
+
+    # Create the output file.  Elements are written inside the root's
+    # xf.element() block so they share its namespace declarations.
+    with etree.xmlfile(output_file, encoding='utf-8') as xf:
         # Root element
-        ts.write('<?xml version="1.0" encoding="utf-8"?>\n')
-        ts.write('<!-- HelloWorld Example -->\n')
-        ts.write(f'<!-- Date/time created: {datetime.now()} -->\n')
+        xf.write_declaration()
+        xf.write(etree.Comment(' HelloWorld Example '), pretty_print=True)
 
         # Writes the initial group with all the namespace declarations and schemaLocations
-        ts.write("<xbrl  xmlns='http://www.xbrl.org/2003/instance'\n")
-        ts.write("       xmlns:xbrli = 'http://www.xbrl.org/2003/instance'\n")
-        ts.write("       xmlns:link = 'http://www.xbrl.org/2003/linkbase'\n")
-        ts.write("       xmlns:xlink = 'http://www.w3.org/1999/xlink'\n")
-        ts.write("       xmlns:xsi='http://www.w3.org/2001/XMLSchema-instance'\n")
-        ts.write("       xmlns:iso4217='http://www.xbrl.org/2003/iso4217'\n")
-
-        # Go grab the schemas....
-        ws_taxonomies = wb['Taxonomies']
-
-        # Write namespace declarations
-        for row in ws_taxonomies.iter_rows(min_row=2, max_col=2):
-            if row[0].value and len(str(row[0].value)) > 1:
-                ts.write(f"       xmlns:{row[0].value}='{row[1].value}'\n")
-
-        ts.write("       xsi:schemaLocation='\n")
-
-        # Write schema locations
-        for row in ws_taxonomies.iter_rows(min_row=2, max_col=5):
-            if row[0].value and len(str(row[0].value)) > 1 and row[4].value == "Yes":
-                ts.write(f"                 {row[1].value} {row[2].value} \n")
-
-        ts.write("       '>\n")
-        ts.write("\n")
-
-        # Write schemaRefs
-        for row in ws_taxonomies.iter_rows(min_row=2, max_col=5):
-            if row[0].value and len(str(row[0].value)) > 1 and row[3].value == "Yes":
-                ts.write(f"   <link:schemaRef xlink:type='simple' xlink:href='{row[2].value}' />\n")
-
-        # Process contexts....
-        ws_contexts = wb['Contexts']
-
-        ts.write("\n")
-        ts.write("   <!-- Contexts -->\n")
-
-        for row in ws_contexts.iter_rows(min_row=2, max_col=6):
-            if row[0].value and len(str(row[0].value)) > 1:
-                ts.write(f"   <context id='{row[0].value}'>\n")
-                ts.write("      <entity>\n")
-                ts.write(f"         <identifier scheme='{row[2].value}'>{row[1].value}</identifier>\n")
-                ts.write("      </entity>\n")
-                ts.write("      <period>\n")
-
-                if row[3].value == "Instant":
-                    ts.write(f"         <instant>{row[5].value}</instant>\n")
-                elif row[3].value == "Duration":
-                    ts.write(f"         <startDate>{row[4].value}</startDate>\n")
-                    ts.write(f"         <endDate>{row[5].value}</endDate>\n")
-                else:
-                    ts.write("         <instant>ERROR</instant>\n")
-
-                ts.write("      </period>\n")
-                ts.write("   </context>\n")
-
-        # Process units
-        ws_units = wb['Units']
-
-        ts.write("\n")
-        ts.write("   <!-- Units -->\n")
-
-        for row in ws_units.iter_rows(min_row=2, max_col=2):
-            if row[0].value and len(str(row[0].value)) > 1:
-                ts.write(f"   <unit id='{row[0].value}'>\n")
-                ts.write(f"      <measure>{row[1].value}</measure>\n")
-                ts.write("   </unit>\n")
-
-        # Fact values output based on mapping information
-        ws_mapping = wb['Mapping']
-
-        empty_cell_count = 0
-
-        ts.write("\n")
-        ts.write("   <!-- Fact values -->\n")
-
-        for row in ws_mapping.iter_rows(min_row=2):
-            if not row[0].value:
-                empty_cell_count += 1
-                if empty_cell_count == 100:
-                    break
-            else:
-                empty_cell_count = 0
-                # Process the row data here
-                # This part of the code was incomplete in the original VBA code
-                # You'll need to implement the specific logic for processing the mapping data
+        with xf.element(etree.QName(XBRLI, 'xbrl'), {etree.QName(XSI, 'schemaLocation'): schema_locations}, nsmap=nsmap):
+
+            # Write schemaRefs
+            for row in taxonomies:
+                if row[3] == "Yes":
+                    write_leaf(xf, 1, etree.QName(LINK, 'schemaRef'), None, {
+                        etree.QName(XLINK, 'type'): 'simple',
+                        etree.QName(XLINK, 'href'): str(row[2]),
+                        })
+
+            # Process contexts....
+            xf.write('\n   ')
+            xf.write(etree.Comment(' Contexts '))
+            for row in wb['Contexts'].iter_rows(min_row=2, max_col=6, values_only=True):
+                if not is_filled(row[0]):
+                    continue
+                key = interner.intern_context({
+                    'entity': (str(row[2]), str(row[1])),
+                    'start': format_date(row[4]) if row[3] == "Duration" else None,
+                    'end': format_date(row[5]) if row[3] in ("Instant", "Duration") else None,
+                    'instant': row[3] == "Instant",
+                    'dims': dimensions.get(str(row[0])),
+                    })
+                context_refs[str(row[0])] = written.setdefault(key, str(row[0]))
+                if context_refs[str(row[0])] != str(row[0]):
+                    continue
+                xf.write('\n   ')
+                with xf.element(etree.QName(XBRLI, 'context'), id=str(row[0])):
+                    xf.write('\n      ')
+                    with xf.element(etree.QName(XBRLI, 'entity')):
+                        write_leaf(xf, 3, etree.QName(XBRLI, 'identifier'), str(row[1]), {'scheme': str(row[2])})
+                        if dimensions.get(str(row[0])):
+                            xf.write('\n         ')
+                            with xf.element(etree.QName(XBRLI, 'segment')):
+                                for s_dimension, s_member in dimensions[str(row[0])].items():
+                                    write_leaf(xf, 4, etree.QName(XBRLDI, 'explicitMember'), s_member, {'dimension': s_dimension})
+                                xf.write('\n         ')
+                        xf.write('\n      ')
+                    xf.write('\n      ')
+                    with xf.element(etree.QName(XBRLI, 'period')):
+                        if row[3] == "Instant":
+                            write_leaf(xf, 3, etree.QName(XBRLI, 'instant'), format_date(row[5]))
+                        elif row[3] == "Duration":
+                            write_leaf(xf, 3, etree.QName(XBRLI, 'startDate'), format_date(row[4]))
+                            write_leaf(xf, 3, etree.QName(XBRLI, 'endDate'), format_date(row[5]))
+                        else:
+                            write_leaf(xf, 3, etree.QName(XBRLI, 'instant'), 'ERROR')
+                        xf.write('\n      ')
+                    xf.write('\n   ')
+
+            # Process units
+            xf.write('\n   ')
+            xf.write(etree.Comment(' Units '))
+            for row in wb['Units'].iter_rows(min_row=2, max_col=2, values_only=True):
+                if not is_filled(row[0]):
+                    continue
+                key = interner.intern_unit(str(row[1]))
+                unit_refs[str(row[0])] = written.setdefault(key, str(row[0]))
+                if unit_refs[str(row[0])] != str(row[0]):
+                    continue
+                xf.write('\n   ')
+                with xf.element(etree.QName(XBRLI, 'unit'), id=str(row[0])):
+                    write_leaf(xf, 2, etree.QName(XBRLI, 'measure'), str(row[1]))
+                    xf.write('\n   ')
+
+            # Fact values output based on mapping information
+            xf.write('\n   ')
+            xf.write(etree.Comment(' Fact values '))
+            for s_target in target_sheets:
+                cells = CellReader(wb[s_target] if s_target in wb.sheetnames else None)
+                for row_number, (s_spreadsheet, s_cell, s_concept, s_context_ref, s_unit_ref, s_decimals, s_scale) in Mapping.iter_worksheet(ws_mapping):
+                    # Tests to see if it is a start/stop tuple, if so, skips row in mapping table.
+                    if s_spreadsheet != s_target or s_context_ref is None or len(str(s_context_ref)) == 0:
+                        continue
+                    tag = concept_tag(s_concept, row_number)
+                    s_value = cells.get(s_cell)
+                    attrib = {'contextRef': context_refs.get(str(s_context_ref), str(s_context_ref))}
+                    if s_unit_ref and s_decimals is not None:
+                        # Is numeric
+                        attrib['unitRef'] = unit_refs.get(str(s_unit_ref), str(s_unit_ref))
+                        if s_value is None:
+                            # A nil fact has no decimals (xbrl 4.6.3)
+                            attrib[etree.QName(XSI, 'nil')] = 'true'
+                        else:
+                            attrib['decimals'] = str(s_decimals)
+                            s_value = format_value(s_value, s_scale)
+                    elif s_value is None:
+                        # Is text
+                        s_value = ''
+                    write_leaf(xf, 1, tag, None if s_value is None else str(s_value), attrib)
+            xf.write('\n')
+
+    wb.close()
+    return output_file
 
 if __name__ == "__main__":
     generate_xbrl()
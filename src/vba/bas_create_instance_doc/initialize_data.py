@@ -3,12 +3,12 @@
 Test template (default) workflow
 
 
-This Python code uses the `openpyxl` library to interact 
-with Excel workbooks. The `initialize_data` function takes 
-the path to the workbook as an argument and performs the 
-same operations as the original Visual Basic code. The 
-function loads the workbook, processes the "Mapping" 
-worksheet, and updates the target worksheets based on the 
+This Python code uses the `openpyxl` library to interact
+with Excel workbooks. The `initialize_data` function takes
+the path to the workbook as an argument and performs the
+same operations as the original Visual Basic code. The
+function loads the workbook, processes the "Mapping"
+worksheet, and updates the target worksheets based on the
 mapping data. Finally, it saves the workbook.
 """
 
@@ -17,59 +17,30 @@ __version__ = "0.1.0"
 __license__ = "AGPL-3.0"
 
 
-import openpyxl
-from openpyxl.utils import get_column_letter
+from .mapping import open_mapping
 
-def initialize_data(workbook_path):
-    # Load the workbook
-    wb = openpyxl.load_workbook(workbook_path)
-    started_at_sheet = wb.active.title
-
-    # Disable screen updating (not applicable in Python)
-    # Application.ScreenUpdating = False
-
-    # Select the "Mapping" worksheet
-    ws_mapping = wb["Mapping"]
-
-    empty_cell_count = 0
-    current_row = 2  # Start from row 2
 
-    while empty_cell_count < 100:
-        # Get the cell in column A of the current row
-        cell = ws_mapping[f"A{current_row}"]
+def initialize_mapped_cells(wb, mapping):
+    """Set every mapped fact cell to its placeholder: 0 for numeric facts,
+    '[enter text here]' for text.  Tuple start/stop rows are skipped.
 
-        if cell.value is None:
-            # Cell is empty
-            empty_cell_count += 1
+    Returns:
+        int: number of cells written
+    """
+    values = {}
+    for idx in mapping.facts():
+        if mapping.numeric[idx]:
+            # Has unit ref and decimals, therefore is Numeric
+            values[idx] = 0
         else:
-            # Get values from the current row
-            s_spreadsheet = cell.value
-            s_cell = ws_mapping[f"B{current_row}"].value
-            s_concept = ws_mapping[f"C{current_row}"].value
-            s_context_ref = ws_mapping[f"D{current_row}"].value
-            s_unit_ref = ws_mapping[f"E{current_row}"].value
-            s_decimals = ws_mapping[f"F{current_row}"].value
+            # No unit ref or decimals, so string
+            values[idx] = "[enter text here]"
+    return mapping.write_values(wb, values)
 
-            # Tests to see if it is a start/stop tuple, if so, skips row in mapping table.
-            if s_context_ref is not None and len(str(s_context_ref)) > 0:
-                if s_unit_ref is not None and len(str(s_unit_ref)) > 0 and s_decimals is not None and len(str(s_decimals)) > 0:
-                    # Has unit ref and decimals, therefore is Numeric
-                    s_value = 0
-                else:
-                    # No unit ref or decimals, so string
-                    s_value = "[enter text here]"
 
-                # Set the value in the target worksheet and cell
-                target_ws = wb[s_spreadsheet]
-                target_ws[s_cell] = s_value
-
-        current_row += 1
-
-    # Select the original worksheet
-    wb.active = wb[started_at_sheet]
-
-    # Save the workbook
-    wb.save(workbook_path)
+def initialize_data(workbook_path):
+    with open_mapping(workbook_path) as (wb, mapping):
+        return initialize_mapped_cells(wb, mapping)
 
 # Example usage
-# initialize_data("path_to_your_workbook.xlsx")
\ No newline at end of file
+# initialize_data("path_to_your_workbook.xlsx")
@@ -10,65 +10,129 @@ __license__ = "AGPL-3.0"
 
 
 
-# Get context info
-def get_context_info(s_context_ref):
-    """
-    Get context info from the worksheet based on the given context reference.
-
-    Args:
-        s_context_ref (str): The context reference to search for.
+class ContextIndex:
+    """Contexts and Dimensions sheets indexed by context id, read once.
 
-    Returns:
-        str: The context info as a string.
-    """
-    context_info = ""
-    for row in worksheet.iter_rows(min_row=1, values_only=True):
-        if row[0] == s_context_ref:
-            context_info += f"Context ID: {row[0]}\n"
-            context_info += f"Entity Scheme: {row[2]}\n"
-            context_info += f"Entity ID: {row[1]}\n"
-            if row[3] == "Instant":
-                context_info += f"Period: [As of] {row[5]}\n"
-            elif row[3] == "Duration":
-                context_info += f"Period: [For Period] {row[4]} to {row[5]}\n"
-            context_info += f"Period: {row[3]}\n"
-            context_info += "\n"
-            break
-    return context_info
-
-# Get dimensions info
-def get_dimensions_info(s_context_ref):
-    """
-    Get dimensions info from the worksheet based on the given context reference.
+    The context and dimension text for the audit comments is rendered once
+    per context and memoized, so building comments for a mapping is linear
+    in its rows.
 
     Args:
-        s_context_ref (str): The context reference to search for.
+        contexts (dict): {context id: Contexts row}
+        dimensions (dict): {context id: [Dimensions rows]}
 
-    Returns:
-        str: The dimensions info as a string.
+    Usage:
+        context_index = ContextIndex.from_workbook(wb)
+        context_index.get_context_info(s_context_ref)
+        context_index.hit_rate()
     """
-    dimensions_info = ""
-    for row in worksheet.iter_rows(min_row=1, values_only=True):
-        if row[0] == s_context_ref:
+
+    def __init__(self, contexts=None, dimensions=None):
+        self.contexts = contexts or {}
+        self.dimensions = dimensions or {}
+        self._context_info = {}
+        self._dimensions_info = {}
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def __repr__(self):
+        return f'ContextIndex(contexts={len(self.contexts)}, stats={self.stats})'
+
+    @classmethod
+    def from_workbook(cls, wb, contexts_sheet='Contexts', dimensions_sheet='Dimensions'):
+        """Index the Contexts and Dimensions sheets, in one pass each.  A
+        missing sheet indexes as empty."""
+        contexts = {}
+        if contexts_sheet in wb.sheetnames:
+            for row in wb[contexts_sheet].iter_rows(min_row=1, max_col=6, values_only=True):
+                if row[0] is not None:
+                    #first row wins, as with the scan
+                    contexts.setdefault(row[0], row)
+        dimensions = {}
+        if dimensions_sheet in wb.sheetnames:
+            for row in wb[dimensions_sheet].iter_rows(min_row=1, max_col=4, values_only=True):
+                if row[0] is not None:
+                    dimensions.setdefault(row[0], []).append(row)
+        return cls(contexts, dimensions)
+
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def _memoized(self, cache, render, s_context_ref):
+        text = cache.get(s_context_ref)
+        if text is None:
+            self.stats['misses'] += 1
+            text = cache[s_context_ref] = render(s_context_ref)
+        else:
+            self.stats['hits'] += 1
+        return text
+
+    # Get context info
+    def get_context_info(self, s_context_ref):
+        """
+        Get context info for the given context reference.
+
+        Args:
+            s_context_ref (str): The context reference to search for.
+
+        Returns:
+            str: The context info as a string.
+        """
+        return self._memoized(self._context_info, self.render_context_info, s_context_ref)
+
+    # Get dimensions info
+    def get_dimensions_info(self, s_context_ref):
+        """
+        Get dimensions info for the given context reference.
+
+        Args:
+            s_context_ref (str): The context reference to search for.
+
+        Returns:
+            str: The dimensions info as a string.
+        """
+        return self._memoized(self._dimensions_info, self.render_dimensions_info, s_context_ref)
+
+    def render_context_info(self, s_context_ref):
+        row = self.contexts.get(s_context_ref)
+        if row is None:
+            return ""
+        row = tuple(row) + (None,) * (6 - len(row))
+        context_info = ""
+        context_info += f"Context ID: {row[0]}\n"
+        context_info += f"Entity Scheme: {row[2]}\n"
+        context_info += f"Entity ID: {row[1]}\n"
+        if row[3] == "Instant":
+            context_info += f"Period: [As of] {row[5]}\n"
+        elif row[3] == "Duration":
+            context_info += f"Period: [For Period] {row[4]} to {row[5]}\n"
+        context_info += f"Period: {row[3]}\n"
+        context_info += "\n"
+        return context_info
+
+    def render_dimensions_info(self, s_context_ref):
+        dimensions_info = ""
+        for row in self.dimensions.get(s_context_ref, []):
+            row = tuple(row) + (None,) * (4 - len(row))
             dimensions_info += "\n"
             dimensions_info += f"Dimension: {row[2]}\n"
             dimensions_info += f"Member: {row[3]}\n"
-    return dimensions_info
+        return dimensions_info
 
 # Example usage
 if __name__ == "__main__":
-    file_path = "example.xbrl"  # Replace with your file path
+    from openpyxl import load_workbook
+
+    workbook_path = "example.xlsx"  # Replace with your workbook path
+    file_path = "example.txt"  # Replace with your output path
     s_context_ref = "example_context_ref"  # Replace with your xbrl context reference
 
+    context_index = ContextIndex.from_workbook(load_workbook(workbook_path, read_only=True))
     lines = []
-    context_info_lines = get_context_info(s_context_ref)
-    dimensions_info_lines = get_dimensions_info(s_context_ref)
-    lines.extend(context_info_lines)
-    lines.extend(dimensions_info_lines)
+    lines.append(context_index.get_context_info(s_context_ref))
+    lines.append(context_index.get_dimensions_info(s_context_ref))
 
     with open(file_path, 'w') as f:
         f.writelines(lines)
 
-
-
-    print('complete')
\ No newline at end of file
+    print('complete')
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Mapping sheet engine
+
+The `Mapping` worksheet ties workbook cells to xbrl facts, one row per
+fact: sheet, cell, concept, context, unit, decimals, scale.  The VBA ports
+(initialize_data, populate_spreadsheet, generate_audit_information,
+clear_audit_information) share this engine: the sheet is read once, in a
+single `iter_rows` pass, into columns, and each operation is a batched pass
+over the columns against one open workbook.
+
+Usage:
+    with open_mapping('your_workbook.xlsx') as (wb, mapping):
+        clear_mapped_comments(wb, mapping)
+        initialize_mapped_cells(wb, mapping)
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+import os
+from contextlib import contextmanager
+from openpyxl import load_workbook
+
+
+FIELDS = ('sheet', 'cell', 'concept', 'context', 'unit', 'decimals', 'scale')
+MAX_EMPTY_ROWS = 100
+
+
+def is_filled(value):
+    return value is not None and len(str(value)) > 0
+
+
+class Mapping:
+    """Columnar view of the Mapping sheet: one list per field, aligned by
+    row index.
+
+    Args:
+        columns (dict): {field: list} for each of FIELDS
+
+    Note:
+        * rows without a context are tuple start/stop markers; `facts`
+        excludes them
+        * a row is numeric when it has both a unit and decimals
+    """
+
+    def __init__(self, columns=None):
+        columns = columns or {}
+        for field in FIELDS:
+            setattr(self, field, list(columns.get(field, [])))
+        self.has_context = [is_filled(context) for context in self.context]
+        self.numeric = [is_filled(unit) and is_filled(decimals) for unit, decimals in zip(self.unit, self.decimals)]
+
+    def __repr__(self):
+        return f'Mapping(rows={len(self)}, sheets={list(self.by_sheet())})'
+
+    def __len__(self):
+        return len(self.sheet)
+
+    @staticmethod
+    def iter_worksheet(ws_mapping, max_empty_rows=MAX_EMPTY_ROWS):
+        """Stream the Mapping sheet from row 2 as (row number, row) with rows
+        padded to FIELDS, stopping after `max_empty_rows` consecutive rows
+        with an empty column A."""
+        empty_cell_count = 0
+        for row_number, row in enumerate(ws_mapping.iter_rows(min_row=2, max_col=len(FIELDS), values_only=True), start=2):
+            if not row or row[0] is None:
+                empty_cell_count += 1
+                if empty_cell_count >= max_empty_rows:
+                    break
+                continue
+            empty_cell_count = 0
+            yield row_number, tuple(row) + (None,) * (len(FIELDS) - len(row))
+
+    @classmethod
+    def from_worksheet(cls, ws_mapping, max_empty_rows=MAX_EMPTY_ROWS):
+        """Read the Mapping sheet into columns, as `iter_worksheet`."""
+        columns = {field: [] for field in FIELDS}
+        for _, row in cls.iter_worksheet(ws_mapping, max_empty_rows):
+            for field, value in zip(FIELDS, row):
+                columns[field].append(value)
+        return cls(columns)
+
+    # GETTERS
+
+    def rows(self):
+        """Iterate (sheet, cell, concept, context, unit, decimals, scale)."""
+        return zip(*(getattr(self, field) for field in FIELDS))
+
+    def facts(self):
+        """Get the row indexes that are facts, not tuple markers."""
+        return [idx for idx, has_context in enumerate(self.has_context) if has_context]
+
+    def by_sheet(self, indexes=None):
+        """Group row indexes by target sheet, in first-seen order."""
+        groups = {}
+        for idx in (range(len(self)) if indexes is None else indexes):
+            groups.setdefault(self.sheet[idx], []).append(idx)
+        return groups
+
+    def target_cells(self, wb, indexes=None):
+        """Iterate (row index, openpyxl cell) for mapped cells, resolving each
+        target sheet once.  Rows whose sheet is missing are skipped."""
+        for s_spreadsheet, sheet_indexes in self.by_sheet(indexes).items():
+            if s_spreadsheet not in wb.sheetnames:
+                continue
+            ws = wb[s_spreadsheet]
+            for idx in sheet_indexes:
+                yield idx, ws[self.cell[idx]]
+
+    def read_values(self, wb, indexes=None):
+        """Get {row index: cell value} for mapped cells."""
+        return {idx: cell.value for idx, cell in self.target_cells(wb, indexes)}
+
+    # SETTERS
+
+    def write_values(self, wb, values):
+        """Write {row index: value} to the mapped cells."""
+        for idx, cell in self.target_cells(wb, list(values)):
+            cell.value = values[idx]
+        return len(values)
+
+    def write_comments(self, wb, comments):
+        """Set {row index: Comment or None} on the mapped cells."""
+        for idx, cell in self.target_cells(wb, list(comments)):
+            cell.comment = comments[idx]
+        return len(comments)
+
+
+@contextmanager
+def open_mapping(workbook_path, data_only=False, save=True):
+    """Load a workbook and its Mapping once for a `with` block, then save it
+    once on a clean exit.
+
+    Usage:
+        with open_mapping(workbook_path) as (wb, mapping):
+            ...
+    """
+    workbook_path = os.path.abspath(workbook_path)
+    wb = load_workbook(filename=workbook_path, data_only=data_only)
+    started_at_sheet = wb.active.title
+    mapping = Mapping.from_worksheet(wb['Mapping'])
+    try:
+        yield wb, mapping
+        if save:
+            # Select the original worksheet
+            wb.active = wb[started_at_sheet]
+            wb.save(workbook_path)
+    finally:
+        wb.close()
@@ -9,99 +9,130 @@ Test template (default) workflow
 2. The code uses `openpyxl` for Excel operations and `lxml` for XML parsing.
 3. Error handling is simplified compared to the VB version but covers the main cases.
 4. The XML parsing is more robust with proper error handling.
-5. The tuple-related variables are included but not fully implemented as their usage wasn't clear in the original code.
+5. Tuple start/stop rows in the Mapping sheet are not handled specially; they have no fact to look up.
 6. The code maintains the same logic flow as the original VB code while following Python best practices.
 """
 import os
+import time
 from lxml import etree
-from openpyxl import load_workbook
-
-def populate_spreadsheet():
-    # Load the workbook
-    wb = load_workbook(filename=os.path.abspath('your_workbook.xlsx'), data_only=True)
-    ws_setup = wb["Setup"]
-    ws_mapping = wb["Mapping"]
-
-    # Get the starting sheet name
-    started_at_sheet = wb.active.title
-
-    # Determine file path
-    if str(ws_setup['B5'].value).startswith("http://"):
-        file_path = ws_setup['B5'].value
-    else:
-        file_path = os.path.join(os.path.dirname(os.path.abspath(wb.filename)), ws_setup['B2'].value)
-
-    print(f"Loading data from: {file_path}")
-
-    try:
-        # Parse XML document
-        parser = etree.XMLParser(recover=True)
-        o_document = etree.parse(file_path, parser)
-
-        # Check for XML errors
-        if o_document.getroot() is None:
-            raise ValueError("Failed to parse XML document")
-
-        empty_cell_count = 0
-        tuple_status = False
-        tuple_element = ""
-        tuple_number = 0
-        i_counter = 0
-
-        # Start from row 2 in Mapping sheet
-        current_row = 2
-
-        while empty_cell_count < 100:
-            i_counter += 1
-
-            # Check if current row is empty
-            if ws_mapping[f'A{current_row}'].value is None:
-                empty_cell_count += 1
-            else:
-                empty_cell_count = 0  # Reset counter if we find a non-empty cell
-
-                s_value = "[error]"
-                s_spreadsheet = ws_mapping[f'A{current_row}'].value
-                s_cell = ws_mapping[f'B{current_row}'].value
-                s_concept = ws_mapping[f'C{current_row}'].value
-                s_context_ref = ws_mapping[f'D{current_row}'].value
-                s_unit_ref = ws_mapping[f'E{current_row}'].value
-                s_decimals = ws_mapping[f'F{current_row}'].value
-                s_scale = ws_mapping[f'G{current_row}'].value
-
-                # Handle numeric vs text values
-                if s_unit_ref and s_decimals is not None:
-                    # Numeric value
-                    node = o_document.find(f".//{s_concept}[@{'contextRef'}='{s_context_ref}']")
-                    if node is not None and node.text is not None:
-                        try:
-                            s_value = float(node.text) / float(s_scale)
-                        except (ValueError, TypeError):
-                            s_value = "[error]"
-                else:
-                    # Text value
-                    node = o_document.find(f".//{s_concept}[@{'contextRef'}='{s_context_ref}']")
-                    if node is not None:
-                        s_value = node.text if node.text is not None else "[error]"
-
-                # Write to target sheet
-                if s_spreadsheet in wb.sheetnames:
-                    target_sheet = wb[s_spreadsheet]
-                    target_sheet[s_cell] = s_value
-
-            current_row += 1
-
-    except Exception as e:
-        print(f"Error loading file: {file_path}\nError: {str(e)}")
-        return
-
-    finally:
-        # Save and close workbook
-        wb.save(filename=os.path.abspath('your_workbook.xlsx'))
-        wb.close()
-
-        # Return to original sheet (conceptual - Python doesn't have active sheet state)
-        print(f"Processing complete. Started at sheet: {started_at_sheet}")
+
+from .mapping import open_mapping
+
+
+def build_fact_index(o_document):
+    """Index fact values by (concept, contextRef) in one pass over the
+    instance, replacing one `.//concept[@contextRef=...]` scan per mapping row.
+
+    Concepts are indexed by both their prefixed name ('HelloWorld:Land') and
+    local name ('Land').  As with `find()`, the first fact in document order
+    wins.
+
+    Returns:
+        dict: {(concept, contextRef): element text}
+    """
+    index = {}
+    for elem in o_document.getroot().iter():
+        s_context_ref = elem.get('contextRef')
+        if s_context_ref is None or not isinstance(elem.tag, str):
+            continue
+        local_name = etree.QName(elem).localname
+        if elem.prefix:
+            index.setdefault((f"{elem.prefix}:{local_name}", s_context_ref), elem.text)
+        index.setdefault((local_name, s_context_ref), elem.text)
+    return index
+
+
+def populate_mapped_cells(wb, mapping, fact_index, stats=None):
+    """Join the mapping to the fact index and write the values to the mapped
+    cells.  Numeric values are divided by the mapping's scale; values that
+    are missing or do not parse are written as '[error]'.
+
+    Returns:
+        dict: stats, updated with rows, hits, misses and lookup_time
+    """
+    stats = {} if stats is None else stats
+    stats['rows'] = len(mapping)
+    stats['hits'] = 0
+    stats['misses'] = 0
+
+    # Join mapping rows to the fact index
+    started_at = time.perf_counter()
+    values = {}
+    for idx, (s_spreadsheet, s_cell, s_concept, s_context_ref, s_unit_ref, s_decimals, s_scale) in enumerate(mapping.rows()):
+        s_value = "[error]"
+        text = fact_index.get((s_concept, s_context_ref))
+        if text is None:
+            stats['misses'] += 1
+        else:
+            stats['hits'] += 1
+        # Handle numeric vs text values
+        if s_unit_ref and s_decimals is not None:
+            # Numeric value
+            if text is not None:
+                try:
+                    s_value = float(text) / float(s_scale)
+                except (ValueError, TypeError):
+                    s_value = "[error]"
+        elif text is not None:
+            # Text value
+            s_value = text
+        values[idx] = s_value
+    stats['lookup_time'] = time.perf_counter() - started_at
+
+    # Write to target sheets
+    mapping.write_values(wb, values)
+    return stats
+
+
+def populate_spreadsheet(workbook_path='your_workbook.xlsx'):
+    """Populate mapped worksheet cells with fact values from the instance.
+
+    Returns:
+        dict: timing and counts for the index build and the lookups
+    """
+    stats = {'index_time': 0.0, 'lookup_time': 0.0, 'index_keys': 0, 'rows': 0, 'hits': 0, 'misses': 0}
+
+    # Load the workbook and its mapping
+    with open_mapping(workbook_path, data_only=True) as (wb, mapping):
+        ws_setup = wb["Setup"]
+        started_at_sheet = wb.active.title
+
+        # Determine file path
+        if str(ws_setup['B5'].value).startswith("http://"):
+            file_path = ws_setup['B5'].value
+        else:
+            file_path = os.path.join(os.path.dirname(os.path.abspath(workbook_path)), ws_setup['B2'].value)
+
+        print(f"Loading data from: {file_path}")
+
+        try:
+            # Parse XML document
+            parser = etree.XMLParser(recover=True)
+            o_document = etree.parse(file_path, parser)
+
+            # Check for XML errors
+            if o_document.getroot() is None:
+                raise ValueError("Failed to parse XML document")
+
+            # Index facts once
+            started_at = time.perf_counter()
+            fact_index = build_fact_index(o_document)
+            stats['index_time'] = time.perf_counter() - started_at
+            stats['index_keys'] = len(fact_index)
+
+            populate_mapped_cells(wb, mapping, fact_index, stats)
+
+        except Exception as e:
+            print(f"Error loading file: {file_path}\nError: {str(e)}")
+            return stats
+
+        finally:
+            # Return to original sheet (conceptual - Python doesn't have active sheet state)
+            print(f"Processing complete. Started at sheet: {started_at_sheet}")
+
+    print(f"Indexed {stats['index_keys']} fact keys in {stats['index_time']:.4f}s; "
+          f"looked up {stats['rows']} rows in {stats['lookup_time']:.4f}s")
+    return stats
 
 if __name__ == "__main__":
-    populate_spreadsheet()
\ No newline at end of file
+    populate_spreadsheet()
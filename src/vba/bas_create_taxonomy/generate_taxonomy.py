@@ -27,13 +27,17 @@ def create_using_string(args):
         # Write XML header and comments
         file.write('<?xml version="1.0" encoding="utf-8"?>\n')
         file.write('<!-- HelloWorld Example -->\n')
-        file.write(f'<!-- Date/time created: {datetime.now()} -->\n\n')
+        if args.get('timestamp', True):
+            file.write(f'<!-- Date/time created: {datetime.now()} -->\n')
+        file.write('\n')
 
         # Write schema opening tag
         file.write('<schema  xmlns="http://www.w3.org/2001/XMLSchema"\n')
         file.write('         xmlns:xbrli="http://www.xbrl.org/2003/instance"\n')
         file.write('         xmlns:link="http://www.xbrl.org/2003/linkbase"\n')
         file.write('         xmlns:xlink="http://www.w3.org/1999/xlink"\n')
+        for schema_import in args.get('imports') or []:
+            file.write(f'         xmlns:{schema_import["prefix"]}="{schema_import["namespace"]}"\n')
         file.write(f'         xmlns:{namespace_prefix}="{namespace_identifier}"\n')  # Replace "C4_value" and "C5_value" with actual values from cells C4 and C5
         file.write(f'         targetNamespace="{namespace_identifier}"\n')  # Replace "C5_value" with actual value from cell C5
         file.write('         elementFormDefault="qualified"\n')
@@ -43,9 +47,13 @@ def create_using_string(args):
         file.write('   <import\n')
         file.write('      namespace="http://www.xbrl.org/2003/instance"\n')
         file.write('      schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd" />\n\n')
+        for schema_import in args.get('imports') or []:
+            file.write('   <import\n')
+            file.write(f'      namespace="{schema_import["namespace"]}"\n')
+            file.write(f'      schemaLocation="{schema_import["location"]}" />\n\n')
 
         # Write elements (replace with actual data from your Excel sheet)
-        elements = [
+        elements = args.get('elements') or [
             {"name": "Element1", "type": "Type1", "period_type": "Period1", "substitution_group": "Group1"},
             {"name": "Element2", "type": "Type2", "period_type": "Period2", "substitution_group": "Group2"},
             # Add more elements as needed
@@ -56,6 +64,8 @@ def create_using_string(args):
             file.write(f'       name="{element["name"]}"\n')
             file.write(f'       type="{element["type"]}"\n')
             file.write(f'       substitutionGroup="{element["substitution_group"]}"\n')
+            if element.get("abstract"):
+                file.write(f'       abstract="{element["abstract"]}"\n')
             file.write(f'       xbrli:periodType="{element["period_type"]}" />\n\n')
 
         # Write closing tag
@@ -66,69 +76,80 @@ def create_using_string(args):
 from lxml import etree
 
 def create_using_lxml(args):
-    """..."""
+    """Write the same schema as create_using_string, built as an lxml tree."""
     output_file = args['output_file']
     namespace_prefix = args['namespace_prefix']
     namespace_identifier = args['namespace_identifier']
+    xsd = 'http://www.w3.org/2001/XMLSchema'
+    xbrli = 'http://www.xbrl.org/2003/instance'
     nsmap = {
-        'xmlns': 'http://www.w3.org/2001/XMLSchema',
-        'xbrli': 'http://www.xbrl.org/2003/instance'
+        None: xsd,
+        'xbrli': xbrli,
+        'link': 'http://www.xbrl.org/2003/linkbase',
+        'xlink': 'http://www.w3.org/1999/xlink',
         }
-    remove_xlmns_placeholder = 'xmlns'
-    etree.register_namespace(remove_xlmns_placeholder, nsmap['xmlns'])
-    etree.register_namespace('xbrli', nsmap['xbrli'])
-    elementsInfo = [
-        {"name": "Element1", "type": etree.QName(nsmap['xbrli'],"Type1"), "substitutionGroup": etree.QName(nsmap['xbrli'],"Group1"), etree.QName(nsmap['xbrli'],"periodType"): "Period1"},
-        {"name": "Element2", "type": etree.QName(nsmap['xbrli'],"Type2"), "substitutionGroup": etree.QName(nsmap['xbrli'],"Group2"), etree.QName(nsmap['xbrli'],"periodType"): "Period2"},
+    imports = [{'namespace': xbrli, 'location': 'http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd'}]
+    for schema_import in args.get('imports') or []:
+        nsmap[schema_import['prefix']] = schema_import['namespace']
+        imports.append(schema_import)
+    nsmap[namespace_prefix] = namespace_identifier
+    elements = args.get('elements') or [
+        {"name": "Element1", "type": "Type1", "period_type": "Period1", "substitution_group": "Group1"},
+        {"name": "Element2", "type": "Type2", "period_type": "Period2", "substitution_group": "Group2"},
         # Add more elements as needed
         ]
     #schema
-    root = etree.Element("root")
-    # Create an element with a namespace
-    #schema = etree.Element('{%s}schema' % (nsmap["xmlns"]), nsmap={None: nsmap["xmlns"]})
-    schema  = etree.SubElement(root, 'schema')   #, '{%s}schema' % (nsmap["xmlns"]))
-    qname = etree.QName(nsmap["xmlns"], 'xbrli')
-    schema.attrib[qname] = "http://www.xbrl.org/2003/instance"
-    qname = etree.QName(nsmap["xmlns"], 'xbrli')
-    schema.attrib[qname] = "http://www.xbrl.org/2003/instance"
-    qname = etree.QName(nsmap["xmlns"], 'link')
-    schema.attrib[qname] = "http://www.xbrl.org/2003/linkbase"
-    qname = etree.QName(nsmap["xmlns"], 'xlink')
-    schema.attrib[qname] = "http://www.w3.org/1999/xlink"
-    qname = etree.QName(nsmap["xmlns"], output_file )
-    schema.attrib[qname] = f"http://xbrl.squarespace.com/{output_file}"
-    schema.attrib['targetNamespace'] = f"http://xbrl.squarespace.com/{output_file}"
+    schema = etree.Element(etree.QName(xsd, 'schema'), nsmap=nsmap)
+    schema.attrib['targetNamespace'] = namespace_identifier
     schema.attrib['elementFormDefault'] = "qualified"
     schema.attrib['attributeFormDefault'] = "unqualified"
+    schema.addprevious(etree.Comment(' HelloWorld Example '))
+    if args.get('timestamp', True):
+        schema.addprevious(etree.Comment(f' Date/time created: {datetime.now()} '))
 
     #import
-    elImport = etree.SubElement(schema, "import")
-    elImport.attrib['namespace'] = 'http://www.xbrl.org/2003/instance'
-    elImport.attrib['schemaLocation'] = 'http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd'
-
-    #child.text = "This is a child element"
-    for info in elementsInfo:
-        el = etree.SubElement(schema, "element")
-        for k,v in info.items():
-            el.attrib[k] = v
-
-    tree = etree.ElementTree(schema)
-    tree_str = etree.tostring(tree).decode()
-    tree_str = tree_str.replace(f':{remove_xlmns_placeholder}=', '=')
-    tree = etree.fromstring(tree_str)
-    tree = etree.ElementTree(tree)
-    tree.write(output_file, pretty_print=True, xml_declaration=True, encoding="utf-8")
-
-
-
-
-def generate_taxonomy(file_path, method='string'):
+    for schema_import in imports:
+        el_import = etree.SubElement(schema, etree.QName(xsd, 'import'))
+        el_import.attrib['namespace'] = schema_import['namespace']
+        el_import.attrib['schemaLocation'] = schema_import['location']
+
+    for element in elements:
+        el = etree.SubElement(schema, etree.QName(xsd, 'element'))
+        el.attrib['name'] = element['name']
+        el.attrib['type'] = element['type']
+        el.attrib['substitutionGroup'] = element['substitution_group']
+        if element.get('abstract'):
+            el.attrib['abstract'] = element['abstract']
+        el.attrib[etree.QName(xbrli, 'periodType')] = element['period_type']
+
+    etree.ElementTree(schema).write(output_file, pretty_print=True, xml_declaration=True, encoding="utf-8")
+
+
+def generate_taxonomy(file_path, method='string', elements=None, namespace_prefix='HelloWorld', namespace_identifier='http://xbrl.squarespace.com/HelloWorld', imports=None, timestamp=True):
+    """Generate a taxonomy schema.
+
+    Args:
+        file_path (str): output path, relative to the working directory
+        method (str): 'string' or 'lxml'
+        elements (list): element dicts with keys name, type, period_type and
+        substitution_group, and optionally abstract; defaults to the two
+        example elements
+        namespace_prefix (str): prefix of the target namespace
+        namespace_identifier (str): target namespace
+        imports (list): dicts with keys prefix, namespace and location, of
+        schemas imported besides the instance schema
+        timestamp (bool): write the creation time comment; False for output
+        that is identical across runs
+    """
     #get the output file path
     output_file = os.path.join(os.getcwd(), file_path)  # Replace "C6_value.txt" with the actual value from cell C6
     args = {
         'output_file' : output_file,
-        'namespace_prefix' : 'HelloWorld',
-        'namespace_identifier': 'http://xbrl.squarespace.com/HelloWorld'
+        'namespace_prefix' : namespace_prefix,
+        'namespace_identifier': namespace_identifier,
+        'elements': elements,
+        'imports': imports,
+        'timestamp': timestamp,
     }
     #create taxonomy
     match method:
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Validation rules engine
+
+Declarative checks over workbook cells, one Rule each:
+* total - a cell equals the sum of ranges, e.g. C14 = C9:C13
+* tie - a cell equals a cell, usually on another sheet
+* required - every cell of ranges is filled
+* sign - every cell of ranges is >= 0 ('+') or <= 0 ('-')
+
+Rules compile into a RulePlan: the distinct cells they reference, and each
+rule's target and operand cells as index arrays (CSR).  The plan reads the
+referenced block of each sheet in one read-only pass, and evaluates every
+rule at once with numpy, so thousands of rules cost one workbook read and a
+few array passes.
+
+Usage:
+    plan = RulePlan([
+        Rule('total', 'C14', 'C9:C13', sheet='Hello World Example'),
+        Rule('tie', "'Balance Sheet'!C20", "'Schedule A'!D5"),
+        Rule('required', 'B2:B6', sheet='Entity'),
+        Rule('sign', 'C9:C13', '+', sheet='Hello World Example'),
+        ])
+    messages = plan.run('your_workbook.xlsx')
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+import numpy as np
+from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries, get_column_letter
+
+
+KINDS = ('total', 'tie', 'required', 'sign')
+FIELDS = ('kind', 'sheet', 'target', 'operand', 'level', 'name', 'passed', 'failed', 'tolerance')
+FAILED = {
+    'total': "{name} does not foot!  {target} = {value}, whereas the sum of {operand} is {expected}.",
+    'tie': "{name} does not tie!  {target} = {value}, whereas {operand} is {expected}.",
+    'required': "{name} is required, but {cells} is empty.",
+    'sign': "{name} must be {sign}, but {cells} is not.",
+}
+MAX_CELLS_LISTED = 10
+
+
+def parse_ref(ref, sheet=None):
+    """Get (sheet, min_col, min_row, max_col, max_row) for each range of a
+    reference such as "'Hello World Example'!C9:C13,C15"; ranges without a
+    sheet are on `sheet`."""
+    ranges = []
+    for part in str(ref).split(','):
+        part = part.strip()
+        if '!' in part:
+            part_sheet, _, part = part.rpartition('!')
+            part_sheet = part_sheet.strip("'").replace("''", "'")
+        else:
+            part_sheet = sheet
+        if part_sheet is None:
+            raise ValueError(f'no sheet for reference: {ref}')
+        min_col, min_row, max_col, max_row = range_boundaries(part.replace('$', ''))
+        ranges.append((part_sheet, min_col, min_row, max_col, max_row))
+    return ranges
+
+
+def cell_name(sheet, row, col):
+    return f"'{sheet}'!{get_column_letter(col)}{row}"
+
+
+class Rule:
+    """One declarative check.
+
+    Args:
+        kind (str): 'total', 'tie', 'required' or 'sign'
+        target (str): the checked cell (total, tie) or ranges (required,
+        sign)
+        operand (str): ranges summed (total), the cell tied to (tie), or
+        '+' / '-' (sign)
+        sheet (str): sheet of references without one
+        level (str): message level on failure, e.g. 'ERROR' or 'WARNING'
+        name (str): used in messages, defaults to the target
+        passed (str): message template on success, None for no message
+        failed (str): message template on failure, see FAILED
+        tolerance (float): absolute difference allowed (total, tie)
+
+    Note:
+        * templates are formatted with name, target, operand, value,
+        expected, cells (failing cells, for required and sign) and sign
+        * as with Excel's SUM, text and blank cells count as 0 in totals
+    """
+
+    def __init__(self, kind, target, operand=None, sheet=None, level='ERROR', name=None, passed=None, failed=None, tolerance=0):
+        if kind not in KINDS:
+            raise ValueError(f'unknown rule kind: {kind}')
+        self.kind = kind
+        self.target = target
+        self.operand = operand
+        self.sheet = sheet
+        self.level = level
+        self.name = name or target
+        self.passed = passed
+        self.failed = failed or FAILED[kind]
+        self.tolerance = float(tolerance or 0)
+
+    def __repr__(self):
+        return f'Rule({self.kind!r}, {self.target!r}, {self.operand!r}, sheet={self.sheet!r})'
+
+    @classmethod
+    def from_worksheet(cls, ws_rules):
+        """Read rules from a Rules sheet: one per row from row 2, with
+        columns as FIELDS; rows with an empty kind are skipped."""
+        rules = []
+        for row in ws_rules.iter_rows(min_row=2, max_col=len(FIELDS), values_only=True):
+            row = tuple(row) + (None,) * (len(FIELDS) - len(row))
+            values = {field: value for field, value in zip(FIELDS, row) if value is not None and value != ''}
+            if 'kind' in values:
+                values['level'] = values.get('level', 'ERROR')
+                rules.append(cls(**values))
+        return rules
+
+
+class RulePlan:
+    """Rules compiled to cell index arrays, evaluated in one pass.
+
+    Args:
+        rules (list): of Rule
+
+    Note:
+        * each sheet is read as the block spanning its referenced cells, so
+        references far apart on one sheet read the cells between them
+        * values are read with data_only, i.e. formulas' cached results; a
+        workbook saved by openpyxl has none until Excel recalculates it
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.cells = {}     #(sheet, row, col) -> cell index
+        targets, operands = [], []
+        for rule in self.rules:
+            targets.append(self.add_ref(rule.target, rule.sheet))
+            operands.append(self.add_ref(rule.operand, rule.sheet) if rule.kind in ('total', 'tie') else [])
+            if rule.kind in ('total', 'tie') and len(targets[-1]) != 1:
+                raise ValueError(f'a {rule.kind} target must be one cell: {rule.target}')
+        self.target_indptr, self.target_cells = self.as_csr(targets)
+        self.operand_indptr, self.operand_cells = self.as_csr(operands)
+        self.target_rule = np.repeat(np.arange(len(self.rules)), np.diff(self.target_indptr))
+        self.operand_rule = np.repeat(np.arange(len(self.rules)), np.diff(self.operand_indptr))
+        kinds = np.array([rule.kind for rule in self.rules], dtype=object)
+        self.is_total = np.isin(kinds, ('total', 'tie'))
+        self.is_required = kinds == 'required'
+        self.is_sign = kinds == 'sign'
+        self.negative = np.array([rule.kind == 'sign' and str(rule.operand).strip() == '-' for rule in self.rules], dtype=bool)
+        self.tolerance = np.array([rule.tolerance for rule in self.rules], dtype=np.float64)
+        self.has_passed = np.array([rule.passed is not None for rule in self.rules], dtype=bool)
+        keys = list(self.cells)
+        self.cell_sheet = [sheet for sheet, _, _ in keys]
+        self.cell_row = np.array([row for _, row, _ in keys], dtype=np.int64)
+        self.cell_col = np.array([col for _, _, col in keys], dtype=np.int64)
+
+    def __repr__(self):
+        return f'RulePlan(rules={len(self.rules)}, cells={len(self.cells)}, sheets={list(self.get_blocks())})'
+
+    def __len__(self):
+        return len(self.rules)
+
+    # COMPILE
+
+    def add_ref(self, ref, sheet):
+        """Get the cell indexes of a reference, adding new cells."""
+        indexes = []
+        for ref_sheet, min_col, min_row, max_col, max_row in parse_ref(ref, sheet):
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    indexes.append(self.cells.setdefault((ref_sheet, row, col), len(self.cells)))
+        return indexes
+
+    @staticmethod
+    def as_csr(groups):
+        indptr = np.concatenate(([0], np.cumsum([len(group) for group in groups]))).astype(np.int64)
+        cells = np.fromiter((idx for group in groups for idx in group), dtype=np.int64, count=indptr[-1])
+        return indptr, cells
+
+    def get_blocks(self):
+        """Get {sheet: (min_row, max_row, min_col, max_col)} spanning each
+        sheet's referenced cells."""
+        blocks = {}
+        for sheet, row, col in self.cells:
+            min_row, max_row, min_col, max_col = blocks.get(sheet, (row, row, col, col))
+            blocks[sheet] = (min(min_row, row), max(max_row, row), min(min_col, col), max(max_col, col))
+        return blocks
+
+    # READ
+
+    def read(self, wb):
+        """Read the referenced cells from an open workbook, or a path (read
+        only, with cached formula results).
+
+        Returns:
+            tuple: (numbers, float64 per cell, NaN unless numeric; filled,
+            bool per cell)
+        """
+        if not hasattr(wb, 'sheetnames'):
+            wb = load_workbook(filename=wb, read_only=True, data_only=True)
+            try:
+                return self.read(wb)
+            finally:
+                wb.close()
+        numbers = np.full(len(self.cells), np.nan)
+        filled = np.zeros(len(self.cells), dtype=bool)
+        sheets = np.array(self.cell_sheet, dtype=object)
+        for sheet, (min_row, max_row, min_col, max_col) in self.get_blocks().items():
+            if sheet not in wb.sheetnames:
+                continue
+            block = np.full((max_row - min_row + 1, max_col - min_col + 1), None, dtype=object)
+            for idx, row in enumerate(wb[sheet].iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True)):
+                block[idx, :len(row)] = row
+            cells = np.flatnonzero(sheets == sheet)
+            values = block[self.cell_row[cells] - min_row, self.cell_col[cells] - min_col]
+            filled[cells] = [value is not None and str(value) != '' for value in values]
+            numbers[cells] = [
+                float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+                for value in values
+                ]
+        return numbers, filled
+
+    # EVALUATE
+
+    def evaluate(self, numbers, filled):
+        """Evaluate every rule against the cells read.
+
+        Returns:
+            dict: numpy columns, one row per rule - 'passed', 'value' (the
+            target of a total or tie), 'expected' (its sum) and 'failures'
+            (count of failing cells of required and sign rules); and 'bad',
+            per target cell
+        """
+        n_rules = len(self.rules)
+        as_zero = np.where(np.isnan(numbers), 0.0, numbers)
+        expected = np.bincount(self.operand_rule, weights=as_zero[self.operand_cells], minlength=n_rules)
+        value = np.full(n_rules, np.nan)
+        firsts = self.target_indptr[:-1][self.is_total]
+        value[self.is_total] = np.where(filled[self.target_cells[firsts]], numbers[self.target_cells[firsts]], 0.0)
+        target_numbers = numbers[self.target_cells]
+        negative = self.negative[self.target_rule]
+        bad = np.where(
+            self.is_required[self.target_rule],
+            ~filled[self.target_cells],
+            self.is_sign[self.target_rule] & np.where(negative, target_numbers > 0, target_numbers < 0),
+            )
+        failures = np.bincount(self.target_rule[bad], minlength=n_rules)
+        foots = np.abs(value - expected) <= self.tolerance + 1e-9 * np.maximum(np.abs(value), np.abs(expected))
+        passed = np.where(self.is_total, foots, failures == 0)
+        return {'passed': passed, 'value': value, 'expected': expected, 'failures': failures, 'bad': bad}
+
+    def messages(self, result):
+        """Get (level, message) for each failed rule, and for each passed
+        rule with a `passed` template, in rule order."""
+        bad_cells = self.target_cells[result['bad']]
+        bad_rules = self.target_rule[result['bad']]
+        messages = []
+        for idx in np.flatnonzero(~result['passed'] | self.has_passed).tolist():
+            rule = self.rules[idx]
+            passed = bool(result['passed'][idx])
+            cells = bad_cells[bad_rules == idx][:MAX_CELLS_LISTED].tolist() if not passed and not self.is_total[idx] else []
+            text = (rule.passed if passed else rule.failed).format(
+                name=rule.name, target=rule.target, operand=rule.operand,
+                value=self.format_number(result['value'][idx]), expected=self.format_number(result['expected'][idx]),
+                cells=', '.join(cell_name(self.cell_sheet[cell], self.cell_row[cell], self.cell_col[cell]) for cell in cells),
+                sign='negative' if self.negative[idx] else 'positive',
+                )
+            messages.append(('Information' if passed else rule.level, text))
+        return messages
+
+    @staticmethod
+    def format_number(value):
+        if value != value:
+            return ''
+        return f'{value:.0f}' if float(value).is_integer() else f'{value}'
+
+    def run(self, wb):
+        """Read, evaluate and get the messages, for an open workbook or a
+        path."""
+        return self.messages(self.evaluate(*self.read(wb)))
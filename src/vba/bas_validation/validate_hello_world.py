@@ -7,65 +7,53 @@ Test template (default) workflow
 
 """
 import openpyxl
-from openpyxl import Workbook
 
-# Initialize message number
-m_MessageNumber = 0
+from .rules import Rule, RulePlan
+
+
+HELLO_WORLD_SHEET = 'Hello World Example'
+
+
+def ppe_rule(column, year):
+    """Property, Plant and Equipment total for one year's column."""
+    return Rule(
+        'total', f'{column}14', f'{column}9:{column}13', sheet=HELLO_WORLD_SHEET,
+        name=f'Property, Plant and Equipment for {year}',
+        passed=f"Property, Plant and Equipment for {year} foots on '{HELLO_WORLD_SHEET}'.",
+        failed=(f"Property, Plant and Equipment for {year} does not foot!  Total Property, Plant and Equipment for group = {{value}}, "
+                f"whereas the sum of the components of PPE is {{expected}}. Please correct discrepency on '{HELLO_WORLD_SHEET}'."),
+        )
+
+
+HELLO_WORLD_RULES = [ppe_rule('C', 2007), ppe_rule('D', 2006)]
+
 
 def validate_hello_world(file_path):
     """
     Validates the Schedule worksheet in the given Excel file.
-    
+
     Args:
         file_path (str): Path to the Excel file.
     """
-    global m_MessageNumber
-    
+    # Read and check the PPE totals in one pass
+    messages = RulePlan(HELLO_WORLD_RULES).run(file_path)
+
     # Load the workbook
     wb = openpyxl.load_workbook(file_path)
-    
-    # Select the worksheet
-    ws = wb['Hello World Example']
-    
-    # 2007 PPE Totals
-    m_MessageNumber += 1
-    lngPPE = int(ws['C14'].value)
-    lngPPESum = int(ws['C9'].value) + int(ws['C10'].value) + int(ws['C11'].value) + int(ws['C12'].value) + int(ws['C13'].value)
-    
+
     # Create a new worksheet for validation results
+    if 'Validation Results' in wb.sheetnames:
+        del wb['Validation Results']
     validation_ws = wb.create_sheet('Validation Results')
-    
-    # Write the validation result for 2007 PPE
-    if lngPPE == lngPPESum:
-        # PPE is OK!
-        validation_ws.cell(row=m_MessageNumber, column=1).value = m_MessageNumber
-        validation_ws.cell(row=m_MessageNumber, column=2).value = "Information"
-        validation_ws.cell(row=m_MessageNumber, column=3).value = "Property, Plant and Equipment for 2007 foots on 'Hello World Example'."
-    else:
-        # Error in 2007 PPE
-        validation_ws.cell(row=m_MessageNumber, column=1).value = m_MessageNumber
-        validation_ws.cell(row=m_MessageNumber, column=2).value = "ERROR"
-        validation_ws.cell(row=m_MessageNumber, column=3).value = f"Property, Plant and Equipment for 2007 does not foot!  Total Property, Plant and Equipment for group = {lngPPE}, whereas the sum of the components of PPE is {lngPPESum}. Please correct discrepency on 'Hello World Example'."
-    
-    # 2006 PPE Totals
-    m_MessageNumber += 1
-    lngPPE = int(ws['D14'].value)
-    lngPPESum = int(ws['D9'].value) + int(ws['D10'].value) + int(ws['D11'].value) + int(ws['D12'].value) + int(ws['D13'].value)
-    
-    # Write the validation result for 2006 PPE
-    if lngPPE == lngPPESum:
-        # PPE is OK!
-        validation_ws.cell(row=m_MessageNumber, column=1).value = m_MessageNumber
-        validation_ws.cell(row=m_MessageNumber, column=2).value = "Information"
-        validation_ws.cell(row=m_MessageNumber, column=3).value = "Property, Plant and Equipment for 2006 foots on 'Hello World Example'."
-    else:
-        # Error in 2006 PPE
-        validation_ws.cell(row=m_MessageNumber, column=1).value = m_MessageNumber
-        validation_ws.cell(row=m_MessageNumber, column=2).value = "ERROR"
-        validation_ws.cell(row=m_MessageNumber, column=3).value = f"Property, Plant and Equipment for 2006 does not foot!  Total Property, Plant and Equipment for group = {lngPPE}, whereas the sum of the components of PPE is {lngPPESum}. Please correct discrepency on 'Hello World Example'."
-    
+
+    # Write the validation results
+    for m_MessageNumber, (level, message) in enumerate(messages, start=1):
+        validation_ws.append((m_MessageNumber, level, message))
+
     # Save the workbook
     wb.save(file_path)
+    return messages
 
 # Example usage
-validate_hello_world('example.xlsx')
\ No newline at end of file
+if __name__ == "__main__":
+    validate_hello_world('example.xlsx')
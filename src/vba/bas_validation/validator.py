@@ -3,46 +3,90 @@
 Test template (default) workflow
 
 
-Note: This code assumes that you have the `openpyxl` library installed. You can install it using pip: `pip install openpyxl`. Also, replace `"input.xlsx"` with the path to your Excel file. The output will be saved as `"output.xlsx"` in the same directory. The `validate_hello_world` function is left empty and should be implemented according to your needs.
+Note: This code assumes that you have the `openpyxl` library installed. You can install it using pip: `pip install openpyxl`. Also, replace `"input.xlsx"` with the path to your Excel file. The output will be saved as `"output.xlsx"` in the same directory. Rules are read from the workbook's `Rules` sheet (see rules.py), or default to the Hello World checks.
 """
 import openpyxl
-from openpyxl import Workbook
+
+from .rules import Rule, RulePlan
+from .validate_hello_world import HELLO_WORLD_RULES, HELLO_WORLD_SHEET
+
+
+MESSAGES_HEADER = ('Number', 'Level', 'Message')
+
 
 class Validator:
-    def __init__(self, file_path):
+    """Run declarative rules over a workbook and report to its Messages
+    sheet.
+
+    Args:
+        file_path (str): the workbook
+        rules (list): of Rule; defaults to the `Rules` sheet if there is one,
+        else the Hello World checks if that sheet exists
+        output_path (str): where the workbook is saved with its messages
+
+    Usage:
+        validator = Validator('input.xlsx', rules=[Rule('total', 'C14', 'C9:C13', sheet='Schedule')])
+        validator.run_validation()
+    """
+
+    def __init__(self, file_path, rules=None, output_path='output.xlsx'):
+        self.file_path = file_path
+        self.output_path = output_path
         # Load the workbook
         self.wb = openpyxl.load_workbook(file_path)
         # Select the "Messages" worksheet
+        if 'Messages' not in self.wb.sheetnames:
+            self.wb.create_sheet('Messages').append(MESSAGES_HEADER)
         self.ws = self.wb["Messages"]
         # Initialize the message number
-        self.m_MessageNumber = 1
+        self.m_MessageNumber = 0
+        if rules is None:
+            if 'Rules' in self.wb.sheetnames:
+                rules = Rule.from_worksheet(self.wb['Rules'])
+            elif HELLO_WORLD_SHEET in self.wb.sheetnames:
+                rules = HELLO_WORLD_RULES
+        self.rules = list(rules or [])
+        self.plan = None    #RulePlan, compiled on first run
+
+    def __repr__(self):
+        return f'Validator(file_path={self.file_path!r}, rules={len(self.rules)})'
 
     def run_validation(self):
         # Delete all existing messages
-        self.ws.delete_rows(2, 500)
-        
-        # Set the first message
-        self.ws.cell(row=2, column=1).value = self.m_MessageNumber
-        self.ws.cell(row=2, column=2).value = "Information"
-        self.ws.cell(row=2, column=3).value = "Validation started"
-
-        # Call the validation function
-        self.validate_hello_world()
-
-        # Set the completion message
-        self.m_MessageNumber += 1
-        self.ws.cell(row=3, column=1).value = self.m_MessageNumber
-        self.ws.cell(row=3, column=2).value = "Information"
-        self.ws.cell(row=3, column=3).value = "Validation complete"
+        if self.ws.max_row > 1:
+            self.ws.delete_rows(2, self.ws.max_row - 1)
+        self.m_MessageNumber = 0
+
+        # Evaluate every rule in one pass over the workbook
+        messages = [("Information", "Validation started")]
+        messages += self.validate()
+        messages.append(("Information", "Validation complete"))
+        self.write_messages(messages)
 
         # Save the workbook
-        self.wb.save("output.xlsx")
+        self.wb.save(self.output_path)
+        return messages
+
+    def validate(self, rules=None):
+        """Get (level, message) for the rules, reading their cells from the
+        saved workbook in one read-only pass."""
+        if rules is not None:
+            return RulePlan(rules).run(self.file_path)
+        if self.plan is None:
+            self.plan = RulePlan(self.rules)
+        return self.plan.run(self.file_path)
 
     def validate_hello_world(self):
-        # This function should be implemented according to your needs
-        pass
+        return self.validate(HELLO_WORLD_RULES)
+
+    def write_messages(self, messages):
+        """Append numbered (level, message) rows to the Messages sheet."""
+        for level, message in messages:
+            self.m_MessageNumber += 1
+            self.ws.append((self.m_MessageNumber, level, message))
+        return len(messages)
 
 # Example usage
 if __name__ == "__main__":
     validator = Validator("input.xlsx")
-    validator.run_validation()
\ No newline at end of file
+    validator.run_validation()
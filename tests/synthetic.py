@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Synthetic taxonomies and instances, for the tests and the benchmarks
+
+The taxonomy is written with `generate_taxonomy`; instances are streamed
+with `lxml.etree.xmlfile`, so 1M-fact instances are generated in constant
+memory.  Output is deterministic for a given size, and valid: each context
+carries only concepts of its period type, and the axes are explicit
+xbrldt dimensions with domain members.
+
+The tests share their builders from here, rather than importing each
+other's modules: `load_table` loads a small synthetic filing into a Table,
+`make_model` stands in for a ModelXbrl in the cache tests, and
+`write_taxonomy` and INSTANCE are a small hand-written ex: filing with
+labels and relationship networks.
+
+Usage:
+    shape = generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 16)
+    generate_synthetic_taxonomy(temp_dir / 'bench.xsd', shape['n_concepts'])
+    table = load_table(temp_dir)
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.vba.bas_create_taxonomy.generate_taxonomy import generate_taxonomy
+from src.TableFactory import TableFactory
+
+from lxml import etree
+
+from pathlib import Path
+from types import SimpleNamespace
+import datetime
+import math
+
+
+XBRLI = 'http://www.xbrl.org/2003/instance'
+LINK = 'http://www.xbrl.org/2003/linkbase'
+XLINK = 'http://www.w3.org/1999/xlink'
+XBRLDI = 'http://xbrl.org/2006/xbrldi'
+XBRLDT = 'http://xbrl.org/2005/xbrldt'
+ISO4217 = 'http://www.xbrl.org/2003/iso4217'
+
+PREFIX = 'bench'
+NAMESPACE = 'http://example.com/xbrl/bench'
+
+#hand-written ex: taxonomy (see write_taxonomy) and instance
+ROLE = 'http://example.com/role/BalanceSheet'
+LINKBASE = '''<?xml version="1.0" encoding="utf-8"?>
+<link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink">
+  {role_ref}
+  <link:{link} xlink:type="extended" xlink:role="{role}">
+    {body}
+  </link:{link}>
+</link:linkbase>
+'''
+CONCEPTS = ('Assets', 'Cash', 'Receivables', 'AssetsAbstract')
+INSTANCE = '''<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:link="http://www.xbrl.org/2003/linkbase"
+    xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:iso4217="http://www.xbrl.org/2003/iso4217" xmlns:ex="http://example.com/taxonomy">
+  <link:schemaRef xlink:type="simple" xlink:href="example.xsd"/>
+  <xbrli:context id="I2024"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000000001</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:instant>2024-12-31</xbrli:instant></xbrli:period></xbrli:context>
+  <xbrli:context id="I2023"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000000001</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:instant>2023-12-31</xbrli:instant></xbrli:period></xbrli:context>
+  <xbrli:unit id="USD"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>
+  <ex:Cash contextRef="I2024" unitRef="USD" decimals="0">1500</ex:Cash>
+  <ex:Receivables contextRef="I2024" unitRef="USD" decimals="0">500</ex:Receivables>
+  <ex:Assets contextRef="I2024" unitRef="USD" decimals="0">1000</ex:Assets>
+  <ex:Cash contextRef="I2023" unitRef="USD" decimals="2">1200.5</ex:Cash>
+</xbrli:xbrl>
+'''
+
+
+def count_contexts(n_facts, n_concepts):
+    """Get the number of contexts `n_facts` facts fill: contexts alternate
+    duration and instant, and carry the ceil(n/2) duration or floor(n/2)
+    instant concepts."""
+    n_pairs, remainder = divmod(n_facts, n_concepts)
+    if remainder == 0:
+        return 2 * n_pairs
+    return 2 * n_pairs + (1 if remainder <= (n_concepts + 1) // 2 else 2)
+
+
+def dataset_shape(n_facts, n_axes=3, n_members=8):
+    """Get concept and context counts for `n_facts` unique (concept,
+    context) facts: about sqrt(n_facts) concepts, and at least one of each
+    period type."""
+    n_concepts = max(2, math.isqrt(n_facts))
+    return {
+        'n_facts': n_facts,
+        'n_concepts': n_concepts,
+        'n_contexts': count_contexts(n_facts, n_concepts),
+        'n_axes': n_axes,
+        'n_members': n_members,
+    }
+
+
+def concept_name(idx):
+    return f'Concept{idx:07d}'
+
+
+def concept_period_type(idx):
+    return 'instant' if idx % 2 else 'duration'
+
+
+def context_id(idx):
+    return f'C{idx:07d}'
+
+
+def context_period(idx):
+    """Alternate annual durations (even) and instants (odd) over 20 years."""
+    year = 2000 + (idx // 2) % 20
+    if idx % 2:
+        return None, datetime.date(year, 12, 31)
+    return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+
+
+def context_dims(idx, n_axes, n_members):
+    """Get {axis: member} for a context; context 0 has no dimensions."""
+    dims = {}
+    for axis in range(n_axes):
+        member = (idx // (n_members ** axis)) % (n_members + 1)
+        if member:
+            dims[f'{PREFIX}:Axis{axis}'] = f'{PREFIX}:Member{axis}x{member}'
+    return dims
+
+
+def iter_facts(n_facts, n_concepts):
+    """Iterate (concept, context) indexes of the first `n_facts` facts:
+    context by context, each with the concepts of its period type."""
+    count = 0
+    for context_idx in range(count_contexts(n_facts, n_concepts)):
+        for concept_idx in range(context_idx % 2, n_concepts, 2):
+            if count == n_facts:
+                return
+            yield concept_idx, context_idx
+            count += 1
+
+
+def generate_synthetic_taxonomy(filepath, n_concepts, n_axes=3, n_members=8):
+    """Write a schema with `n_concepts` monetary items, alternately duration
+    and instant, plus the explicit dimensions and domain members used by
+    the instance's contexts."""
+    elements = [
+        {"name": concept_name(idx), "type": "xbrli:monetaryItemType", "period_type": concept_period_type(idx), "substitution_group": "xbrli:item"}
+        for idx in range(n_concepts)
+        ]
+    for axis in range(n_axes):
+        elements.append({"name": f'Axis{axis}', "type": "xbrli:stringItemType", "period_type": "duration", "substitution_group": "xbrldt:dimensionItem", "abstract": "true"})
+        for member in range(1, n_members + 1):
+            elements.append({"name": f'Member{axis}x{member}', "type": "xbrli:stringItemType", "period_type": "duration", "substitution_group": "xbrli:item", "abstract": "true"})
+    generate_taxonomy(
+        str(filepath), 'string', elements=elements, namespace_prefix=PREFIX, namespace_identifier=NAMESPACE,
+        imports=[{'prefix': 'xbrldt', 'namespace': XBRLDT, 'location': 'http://www.xbrl.org/2005/xbrldt-2005.xsd'}],
+        timestamp=False,
+        )
+    return Path(filepath)
+
+
+def generate_synthetic_instance(filepath, schema_href, n_facts, n_axes=3, n_members=8):
+    """Stream an instance of `n_facts` facts, in the order of
+    `iter_facts`."""
+    shape = dataset_shape(n_facts, n_axes, n_members)
+    nsmap = {'xbrli': XBRLI, 'link': LINK, 'xlink': XLINK, 'xbrldi': XBRLDI, 'iso4217': ISO4217, PREFIX: NAMESPACE}
+    with etree.xmlfile(str(filepath), encoding='utf-8') as xf:
+        xf.write_declaration()
+        with xf.element(etree.QName(XBRLI, 'xbrl'), nsmap=nsmap):
+            with xf.element(etree.QName(LINK, 'schemaRef'), {etree.QName(XLINK, 'type'): 'simple', etree.QName(XLINK, 'href'): schema_href}):
+                pass
+            for idx in range(shape['n_contexts']):
+                start, end = context_period(idx)
+                with xf.element(etree.QName(XBRLI, 'context'), id=context_id(idx)):
+                    with xf.element(etree.QName(XBRLI, 'entity')):
+                        with xf.element(etree.QName(XBRLI, 'identifier'), scheme='http://www.sec.gov/CIK'):
+                            xf.write('0000000001')
+                        dims = context_dims(idx, n_axes, n_members)
+                        if dims:
+                            with xf.element(etree.QName(XBRLI, 'segment')):
+                                for dimension, member in dims.items():
+                                    with xf.element(etree.QName(XBRLDI, 'explicitMember'), dimension=dimension):
+                                        xf.write(member)
+                    with xf.element(etree.QName(XBRLI, 'period')):
+                        if start is None:
+                            with xf.element(etree.QName(XBRLI, 'instant')):
+                                xf.write(end.isoformat())
+                        else:
+                            with xf.element(etree.QName(XBRLI, 'startDate')):
+                                xf.write(start.isoformat())
+                            with xf.element(etree.QName(XBRLI, 'endDate')):
+                                xf.write(end.isoformat())
+            with xf.element(etree.QName(XBRLI, 'unit'), id='USD'):
+                with xf.element(etree.QName(XBRLI, 'measure')):
+                    xf.write('iso4217:USD')
+            for idx, (concept_idx, context_idx) in enumerate(iter_facts(n_facts, shape['n_concepts'])):
+                with xf.element(etree.QName(NAMESPACE, concept_name(concept_idx)), contextRef=context_id(context_idx), unitRef='USD', decimals='0'):
+                    xf.write(str((idx * 7919) % 1_000_000))
+    return shape
+
+
+def load_table(temp_dir):
+    """Write bench.xsd and a 16-fact bench.xbrl to `temp_dir`, and load the
+    instance with an offline TableFactory working in `temp_dir / 'working'`."""
+    temp_dir = Path(temp_dir)
+    generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+    generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 16)
+    tblfactory = TableFactory(temp_dir / 'working')
+    tblfactory.options['internetConnectivity'] = 'offline'
+    tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+    return tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+
+
+def make_model(*paths):
+    """Stand-in for a ModelXbrl with only the `urlDocs` the caches read."""
+    docs = {str(p): SimpleNamespace(uri=str(p), filepath=str(p)) for p in paths}
+    return SimpleNamespace(urlDocs=docs)
+
+
+def loc(name):
+    return f'<link:loc xlink:type="locator" xlink:href="example.xsd#ex_{name}" xlink:label="{name}"/>'
+
+
+def arc(arc_name, arcrole, parent, child, order, extra=''):
+    return (f'<link:{arc_name} xlink:type="arc" xlink:arcrole="{arcrole}" xlink:from="{parent}" xlink:to="{child}" '
+            f'order="{order}" {extra}/>')
+
+
+def write_taxonomy(directory):
+    """Write example.xsd, with ex: labels, presentation, calculation and
+    definition linkbases, to `directory`."""
+    elements = '\n'.join(
+        f'<xs:element name="{name}" id="ex_{name}" type="xbrli:monetaryItemType" substitutionGroup="xbrli:item" xbrli:periodType="instant" nillable="true"/>'
+        for name in CONCEPTS
+        )
+    (directory / 'example.xsd').write_text(f'''<?xml version="1.0" encoding="utf-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:xbrli="http://www.xbrl.org/2003/instance"
+    xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:ex="http://example.com/taxonomy"
+    targetNamespace="http://example.com/taxonomy" elementFormDefault="qualified">
+  <xs:annotation><xs:appinfo>
+    <link:roleType roleURI="{ROLE}" id="BalanceSheet">
+      <link:usedOn>link:presentationLink</link:usedOn><link:usedOn>link:calculationLink</link:usedOn><link:usedOn>link:definitionLink</link:usedOn>
+    </link:roleType>
+    <link:linkbaseRef xlink:type="simple" xlink:href="lab.xml" xlink:arcrole="http://www.w3.org/1999/xlink/properties/linkbase"/>
+    <link:linkbaseRef xlink:type="simple" xlink:href="pre.xml" xlink:arcrole="http://www.w3.org/1999/xlink/properties/linkbase"/>
+    <link:linkbaseRef xlink:type="simple" xlink:href="cal.xml" xlink:arcrole="http://www.w3.org/1999/xlink/properties/linkbase"/>
+    <link:linkbaseRef xlink:type="simple" xlink:href="def.xml" xlink:arcrole="http://www.w3.org/1999/xlink/properties/linkbase"/>
+  </xs:appinfo></xs:annotation>
+  <xs:import namespace="http://www.xbrl.org/2003/instance" schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd"/>
+  {elements}
+</xs:schema>
+''')
+    labels = '\n'.join(
+        f'{loc(name)}<link:label xlink:type="resource" xlink:label="{name}_lbl{idx}" xlink:role="{role}" xml:lang="{lang}">{text}</link:label>'
+        f'<link:labelArc xlink:type="arc" xlink:arcrole="http://www.xbrl.org/2003/arcrole/concept-label" xlink:from="{name}" xlink:to="{name}_lbl{idx}"/>'
+        for idx, (name, role, lang, text) in enumerate((
+            ('Assets', 'http://www.xbrl.org/2003/role/label', 'en', 'Assets'),
+            ('Assets', 'http://www.xbrl.org/2003/role/totalLabel', 'en', 'Total assets'),
+            ('Cash', 'http://www.xbrl.org/2003/role/label', 'en-US', 'Cash and Equivalents'),
+            ('Receivables', 'http://www.xbrl.org/2003/role/terseLabel', 'en', 'Receivables'),
+            ))
+        )
+    (directory / 'lab.xml').write_text(LINKBASE.format(role_ref='', link='labelLink', role='http://www.xbrl.org/2003/role/link', body=labels))
+    role_ref = f'<link:roleRef roleURI="{ROLE}" xlink:type="simple" xlink:href="example.xsd#BalanceSheet"/>'
+    locs = ''.join(loc(name) for name in CONCEPTS)
+    parent_child = 'http://www.xbrl.org/2003/arcrole/parent-child'
+    (directory / 'pre.xml').write_text(LINKBASE.format(role_ref=role_ref, link='presentationLink', role=ROLE, body=locs + ''.join((
+        arc('presentationArc', parent_child, 'AssetsAbstract', 'Assets', 3, 'preferredLabel="http://www.xbrl.org/2003/role/totalLabel"'),
+        arc('presentationArc', parent_child, 'AssetsAbstract', 'Receivables', 2),
+        arc('presentationArc', parent_child, 'AssetsAbstract', 'Cash', 1),
+        ))))
+    summation = 'http://www.xbrl.org/2003/arcrole/summation-item'
+    (directory / 'cal.xml').write_text(LINKBASE.format(role_ref=role_ref, link='calculationLink', role=ROLE, body=locs + ''.join((
+        arc('calculationArc', summation, 'Assets', 'Cash', 1, 'weight="1"'),
+        arc('calculationArc', summation, 'Assets', 'Receivables', 2, 'weight="-1"'),
+        ))))
+    (directory / 'def.xml').write_text(LINKBASE.format(role_ref=role_ref, link='definitionLink', role=ROLE, body=locs + ''.join((
+        arc('definitionArc', 'http://www.xbrl.org/2003/arcrole/general-special', 'Assets', 'Cash', 1),
+        ))))
+    return directory / 'example.xsd'
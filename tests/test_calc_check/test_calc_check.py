@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test CalcCheck class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory
+from src.Table import Taxonomy
+from src.CalcCheck import CalcCheck, INCONSISTENT
+from src.FactStore import FactStore, EXACT_LIMIT
+from src.TaxonomyIndex import TaxonomyIndex
+from tests.synthetic import write_taxonomy, ROLE, INSTANCE
+
+import tempfile
+from pathlib import Path
+
+
+SUMMATION = 'http://www.xbrl.org/2003/arcrole/summation-item'
+
+
+def make_index():
+    #ex:PPE = ex:Land + ex:Buildings - ex:Depreciation
+    nan = float('nan')
+    return TaxonomyIndex(['ex:PPE', 'ex:Land', 'ex:Buildings', 'ex:Depreciation'], [ROLE, SUMMATION], networks={'calculation': {
+        'parent': [0, 0, 0], 'child': [1, 2, 3], 'role': [0, 0, 0], 'arcrole': [1, 1, 1],
+        'order': [1, 2, 3], 'weight': [1, 1, -1], 'preferred_label': [-1, -1, -1]}})
+
+def test_calc_check():
+    contexts = {
+        context_id: {'entity': ('cik', '1'), 'start': None, 'end': end, 'instant': True, 'dims': {}}
+        for context_id, end in (('I2007', '2007-12-31'), ('I2006', '2006-12-31'), ('I2005', '2005-12-31'), ('I2004', '2004-12-31'))
+        }
+    store = FactStore.from_summary({'path': 'ppe.xbrl', 'contexts': contexts, 'facts': [
+        #foots exactly
+        ('ex:PPE', 'I2007', 'USD', '0', '700'), ('ex:Land', 'I2007', 'USD', '0', '300'),
+        ('ex:Buildings', 'I2007', 'USD', '0', '500'), ('ex:Depreciation', 'I2007', 'USD', '0', '100'),
+        #does not foot
+        ('ex:PPE', 'I2006', 'USD', '0', '650'), ('ex:Land', 'I2006', 'USD', '0', '300'),
+        ('ex:Buildings', 'I2006', 'USD', '0', '400'),
+        #foots once rounded to the least precise (thousands), with a duplicate
+        ('ex:PPE', 'I2005', 'USD', '-3', '2000'), ('ex:Land', 'I2005', 'USD', '2', '1234.56'),
+        ('ex:Land', 'I2005', 'USD', '0', '1235'), ('ex:Buildings', 'I2005', 'USD', '0', '800'),
+        #no items: not checked
+        ('ex:PPE', 'I2004', 'USD', '0', '1'),
+        ]})
+    check = CalcCheck(make_index())
+    assert len(check) == 1
+    result = check.check(store)
+    assert [store.context_ids[idx] for idx in result['context'].tolist()] == ['I2007', 'I2006', 'I2005']
+    assert result['consistent'].tolist() == [True, False, True]
+    assert result['items'].tolist() == [3, 2, 2]
+    assert result['decimals'].tolist() == [0, 0, -3]
+    assert result['computed'].tolist() == [700, 700, 2000]
+    messages = check.validate(store).messages
+    assert [message['code'] for message in messages] == [INCONSISTENT]
+    assert 'I2006' in messages[0]['message'] and messages[0]['document'] == 'ppe.xbrl'
+
+def test_calc_check_large_values():
+    contexts = {
+        context_id: {'entity': ('cik', '1'), 'start': None, 'end': end, 'instant': True, 'dims': {}}
+        for context_id, end in (('I2007', '2007-12-31'), ('I2006', '2006-12-31'))
+        }
+    store = FactStore.from_summary({'path': 'ppe.xbrl', 'contexts': contexts, 'facts': [
+        #foots exactly beyond 2**53
+        ('ex:PPE', 'I2007', 'USD', '0', str(EXACT_LIMIT + 1)), ('ex:Land', 'I2007', 'USD', '0', str(EXACT_LIMIT)),
+        ('ex:Buildings', 'I2007', 'USD', '0', '1'),
+        #off by one, which float64 cannot tell apart
+        ('ex:PPE', 'I2006', 'USD', '0', str(EXACT_LIMIT + 1)), ('ex:Land', 'I2006', 'USD', '0', str(EXACT_LIMIT)),
+        ('ex:Buildings', 'I2006', 'USD', '0', '2'),
+        ]})
+    assert store.value[0] == store.value[3]
+    result = CalcCheck(make_index()).check(store)
+    assert result['consistent'].tolist() == [True, False]
+
+def test_table_check_calculations():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        schema_path = write_taxonomy(temp_dir)
+        instance = INSTANCE.replace('decimals="2">1200.5</ex:Cash>', 'decimals="2">1200.5</ex:Cash>\n'
+            '  <ex:Receivables contextRef="I2023" unitRef="USD" decimals="0">200</ex:Receivables>\n'
+            '  <ex:Assets contextRef="I2023" unitRef="USD" decimals="0">1400</ex:Assets>')
+        instance_path = temp_dir / 'instance.xbrl'
+        instance_path.write_text(instance, encoding='utf-8')
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        table = tblfactory.create_xbrl_instance_table(instance_path)
+        taxonomy = Taxonomy(tblfactory.prepare_options(schema_path), 'schema', schema_path, dts_cache=tblfactory.dts_cache)
+        #Assets = Cash - Receivables: 1000 = 1500 - 500, but 1400 != 1200.5 - 200
+        result = table.check_calculations(taxonomy)
+        assert len(result.errors) == 1 and 'ex:Assets' in result.errors[0]['message']
+        assert taxonomy.get_calc_check() is taxonomy.get_calc_check()
+        #with the index of the instance's own DTS
+        assert table.check_calculations().counts() == result.counts()
+        tblfactory.close()
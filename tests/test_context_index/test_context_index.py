@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test ContextIndex class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.vba.bas_create_instance_doc.main import ContextIndex
+
+from openpyxl import Workbook
+
+
+def make_workbook():
+    wb = Workbook()
+    ws_contexts = wb.active
+    ws_contexts.title = 'Contexts'
+    ws_contexts.append(('I-2007', '0000000001', 'http://www.sec.gov/CIK', 'Instant', None, '2007-12-31'))
+    ws_contexts.append(('D-2007', '0000000001', 'http://www.sec.gov/CIK', 'Duration', '2007-01-01', '2007-12-31'))
+    ws_contexts.append(('I-2007', 'duplicate'))
+    ws_dimensions = wb.create_sheet('Dimensions')
+    ws_dimensions.append(('D-2007', None, 'us-gaap:StatementScenarioAxis', 'us-gaap:ScenarioActualMember'))
+    ws_dimensions.append(('D-2007', None, 'dei:LegalEntityAxis', 'HelloWorld:ParentMember'))
+    return wb
+
+def test_context_index():
+    context_index = ContextIndex.from_workbook(make_workbook())
+    assert len(context_index.contexts) == 2
+    assert context_index.hit_rate() == 0.0
+    #first row wins
+    info = context_index.get_context_info('I-2007')
+    assert 'Entity ID: 0000000001\n' in info and 'Period: [As of] 2007-12-31\n' in info
+    assert 'Period: [For Period] 2007-01-01 to 2007-12-31\n' in context_index.get_context_info('D-2007')
+    assert context_index.get_context_info('missing') == ''
+    assert context_index.get_dimensions_info('I-2007') == ''
+    dimensions_info = context_index.get_dimensions_info('D-2007')
+    assert dimensions_info.count('Dimension: ') == 2 and 'Member: HelloWorld:ParentMember\n' in dimensions_info
+    assert context_index.stats == {'hits': 0, 'misses': 5}
+    #renders are memoized
+    for _ in range(3):
+        assert context_index.get_context_info('I-2007') == info
+        assert context_index.get_dimensions_info('D-2007') == dimensions_info
+    assert context_index.stats == {'hits': 6, 'misses': 5}
+    assert context_index.hit_rate() == 6 / 11
+
+def test_context_index_missing_sheets():
+    context_index = ContextIndex.from_workbook(Workbook())
+    assert (context_index.contexts, context_index.dimensions) == ({}, {})
+    assert context_index.get_context_info('I-2007') == ''
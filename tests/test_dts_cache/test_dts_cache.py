@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test DtsCache class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.DtsCache import DtsCache
+from tests.synthetic import make_model
+
+import tempfile
+from pathlib import Path
+
+
+def test_dts_cache_hit_and_invalidate():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        instance_path = temp_dir / 'instance.xbrl'
+        schema_path = temp_dir / 'schema.xsd'
+        instance_path.write_text('<xbrl/>')
+        schema_path.write_text('<schema/>')
+        cache = DtsCache(temp_dir / 'cache')
+        model = make_model(instance_path, schema_path)
+        assert cache.get(instance_path) is None
+        cache.put(instance_path, model)
+        assert cache.get(instance_path) is model
+        assert cache.get_manifest(instance_path)['documents'][1]['uri'] == str(schema_path)
+        schema_path.write_text('<schema changed="true"/>')
+        assert cache.get(instance_path) is None
+        assert cache.stats['hits'] == 1
+        assert cache.stats['invalidations'] == 1
+
+def test_dts_cache_eviction():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        cache = DtsCache(temp_dir / 'cache', max_entries=2, max_disk_entries=2)
+        paths = []
+        for idx in range(3):
+            path = temp_dir / f'instance{idx}.xbrl'
+            path.write_text(f'<xbrl id="{idx}"/>')
+            cache.put(path, make_model(path))
+            paths.append(path)
+        assert len(cache) == 2
+        assert cache.get(paths[0]) is None
+        assert cache.get(paths[2]) is not None
+        assert len(list((temp_dir / 'cache').glob('*.json'))) == 2
+
+def test_dts_cache_release_shared_model():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        instance_path = temp_dir / 'instance.xbrl'
+        instance_path.write_text('<xbrl/>')
+        cache = DtsCache(temp_dir / 'cache')
+        model = make_model(instance_path)
+        cache.put(instance_path, model)
+        assert cache.get(instance_path) is model
+        #two Tables share it: the first to release must take a private copy
+        assert cache.release(model) is True
+        assert cache.get(instance_path) is None
+        assert cache.release(model) is False
+        assert cache.get_manifest(instance_path) is not None
+
+def test_dts_cache_hashes_once_per_content():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        instance_path = temp_dir / 'instance.xbrl'
+        schema_path = temp_dir / 'schema.xsd'
+        instance_path.write_text('<xbrl/>')
+        schema_path.write_text('<schema/>')
+        cache = DtsCache(temp_dir / 'cache')
+        model = make_model(instance_path, schema_path)
+        cache.put(instance_path, model)
+        assert cache.get(instance_path) is model
+        assert cache.get_manifest(instance_path) is not None
+        assert cache.stats['hashed'] == 2
+        schema_path.write_text('<schema changed="true"/>')
+        assert cache.get(instance_path) is None
+        assert cache.stats['hashed'] == 3
+
+def test_dts_cache_shares_taxonomy_across_instances():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        schema_path = temp_dir / 'schema.xsd'
+        linkbase_path = temp_dir / 'schema_lab.xml'
+        schema_path.write_text('<schema/>')
+        linkbase_path.write_text('<linkbase/>')
+        cache = DtsCache(temp_dir / 'cache')
+        keys = []
+        for idx in range(2):
+            instance_path = temp_dir / f'instance{idx}.xbrl'
+            instance_path.write_text(
+                f'<xbrl id="{idx}" xmlns="http://www.xbrl.org/2003/instance" xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink">'
+                '<link:schemaRef xlink:type="simple" xlink:href="schema.xsd"/></xbrl>'
+                )
+            cache.put(instance_path, make_model(instance_path, schema_path, linkbase_path))
+            keys.append(cache.taxonomy_key(instance_path))
+        #one taxonomy entry, without the instances, and the same as the schema's own
+        assert keys[0] == keys[1] == cache.taxonomy_key(schema_path)
+        manifest = cache.get_manifest(None, key=keys[0])
+        assert [doc['filepath'] for doc in manifest['documents']] == [str(schema_path), str(linkbase_path)]
+        cache.artifact_path(keys[0], 'taxonomy.npz').write_bytes(b'index')
+        assert cache.is_current(keys[0])
+        #a changed linkbase leaves the key, but not the entry, current
+        linkbase_path.write_text('<linkbase changed="true"/>')
+        assert not cache.is_current(keys[0])
+        cache.put(temp_dir / 'instance0.xbrl', make_model(temp_dir / 'instance0.xbrl', schema_path, linkbase_path))
+        assert cache.is_current(keys[0]) and not cache.artifact_path(keys[0], 'taxonomy.npz').exists()
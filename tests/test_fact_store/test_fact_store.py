@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test FactStore class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.FactStore import FactStore, EXACT_LIMIT
+
+import numpy as np
+
+from decimal import Decimal
+
+
+def make_summary(path, land_2007=5347000):
+    """Summary in the form of Table.get_summary()."""
+    entity = ('http://www.ExampleCompany.com', 'Example Company')
+    return {
+        'path': path,
+        'contexts': {
+            'I-2007': {'entity': entity, 'start': None, 'end': '2007-12-31', 'instant': True, 'dims': {}},
+            'I-2006': {'entity': entity, 'start': None, 'end': '2006-12-31', 'instant': True,
+                       'dims': {'HelloWorld:SegmentAxis': 'HelloWorld:RetailMember'}},
+        },
+        'units': {'U-Monetary': 'iso4217:USD'},
+        'facts': [
+            ('HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', str(land_2007)),
+            ('HelloWorld:Land', 'I-2006', 'U-Monetary', 'INF', '1147000'),
+            ('HelloWorld:BuildingsNet', 'I-2007', 'U-Monetary', '-3', '244000'),
+            ('HelloWorld:Description', 'I-2007', None, None, 'Example text'),
+            ('HelloWorld:Note', 'I-2007', None, None, None),
+        ],
+    }
+
+def test_fact_store_from_summary():
+    store = FactStore.from_summary(make_summary('a.xbrl'))
+    assert len(store) == 5
+    assert store.concept.dtype == np.int32
+    assert store.aggregate(by='concept') == {'HelloWorld:Land': 6494000.0, 'HelloWorld:BuildingsNet': 244000.0}
+    assert store.ctx_end[0] == np.datetime64('2007-12-31')
+    assert store.names[store.dim_member[0]] == 'HelloWorld:RetailMember'
+    records = store.to_records()
+    assert records[0] == ('HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', 5347000.0)
+    assert records[2][3] == '-3'
+    assert records[3][4] == 'Example text'
+    assert records[4][4] is None
+    #units resolve to their measures; text facts have none
+    assert [store.names[measure] if measure >= 0 else None for measure in store.measure] == ['iso4217:USD'] * 3 + [None, None]
+
+def test_fact_store_select_and_pivot():
+    store = FactStore.from_summary(make_summary('a.xbrl'))
+    land = store.select(store.mask(concept='HelloWorld:Land', context='I-2007'))
+    assert land.to_records() == [('HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', 5347000.0)]
+    rows, cols, matrix = store.pivot(index='concept', columns='context')
+    assert rows == ['HelloWorld:Land', 'HelloWorld:BuildingsNet']
+    assert cols == ['I-2007', 'I-2006']
+    assert np.isnan(matrix[1, 1])
+
+def test_fact_store_concat():
+    combined = FactStore.concat([
+        FactStore.from_summary(make_summary('a.xbrl')),
+        FactStore.from_summary(make_summary('b.xbrl', land_2007=1)),
+        ])
+    assert len(combined) == 10
+    assert len(combined.context_ids) == 4
+    assert combined.filings == ['a.xbrl', 'b.xbrl']
+    assert combined.aggregate(by='filing') == {'a.xbrl': 6738000.0, 'b.xbrl': 1391001.0}
+    assert combined.to_records(combined.mask(filing=1))[3][4] == 'Example text'
+    assert combined.measure.tolist() == [combined.names.get('iso4217:USD')] * 3 + [-1, -1] + [combined.names.get('iso4217:USD')] * 3 + [-1, -1]
+    assert len(FactStore.concat([])) == 0
+
+def test_fact_store_large_values_round_trip():
+    large = str(EXACT_LIMIT + 1)
+    store = FactStore.from_summary(make_summary('a.xbrl', land_2007=large))
+    #float64 rounds 2**53 + 1 to 2**53; the lexical value is kept alongside
+    assert store.value[0] == float(EXACT_LIMIT)
+    assert store.exact_value(0) == Decimal(large) and store.exact_value(1) == Decimal(1147000)
+    assert store.to_records()[0][4] == large
+    assert store.mask(numeric=True).sum() == 3
+    combined = FactStore.concat([store, FactStore.from_summary(make_summary('b.xbrl'))])
+    assert combined.exact_value(0) == Decimal(large) and combined.exact_value(5) == Decimal(5347000)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test generate_xbrl
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.vba.bas_create_instance_doc.generate_xbrl import generate_xbrl, CellReader
+
+from openpyxl import Workbook, load_workbook
+from lxml import etree
+
+import pytest
+import tempfile
+from pathlib import Path
+
+
+MAPPING = [
+    ['Data', 'A3', 'ex:Cash', 'I2024', 'USD', 0, None],
+    ['Notes', 'A1', 'ex:Policy', 'FY2024', None, None, None],
+    ['Data', 'A1', 'ex:Revenue', 'FY2024', 'USD', -3, 1000],
+    ['Data', 'A2', 'ex:Cost', 'FY2024', 'USD', 2, None],
+    ['Notes', 'A2', 'ex:NotesTuple', None, None, None, None],
+    ['Data', 'B9', 'ex:Other', 'FY2024', 'USD', 0, None],
+    ['Missing', 'A1', 'ex:Gone', 'FY2024', None, None, None],
+    ]
+
+
+def write_workbook(path, mapping=MAPPING):
+    wb = Workbook()
+    wb.active.title = 'Setup'
+    wb['Setup'].append(['Setting', 'Value'])
+    wb['Setup'].append(['Instance', 'out.xbrl'])
+    ws = wb.create_sheet('Taxonomies')
+    ws.append(['Prefix', 'Namespace', 'Location', 'SchemaRef', 'SchemaLocation'])
+    ws.append(['ex', 'http://example.com/ex', 'ex.xsd', 'Yes', 'Yes'])
+    ws = wb.create_sheet('Contexts')
+    ws.append(['ID', 'Entity', 'Scheme', 'Type', 'Start', 'End'])
+    ws.append(['FY2024', '0000000001', 'http://www.sec.gov/CIK', 'Duration', '2024-01-01', '2024-12-31'])
+    ws.append(['I2024', '0000000001', 'http://www.sec.gov/CIK', 'Instant', None, '2024-12-31'])
+    ws = wb.create_sheet('Units')
+    ws.append(['ID', 'Measure'])
+    ws.append(['USD', 'iso4217:USD'])
+    ws = wb.create_sheet('Mapping')
+    ws.append(['Sheet', 'Cell', 'Concept', 'Context', 'Unit', 'Decimals', 'Scale'])
+    for row in mapping:
+        ws.append(row)
+    ws = wb.create_sheet('Data')
+    for value in (1147.5, 40.25, 60):
+        ws.append([value])
+    ws = wb.create_sheet('Notes')
+    ws.append(['Cost & <other> "terms"'])
+    wb.save(path)
+    return path
+
+def test_generate_xbrl():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        workbook = write_workbook(temp_dir / 'workbook.xlsx')
+        output = generate_xbrl(workbook)
+        assert output == str(temp_dir / 'out.xbrl')
+        root = etree.parse(output).getroot()
+        facts = [(etree.QName(fact).localname, fact.get('contextRef'), fact.get('decimals'), fact.text, fact.get('{http://www.w3.org/2001/XMLSchema-instance}nil'))
+                 for fact in root.iter('{http://example.com/ex}*')]
+        #facts are grouped by target sheet, in mapping order; tuple markers are skipped
+        assert facts == [
+            ('Cash', 'I2024', '0', '60', None),
+            ('Revenue', 'FY2024', '-3', '1147500', None),
+            ('Cost', 'FY2024', '2', '40.25', None),
+            ('Other', 'FY2024', None, None, 'true'),
+            ('Policy', 'FY2024', None, 'Cost & <other> "terms"', None),
+            ('Gone', 'FY2024', None, None, None),
+            ]
+        assert b'Cost &amp; &lt;other&gt;' in Path(output).read_bytes()
+        #byte-identical across runs
+        first = Path(output).read_bytes()
+        generate_xbrl(workbook, output_file=str(temp_dir / 'again.xbrl'))
+        assert (temp_dir / 'again.xbrl').read_bytes() == first
+
+def test_generate_xbrl_unknown_prefix():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        workbook = write_workbook(temp_dir / 'workbook.xlsx', MAPPING[:2] + [['Data', 'A1', 'us-gaap:Revenues', 'FY2024', 'USD', 0, None]])
+        with pytest.raises(ValueError, match="Mapping row 4: concept us-gaap:Revenues has prefix 'us-gaap'"):
+            generate_xbrl(workbook, output_file=str(temp_dir / 'out.xbrl'))
+
+def test_cell_reader():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workbook = write_workbook(Path(temp_dir) / 'workbook.xlsx')
+        wb = load_workbook(workbook, read_only=True, data_only=True)
+        cells = CellReader(wb['Data'])
+        assert [cells.get(s_cell) for s_cell in ('A1', 'A2', 'B2', 'A3', 'C40')] == [1147.5, 40.25, None, 60, None]
+        assert cells.stats == {'cells': 5, 'rows': 40, 'restarts': 0}
+        #going back up restarts the stream
+        assert cells.get('A2') == 40.25
+        assert cells.stats['restarts'] == 1
+        assert CellReader(None).get('A1') is None
+        wb.close()
+
+def test_generate_xbrl_one_character_ids():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        workbook = write_workbook(temp_dir / 'workbook.xlsx', [['Data', 'A1', 'ex:Revenue', 'C', '1', 0, None]])
+        wb = load_workbook(workbook)
+        wb['Contexts'].append(['C', '0000000001', 'http://www.sec.gov/CIK', 'Duration', '2023-01-01', '2023-12-31'])
+        wb['Units'].append(['1', 'iso4217:EUR'])
+        wb.save(workbook)
+        root = etree.parse(generate_xbrl(workbook)).getroot()
+        context_ids = {context.get('id') for context in root.iter('{http://www.xbrl.org/2003/instance}context')}
+        unit_ids = {unit.get('id') for unit in root.iter('{http://www.xbrl.org/2003/instance}unit')}
+        fact = next(root.iter('{http://example.com/ex}Revenue'))
+        assert fact.get('contextRef') in context_ids and fact.get('unitRef') in unit_ids
+        assert len(context_ids) == 3 and len(unit_ids) == 2
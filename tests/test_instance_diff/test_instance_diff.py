@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test InstanceDiff class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.FactStore import FactStore
+from src.InstanceDiff import InstanceDiff
+
+
+ENTITY = ('http://www.ExampleCompany.com', 'Example Company')
+
+
+def make_store(path, facts, context_2007='I-2007'):
+    """Store in the form of Table.get_facts(columnar=True)."""
+    return FactStore.from_summary({
+        'path': path,
+        'contexts': {
+            context_2007: {'entity': ENTITY, 'start': None, 'end': '2007-12-31', 'instant': True, 'dims': {}},
+            'I-2006': {'entity': ENTITY, 'start': None, 'end': '2006-12-31', 'instant': True,
+                       'dims': {'HelloWorld:SegmentAxis': 'HelloWorld:RetailMember'}},
+        },
+        'units': {'U-Monetary': 'iso4217:USD', 'USD': 'iso4217:USD'},
+        'facts': [(concept, context_2007 if context == 'I-2007' else context, unit, decimals, value)
+                  for concept, context, unit, decimals, value in facts],
+    })
+
+
+BASE = [
+    ('HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', '5347000'),
+    ('HelloWorld:Land', 'I-2006', 'U-Monetary', 'INF', '1147000'),
+    ('HelloWorld:BuildingsNet', 'I-2007', 'U-Monetary', '-3', '244000'),
+    ('HelloWorld:Description', 'I-2007', None, None, 'Example text'),
+]
+
+
+def test_instance_diff():
+    other = BASE[:1] + [
+        ('HelloWorld:Land', 'I-2006', 'U-Monetary', 'INF', '1148000'),
+        ('HelloWorld:Description', 'I-2007', None, None, 'Example text'),
+        ('HelloWorld:Inventory', 'I-2007', 'U-Monetary', 'INF', '10'),
+    ]
+    result = InstanceDiff().diff(make_store('a.xbrl', BASE), make_store('b.xbrl', other, context_2007='c1'))
+    assert result['counts'] == {'added': 1, 'removed': 1, 'changed': 1, 'unchanged': 2}
+    assert result['added'][0]['concept'] == 'HelloWorld:Inventory'
+    assert result['added'][0]['context'] == 'c1'
+    assert result['removed'][0]['concept'] == 'HelloWorld:BuildingsNet'
+    assert result['changed'][0]['before']['value'] == 1147000.0
+    assert result['changed'][0]['after']['value'] == 1148000.0
+    #context ids are significant when matching by id
+    result = InstanceDiff(context_key='id').diff(make_store('a.xbrl', BASE), make_store('b.xbrl', BASE, context_2007='c1'))
+    assert result['counts'] == {'added': 3, 'removed': 3, 'changed': 0, 'unchanged': 1}
+
+
+def test_instance_diff3():
+    left = [BASE[0], ('HelloWorld:Land', 'I-2006', 'U-Monetary', 'INF', '1148000')] + BASE[2:]
+    right = [('HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', '1')] + left[1:3]
+    result = InstanceDiff().diff3(make_store('a.xbrl', BASE), make_store('b.xbrl', left), make_store('c.xbrl', right))
+    assert result['counts'] == {'left_only': 0, 'right_only': 2, 'both': 1, 'conflicts': 0, 'unchanged': 1}
+    removed = [fact for fact in result['right_only'] if fact['right'] is None]
+    assert removed[0]['base']['concept'] == 'HelloWorld:Description'
+    assert result['both'][0]['left']['value'] == 1148000.0
+    #the same fact changed differently on each side
+    right[1] = ('HelloWorld:Land', 'I-2006', 'U-Monetary', 'INF', '1149000')
+    result = InstanceDiff().diff3(make_store('a.xbrl', BASE), make_store('b.xbrl', left), make_store('c.xbrl', right))
+    assert result['conflicts'][0]['left']['value'] == 1148000.0
+    assert result['conflicts'][0]['right']['value'] == 1149000.0
+
+
+def test_instance_diff_renamed_unit():
+    other = [(concept, context, 'USD' if unit else None, decimals, value) for concept, context, unit, decimals, value in BASE]
+    other_store = make_store('b.xbrl', other)
+    assert other_store.names[other_store.measure[0]] == 'iso4217:USD'
+    #the same measure under another unit id is not a change
+    result = InstanceDiff().diff(make_store('a.xbrl', BASE), other_store)
+    assert result['counts'] == {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 4}
+    result = InstanceDiff(context_key='id').diff(make_store('a.xbrl', BASE), other_store)
+    assert result['counts'] == {'added': 3, 'removed': 3, 'changed': 0, 'unchanged': 1}
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test InstanceReader class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.InstanceReader import InstanceReader
+
+from pathlib import Path
+
+
+instance_path = Path(__file__).parent / 'data' / 'dimensional.xbrl'
+
+
+def test_instance_reader_summary():
+    summary = InstanceReader(instance_path).to_summary()
+    assert summary['schema_refs'] == ['example.xsd']
+    assert summary['contexts']['D-2024']['entity'] == ('http://www.sec.gov/cik', '0000000001')
+    assert summary['contexts']['D-2024']['start'] == '2024-01-01'
+    assert summary['contexts']['D-2024-Retail']['dims'] == {
+        'ex:SegmentAxis': 'ex:RetailMember',
+        'ex:BranchAxis': '42',
+        }
+    assert summary['units'] == {'U-USD': 'USD', 'U-USD-per-share': 'USD / shares'}
+    assert summary['facts'] == [
+        ('ex:Revenues', 'D-2024', 'U-USD', '-3', '1000000'),
+        ('ex:Revenues', 'D-2024-Retail', 'U-USD', '-3', '400000'),
+        ('ex:Comment', 'D-2024', None, None, None),
+        ('ex:City', 'D-2024', None, None, 'Springfield'),
+        ]
+
+def test_instance_reader_fact_store():
+    store = InstanceReader(instance_path).to_fact_store()
+    assert len(store) == 4
+    assert store.aggregate(by='concept') == {'ex:Revenues': 1400000.0}
+    assert store.to_records(store.mask(concept='ex:City'))[0][4] == 'Springfield'
+    assert store.names[store.measure[0]] == 'USD'
+
+def test_instance_reader_sniff():
+    sniffed = InstanceReader(instance_path).sniff()
+    assert sniffed['root'] == 'xbrl'
+    assert sniffed['namespaces']['ex'] == 'http://example.com/xbrl/taxonomy'
+    assert sniffed['schema_refs'] == ['example.xsd']
+    schema_path = Path(__file__).parents[1] / 'test_hello_world' / 'data' / 'HelloWorld.xsd'
+    sniffed = InstanceReader(schema_path).sniff()
+    assert sniffed['root'] == 'schema'
+    assert sniffed['target_namespace'] == 'http://xbrl.squarespace.com/HelloWorld'
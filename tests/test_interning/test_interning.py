@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test Interner class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.Interning import Interner
+from src.FactStore import FactStore
+from src.vba.bas_create_instance_doc.generate_xbrl import generate_xbrl
+
+from openpyxl import Workbook
+from lxml import etree
+
+import tempfile
+from pathlib import Path
+
+
+ENTITY = ('http://www.sec.gov/CIK', '0000000001')
+
+
+def make_summary(path, context_id, dims):
+    return {
+        'path': path,
+        'error': None,
+        'errors': [],
+        'contexts': {
+            context_id: {'entity': ENTITY, 'start': '2024-01-01', 'end': '2024-12-31', 'instant': False, 'dims': dims},
+            'dup': {'entity': ENTITY, 'start': '2024-01-01', 'end': '2024-12-31', 'instant': False, 'dims': dict(reversed(list(dims.items())))},
+        },
+        'units': {'USD': 'USD', 'USD2': 'USD'},
+        'facts': [
+            ('ex:Revenue', context_id, 'USD', '0', '100'),
+            ('ex:Cost', 'dup', 'USD2', '0', '40'),
+        ],
+    }
+
+def test_interner_shares_contexts_across_summaries():
+    interner = Interner()
+    dims = {'ex:RegionAxis': 'ex:EastMember', 'ex:ProductAxis': 'ex:WidgetMember'}
+    first = interner.intern_summary(make_summary('a.xbrl', 'FY2024', dims))
+    second = interner.intern_summary(make_summary('b.xbrl', 'ctx-1', dims))
+    #duplicate contexts and units collapse, and equal ids are shared across filings
+    assert len(first['contexts']) == 1 and len(first['units']) == 1
+    assert first['contexts'].keys() == second['contexts'].keys()
+    context_id = next(iter(first['contexts']))
+    assert first['contexts'][context_id] is second['contexts'][context_id]
+    assert [fact[1] for fact in first['facts'] + second['facts']] == [context_id] * 4
+    assert interner.stats == {'contexts': 1, 'context_refs': 4, 'units': 1, 'unit_refs': 4}
+    #ids are stable across interners
+    assert Interner().intern_summary(make_summary('c.xbrl', 'x', dims))['facts'] == first['facts']
+    #contexts join across filings on integer keys
+    combined = FactStore.concat([FactStore.from_summary(first), FactStore.from_summary(second)])
+    assert len(set(combined.ctx_key.tolist())) == 1
+    assert combined.ctx_key[0] == first['contexts'][context_id]['key']
+
+def test_generate_xbrl_writes_deduplicated_contexts():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        wb = Workbook()
+        wb.active.title = 'Setup'
+        wb['Setup'].append(['Setting', 'Value'])
+        wb['Setup'].append(['Instance', 'out.xbrl'])
+        ws = wb.create_sheet('Taxonomies')
+        ws.append(['Prefix', 'Namespace', 'Location', 'SchemaRef', 'SchemaLocation'])
+        ws.append(['ex', 'http://example.com/ex', 'ex.xsd', 'Yes', 'Yes'])
+        ws = wb.create_sheet('Contexts')
+        ws.append(['ID', 'Entity', 'Scheme', 'Type', 'Start', 'End'])
+        ws.append(['FY2024', '0000000001', 'http://www.sec.gov/CIK', 'Duration', '2024-01-01', '2024-12-31'])
+        ws.append(['D2024', '0000000001', 'http://www.sec.gov/CIK', 'Duration', '2024-01-01', '2024-12-31'])
+        ws.append(['I2024', '0000000001', 'http://www.sec.gov/CIK', 'Instant', None, '2024-12-31'])
+        ws = wb.create_sheet('Units')
+        ws.append(['ID', 'Measure'])
+        ws.append(['USD', 'iso4217:USD'])
+        ws.append(['Dollars', 'iso4217:USD'])
+        ws = wb.create_sheet('Mapping')
+        ws.append(['Sheet', 'Cell', 'Concept', 'Context', 'Unit', 'Decimals', 'Scale'])
+        ws.append(['Data', 'A1', 'ex:Revenue', 'FY2024', 'USD', 0, None])
+        ws.append(['Data', 'A2', 'ex:Cost', 'D2024', 'Dollars', 0, None])
+        ws.append(['Data', 'A3', 'ex:Cash', 'I2024', 'USD', 0, None])
+        ws = wb.create_sheet('Data')
+        for value in (100, 40, 60):
+            ws.append([value])
+        wb.save(temp_dir / 'workbook.xlsx')
+        output = generate_xbrl(temp_dir / 'workbook.xlsx', output_file=str(temp_dir / 'out.xbrl'))
+        root = etree.parse(output).getroot()
+        xbrli = '{http://www.xbrl.org/2003/instance}'
+        assert [context.get('id') for context in root.iter(f'{xbrli}context')] == ['FY2024', 'I2024']
+        assert [unit.get('id') for unit in root.iter(f'{xbrli}unit')] == ['USD']
+        facts = {etree.QName(fact).localname: (fact.get('contextRef'), fact.get('unitRef')) for fact in root.iter('{http://example.com/ex}*')}
+        assert facts == {'Revenue': ('FY2024', 'USD'), 'Cost': ('FY2024', 'USD'), 'Cash': ('I2024', 'USD')}
+
+def test_generate_xbrl_writes_dimensions():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        wb = Workbook()
+        wb.active.title = 'Setup'
+        wb['Setup'].append(['Setting', 'Value'])
+        wb['Setup'].append(['Instance', 'out.xbrl'])
+        ws = wb.create_sheet('Taxonomies')
+        ws.append(['Prefix', 'Namespace', 'Location', 'SchemaRef', 'SchemaLocation'])
+        ws.append(['ex', 'http://example.com/ex', 'ex.xsd', 'Yes', 'Yes'])
+        ws = wb.create_sheet('Contexts')
+        ws.append(['ID', 'Entity', 'Scheme', 'Type', 'Start', 'End'])
+        for context_id in ('East', 'EastAgain', 'West', 'Total'):
+            ws.append([context_id, '0000000001', 'http://www.sec.gov/CIK', 'Instant', None, '2024-12-31'])
+        ws = wb.create_sheet('Dimensions')
+        ws.append(['Context', 'Note', 'Dimension', 'Member'])
+        ws.append(['East', None, 'ex:RegionAxis', 'ex:EastMember'])
+        ws.append(['EastAgain', None, 'ex:RegionAxis', 'ex:EastMember'])
+        ws.append(['West', None, 'ex:RegionAxis', 'ex:WestMember'])
+        ws = wb.create_sheet('Units')
+        ws.append(['ID', 'Measure'])
+        ws.append(['USD', 'iso4217:USD'])
+        ws = wb.create_sheet('Mapping')
+        ws.append(['Sheet', 'Cell', 'Concept', 'Context', 'Unit', 'Decimals', 'Scale'])
+        for idx, context_id in enumerate(('East', 'EastAgain', 'West', 'Total'), start=1):
+            ws.append(['Data', f'A{idx}', 'ex:Cash', context_id, 'USD', 0, None])
+        ws = wb.create_sheet('Data')
+        for value in (10, 10, 20, 30):
+            ws.append([value])
+        wb.save(temp_dir / 'workbook.xlsx')
+        output = generate_xbrl(temp_dir / 'workbook.xlsx', output_file=str(temp_dir / 'out.xbrl'))
+        root = etree.parse(output).getroot()
+        xbrli = '{http://www.xbrl.org/2003/instance}'
+        #only contexts equal as written, segment included, are merged
+        members = {
+            context.get('id'): [(member.get('dimension'), member.text) for member in context.iter('{http://xbrl.org/2006/xbrldi}explicitMember')]
+            for context in root.iter(f'{xbrli}context')
+            }
+        assert members == {'East': [('ex:RegionAxis', 'ex:EastMember')], 'West': [('ex:RegionAxis', 'ex:WestMember')], 'Total': []}
+        assert root.find(f'{xbrli}context/{xbrli}entity/{xbrli}segment') is not None
+        assert [fact.get('contextRef') for fact in root.iter('{http://example.com/ex}Cash')] == ['East', 'East', 'West', 'Total']
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test lazy Table loading
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory
+from tests.synthetic import load_table
+
+import tempfile
+from pathlib import Path
+
+
+def test_lazy_table_loads_on_first_access():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        eager = load_table(temp_dir)
+        metadata = eager.get_metadata()
+        assert metadata['loaded'] and metadata['schema_refs'] == ['bench.xsd']
+        tblfactory = TableFactory(temp_dir / 'lazy')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        #construction only sniffs the entry point
+        table = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl', lazy=True)
+        assert not table.is_loaded and table._xbrl_model is None
+        metadata = table.get_metadata()
+        assert not metadata['loaded'] and metadata['schema_refs'] == ['bench.xsd']
+        #the model loads on first access, and keeps the sniffed keys
+        assert len(table.xbrl_model.facts) == 16
+        assert table.is_loaded
+        metadata = table.get_metadata()
+        assert metadata['loaded'] and metadata['dts_doc_count'] > 1
+        assert metadata['schema_refs'] == ['bench.xsd'] and 'bench' in metadata['namespaces']
+        #as does validation
+        table = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl', lazy=True)
+        assert not table.is_loaded
+        assert table.validation, table.validation.counts()
+        assert table.is_loaded and table._xbrl_model is not None
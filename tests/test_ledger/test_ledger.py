@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test Ledger class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory
+from src.Table import Taccount
+from src.Ledger import Ledger
+from tests.synthetic import generate_synthetic_taxonomy, generate_synthetic_instance
+
+import numpy as np
+import pytest
+
+import tempfile
+from pathlib import Path
+
+
+FY2024 = ('2024-01-01', '2024-12-31')
+
+
+def test_ledger():
+    ledger = Ledger(decimals=2)
+    ledger.add_constraint('Cash', minimum=0)
+    assert ledger.post([('Cash', 'Equity', 1000_00, FY2024), ('Inventory', 'Cash', 250_50, FY2024)]) == 0
+    ledger.post({'account': ['Expense'], 'counterparty': ['Cash'], 'amount': [100_00], 'period': ['2025-12-31']})
+    assert ledger.get_trial_balance() == {'Cash': 649_50, 'Equity': -1000_00, 'Inventory': 250_50, 'Expense': 100_00}
+    assert ledger.get_balance('Cash', FY2024) == 749_50 and ledger.get_balance('Cash', '2025-12-31') == -100_00
+    assert ledger.balances.sum(axis=1).tolist() == [0, 0]
+    #a batch breaking a constraint is rejected whole, with its new accounts
+    with pytest.raises(ValueError, match='Cash balance -50'):
+        ledger.post([('Rent', 'Cash', 300_00, FY2024), ('Travel', 'Cash', 400_00, FY2024)])
+    with pytest.raises(ValueError, match='integer minor units'):
+        ledger.post([('Rent', 'Cash', 1.5, FY2024)])
+    assert len(ledger) == 3 and len(ledger.accounts) == 4 and ledger.stats['rejected'] == 1
+    #ids post directly, and reversals net to zero
+    ledger.post({'account': np.array([ledger.accounts.get('Equity')]), 'counterparty': np.array([ledger.accounts.get('Cash')]), 'amount': np.array([1]), 'period': np.array([0])})
+    ledger.reverse(ledger.postings(account='Expense'))
+    assert ledger.get_balance('Expense') == 0 and ledger.get_balance('Equity') == -1000_00 + 1
+    assert ledger.batch.tolist() == [0, 0, 1, 2, 3]
+    facts = ledger.to_facts({'Cash': 'ex:Cash', 'Equity': 'ex:Equity'}, entity='1', credit=['Equity'])
+    assert list(zip(facts['concept'], facts['period'], facts['value'])) == [
+        ('ex:Cash', FY2024, '749.49'), ('ex:Cash', '2025-12-31', '749.49'), ('ex:Equity', FY2024, '999.99')]
+    assert facts['decimals'] == [2] * 3
+
+def test_ledger_instants_export_running_balances():
+    ledger = Ledger(decimals=2)
+    #posted out of date order
+    ledger.post([('Cash', 'Equity', 50, '2025-12-31'), ('Cash', 'Equity', 100, '2024-12-31')])
+    ledger.post([('Expense', 'Cash', 20, ('2025-01-01', '2025-06-30'))])
+    facts = ledger.to_facts({'Cash': 'ex:Cash'}, entity='1')
+    assert dict(zip(facts['period'], facts['value'])) == {
+        '2025-12-31': '1.30', '2024-12-31': '1.00', ('2025-01-01', '2025-06-30'): '-0.20'}
+
+def test_ledger_rejects_ragged_columns_without_adding_names():
+    ledger = Ledger()
+    with pytest.raises(ValueError, match='differ in length'):
+        ledger.post({'account': ['Cash', 'Bank'], 'counterparty': ['Equity'], 'amount': [1, 2], 'period': ['2024-12-31'] * 2})
+    assert len(ledger.accounts) == 0 and len(ledger.periods) == 0 and len(ledger) == 0
+
+def test_taccount_export_ledger():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+        generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 4)
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        tacct = Taccount(tblfactory.prepare_options(temp_dir / 'bench.xbrl'), 'tacct', temp_dir / 'bench.xbrl')
+        tacct.post([('Cash', 'Equity', 500, FY2024), ('Cash', 'Equity', 250, FY2024)])
+        stats = tacct.export_ledger({'Cash': 'bench:Concept0000000', 'Equity': 'bench:Concept0000002'}, entity='0000000001', credit=['Equity'])
+        assert stats == {'facts': 2, 'contexts': 1, 'units': 0}
+        store = tacct.get_fact_store()
+        rows = tacct.query(['concept', 'value'], period=FY2024)
+        assert dict(zip(rows['concept'], rows['value'].tolist())) == {'bench:Concept0000000': 7.5, 'bench:Concept0000002': 7.5}
+        assert len(store) == 4 + 2
+        tblfactory.close()
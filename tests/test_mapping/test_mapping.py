@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test Mapping class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.vba.bas_create_instance_doc.mapping import Mapping, open_mapping
+from src.vba.bas_create_instance_doc.initialize_data import initialize_data
+from src.vba.bas_create_instance_doc.generate_audit_information import generate_audit_information
+from src.vba.bas_create_instance_doc.clear_audit_information import clear_audit_information
+
+from openpyxl import Workbook, load_workbook
+
+import tempfile
+from pathlib import Path
+
+
+def write_workbook(path):
+    wb = Workbook()
+    wb.active.title = 'Schedule'
+    wb.create_sheet('Notes')
+    ws_contexts = wb.create_sheet('Contexts')
+    ws_contexts.append(('I-2007', '0000000001', 'http://www.sec.gov/CIK', 'Instant', None, '2007-12-31'))
+    ws_mapping = wb.create_sheet('Mapping')
+    ws_mapping.append(('Sheet', 'Cell', 'Concept', 'Context', 'Unit', 'Decimals', 'Scale'))
+    ws_mapping.append(('Schedule', 'B2', 'HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', 1))
+    ws_mapping.append(('Notes', 'A1', 'HelloWorld:Tuple'))
+    ws_mapping.append(('Notes', 'A2', 'HelloWorld:Note', 'I-2007'))
+    ws_mapping.append(('Missing', 'A1', 'HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', 1))
+    ws_mapping.append((None,))
+    ws_mapping.append(('Schedule', 'B3', 'HelloWorld:Buildings', 'I-2007', 'U-Monetary', 0, 1))
+    wb.active = wb['Notes']
+    wb.save(path)
+    return path
+
+def test_mapping():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_workbook(Path(temp_dir) / 'workbook.xlsx')
+        wb = load_workbook(path)
+        mapping = Mapping.from_worksheet(wb['Mapping'])
+        #empty rows are skipped, short rows padded
+        assert len(mapping) == 5
+        assert mapping.cell == ['B2', 'A1', 'A2', 'A1', 'B3']
+        assert mapping.scale == [1, None, None, 1, 1]
+        assert mapping.facts() == [0, 2, 3, 4]
+        assert mapping.numeric == [True, False, False, True, True]
+        assert mapping.by_sheet() == {'Schedule': [0, 4], 'Notes': [1, 2], 'Missing': [3]}
+        assert mapping.by_sheet([2, 4]) == {'Notes': [2], 'Schedule': [4]}
+        #rows on a missing sheet are skipped
+        assert mapping.write_values(wb, {0: 1, 3: 2}) == 2
+        assert mapping.read_values(wb) == {0: 1, 4: None, 1: None, 2: None}
+        assert len(Mapping.from_worksheet(wb['Mapping'], max_empty_rows=1)) == 4
+
+def test_mapping_ports():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_workbook(Path(temp_dir) / 'workbook.xlsx')
+        assert initialize_data(path) == 4
+        wb = load_workbook(path)
+        assert wb.active.title == 'Notes'
+        assert (wb['Schedule']['B2'].value, wb['Schedule']['B3'].value) == (0, 0)
+        #tuple markers are left alone
+        assert wb['Notes']['A1'].value is None
+        assert wb['Notes']['A2'].value == '[enter text here]'
+
+        assert generate_audit_information(path) == 4
+        wb = load_workbook(path)
+        comment = wb['Schedule']['B2'].comment.text
+        assert 'Concept: HelloWorld:Land' in comment and 'Period: [As of] 2007-12-31' in comment
+        assert "<HelloWorld:Note contextRef='I-2007'>[enter text here]</HelloWorld:Note>" in wb['Notes']['A2'].comment.text
+
+        assert clear_audit_information(path) == 5
+        wb = load_workbook(path)
+        assert wb['Schedule']['B2'].comment is None and wb['Notes']['A2'].comment is None
+
+def test_open_mapping_save():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_workbook(Path(temp_dir) / 'workbook.xlsx')
+        with open_mapping(path, save=False) as (wb, mapping):
+            mapping.write_values(wb, {0: 42})
+        assert load_workbook(path)['Schedule']['B2'].value is None
+        with open_mapping(path) as (wb, mapping):
+            mapping.write_values(wb, {0: 42})
+        assert load_workbook(path)['Schedule']['B2'].value == 42
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test ObjectStore class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.ObjectStore import ObjectStore
+from src.TableFactory import TableFactory
+from src.InstanceReader import InstanceReader
+from tests.synthetic import generate_synthetic_taxonomy, generate_synthetic_instance
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def test_object_store_links_and_skips_unchanged():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / 'schema.xsd'
+        source.write_text('<schema/>')
+        store = ObjectStore(temp_dir / 'objects')
+        digest = store.put_file(source)
+        assert store.link(digest, temp_dir / 'a' / 'schema.xsd') == 'linked'
+        assert store.link(digest, temp_dir / 'b' / 'schema.xsd') == 'linked'
+        assert store.link(digest, temp_dir / 'a' / 'schema.xsd') == 'unchanged'
+        assert os.stat(temp_dir / 'a' / 'schema.xsd').st_nlink == 3
+        with store.writer() as f:
+            f.write(b'<schema/>')
+        assert f.digest.hexdigest() == digest
+        assert store.stats['stored'] == 1 and store.stats['deduplicated'] == 1
+
+def test_table_to_file_exports_instance_and_dts():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+        generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 16)
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        table = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+        results = table.to_file(temp_dir / 'out' / 'bench.xbrl')
+        assert results == {
+            str(temp_dir / 'out' / 'bench.xbrl'): 'linked',
+            str(temp_dir / 'out' / 'bench.xsd'): 'linked',
+        }
+        assert set(table.to_file(temp_dir / 'out' / 'bench.xbrl').values()) == {'unchanged'}
+        exported = InstanceReader(temp_dir / 'out' / 'bench.xbrl').to_summary()['facts']
+        assert sorted(exported) == sorted(InstanceReader(temp_dir / 'bench.xbrl').to_summary()['facts'])
+
+def test_table_to_file_skips_documents_outside_the_instance_directory():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        (temp_dir / 'shared').mkdir()
+        (temp_dir / 'filing').mkdir()
+        generate_synthetic_taxonomy(temp_dir / 'shared' / 'bench.xsd', 4)
+        generate_synthetic_instance(temp_dir / 'filing' / 'bench.xbrl', '../shared/bench.xsd', 16)
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        table = tblfactory.create_xbrl_instance_table(temp_dir / 'filing' / 'bench.xbrl')
+        table.object_store = None
+        results = table.to_file(temp_dir / 'out' / 'bench.xbrl')
+        assert results == {
+            str(temp_dir / 'out' / 'bench.xbrl'): 'written',
+            str(temp_dir / 'shared' / 'bench.xsd'): 'skipped',
+        }
+        #nothing is written above the output directory
+        assert sorted(path.name for path in temp_dir.iterdir()) == ['filing', 'out', 'shared', 'working']
+        assert [path.name for path in (temp_dir / 'shared').iterdir()] == ['bench.xsd']
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test PackageIndex class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.PackageIndex import PackageIndex
+from src.TableFactory import TableFactory
+
+import tempfile
+import zipfile
+from pathlib import Path
+
+
+SCHEMA_URL = 'http://example.com/taxonomy/2024/example.xsd'
+SCHEMA = b'''<?xml version="1.0" encoding="utf-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:xbrli="http://www.xbrl.org/2003/instance"
+    targetNamespace="http://example.com/taxonomy/2024" elementFormDefault="qualified">
+  <xs:import namespace="http://www.xbrl.org/2003/instance" schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd"/>
+  <xs:element name="Revenue" id="ex_Revenue" type="xbrli:monetaryItemType" substitutionGroup="xbrli:item" xbrli:periodType="duration" nillable="true"/>
+</xs:schema>
+'''
+INSTANCE = f'''<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:link="http://www.xbrl.org/2003/linkbase"
+    xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:iso4217="http://www.xbrl.org/2003/iso4217" xmlns:ex="http://example.com/taxonomy/2024">
+  <link:schemaRef xlink:type="simple" xlink:href="{SCHEMA_URL}"/>
+  <xbrli:context id="FY2024">
+    <xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">0000000001</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:startDate>2024-01-01</xbrli:startDate><xbrli:endDate>2024-12-31</xbrli:endDate></xbrli:period>
+  </xbrli:context>
+  <xbrli:unit id="USD"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>
+  <ex:Revenue contextRef="FY2024" unitRef="USD" decimals="0">1000</ex:Revenue>
+</xbrli:xbrl>
+'''
+
+
+def write_package(zip_path, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(zip_path, 'w', compression) as zf:
+        zf.writestr('example/META-INF/catalog.xml', '''<?xml version="1.0"?>
+<catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
+  <rewriteURI uriStartString="http://example.com/taxonomy/" rewritePrefix="../example.com/taxonomy/"/>
+</catalog>''')
+        zf.writestr('example/META-INF/taxonomyPackage.xml', f'''<?xml version="1.0"?>
+<tp:taxonomyPackage xmlns:tp="http://xbrl.org/2016/taxonomy-package">
+  <tp:identifier>http://example.com/taxonomy/2024</tp:identifier>
+  <tp:name>Example</tp:name>
+  <tp:entryPoints><tp:entryPoint><tp:entryPointDocument href="{SCHEMA_URL}"/></tp:entryPoint></tp:entryPoints>
+</tp:taxonomyPackage>''')
+        zf.writestr('example/example.com/taxonomy/2024/example.xsd', SCHEMA)
+    return zip_path
+
+def test_package_index_resolve_and_read():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        (temp_dir / 'packages').mkdir()
+        write_package(temp_dir / 'packages' / 'deflated.zip')
+        index = PackageIndex(temp_dir / 'index')
+        zip_paths = index.register(temp_dir / 'packages')
+        zip_path, member = index.resolve(SCHEMA_URL)
+        assert zip_path == zip_paths[0]
+        assert member == 'example/example.com/taxonomy/2024/example.xsd'
+        assert index.resolve('http://example.com/taxonomy/2024/missing.xsd') is None
+        assert index.read(SCHEMA_URL) == SCHEMA
+        assert index.read(index.member_path(SCHEMA_URL)) == SCHEMA
+        assert index.get_entry_points() == {'Example': [SCHEMA_URL]}
+        index.close()
+        #stored members, and a restart reuses the persisted index
+        write_package(temp_dir / 'packages' / 'stored.zip', zipfile.ZIP_STORED)
+        index = PackageIndex(temp_dir / 'index')
+        index.register(temp_dir / 'packages')
+        assert index.stats['reused'] == 1 and index.stats['indexed'] == 1
+        assert len(index.prefixes) == 2
+        assert index.read(str(temp_dir / 'packages' / 'stored.zip') + '!/example/example.com/taxonomy/2024/example.xsd') == SCHEMA
+        index.close()
+
+def test_table_factory_loads_from_packages():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        (temp_dir / 'packages').mkdir()
+        write_package(temp_dir / 'packages' / 'example.zip')
+        instance_path = temp_dir / 'instance.xbrl'
+        instance_path.write_text(INSTANCE, encoding='utf-8')
+        tblfactory = TableFactory(temp_dir / 'working', packages_dir=temp_dir / 'packages')
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        assert tblfactory.options['internetConnectivity'] == 'offline'
+        assert tblfactory.prepare_options(instance_path)['disclosureSystemName'] is None
+        table = tblfactory.create_xbrl_instance_table(instance_path)
+        concepts = {concept.name for concept in table.xbrl_model.qnameConcepts.values()}
+        assert 'Revenue' in concepts
+        assert len(table.xbrl_model.facts) == 1
+        assert tblfactory.package_index.stats['reads'] >= 1
+        tblfactory.close()
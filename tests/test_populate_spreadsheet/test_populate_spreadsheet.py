@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test populate_spreadsheet
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.vba.bas_create_instance_doc.populate_spreadsheet import build_fact_index, populate_mapped_cells, populate_spreadsheet
+from src.vba.bas_create_instance_doc.mapping import Mapping
+
+from lxml import etree
+from openpyxl import Workbook, load_workbook
+
+import tempfile
+from pathlib import Path
+
+
+INSTANCE = b'''<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:HelloWorld="http://xbrl.squarespace.com/HelloWorld">
+  <HelloWorld:Land contextRef="I-2007" unitRef="U-Monetary" decimals="INF">5347000</HelloWorld:Land>
+  <HelloWorld:Land contextRef="I-2007" unitRef="U-Monetary" decimals="INF">1</HelloWorld:Land>
+  <HelloWorld:Land contextRef="I-2006" unitRef="U-Monetary" decimals="INF">bad</HelloWorld:Land>
+  <HelloWorld:Note contextRef="D-2007">Some text</HelloWorld:Note>
+</xbrli:xbrl>'''
+
+MAPPING = [
+    ('Schedule', 'B2', 'HelloWorld:Land', 'I-2007', 'U-Monetary', 'INF', 1000),
+    ('Schedule', 'B3', 'Land', 'I-2007', 'U-Monetary', 'INF', 1),
+    ('Schedule', 'B4', 'Land', 'I-2006', 'U-Monetary', 'INF', 1),
+    ('Schedule', 'B5', 'HelloWorld:Note', 'D-2007', None, None, None),
+    ('Schedule', 'B6', 'Other:Land', 'I-2007', 'U-Monetary', 'INF', 1),
+    ('Schedule', 'B7', 'HelloWorld:Tuple', None, None, None, None),
+    ]
+
+
+def write_workbook(temp_dir):
+    (temp_dir / 'instance.xbrl').write_bytes(INSTANCE)
+    wb = Workbook()
+    ws_setup = wb.active
+    ws_setup.title = 'Setup'
+    ws_setup['B2'] = 'instance.xbrl'
+    wb.create_sheet('Schedule')
+    ws_mapping = wb.create_sheet('Mapping')
+    ws_mapping.append(('Sheet', 'Cell', 'Concept', 'Context', 'Unit', 'Decimals', 'Scale'))
+    for row in MAPPING:
+        ws_mapping.append(row)
+    path = temp_dir / 'workbook.xlsx'
+    wb.save(path)
+    return path
+
+def test_build_fact_index():
+    index = build_fact_index(etree.ElementTree(etree.fromstring(INSTANCE)))
+    #prefixed and local names both hit; the first fact wins
+    assert index[('HelloWorld:Land', 'I-2007')] == '5347000'
+    assert index[('Land', 'I-2007')] == '5347000'
+    assert index[('HelloWorld:Note', 'D-2007')] == index[('Note', 'D-2007')] == 'Some text'
+    assert ('Other:Land', 'I-2007') not in index
+    assert len(index) == 6
+
+def test_populate_mapped_cells():
+    wb = Workbook()
+    wb.create_sheet('Schedule')
+    mapping = Mapping(dict(zip(('sheet', 'cell', 'concept', 'context', 'unit', 'decimals', 'scale'), zip(*MAPPING))))
+    stats = populate_mapped_cells(wb, mapping, build_fact_index(etree.ElementTree(etree.fromstring(INSTANCE))))
+    ws = wb['Schedule']
+    assert ws['B2'].value == 5347
+    assert ws['B3'].value == 5347000
+    assert ws['B4'].value == '[error]'
+    assert ws['B5'].value == 'Some text'
+    assert ws['B6'].value == '[error]'
+    #tuple start/stop rows have no fact, and are written as errors too
+    assert ws['B7'].value == '[error]'
+    assert (stats['rows'], stats['hits'], stats['misses']) == (6, 4, 2)
+
+def test_populate_spreadsheet():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_workbook(Path(temp_dir))
+        stats = populate_spreadsheet(path)
+        assert stats['index_keys'] == 6
+        assert (stats['hits'], stats['misses']) == (4, 2)
+        ws = load_workbook(path)['Schedule']
+        assert [ws[f'B{row}'].value for row in range(2, 8)] == [5347, 5347000, '[error]', 'Some text', '[error]', '[error]']
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test Query class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.Query import Query
+from src.FactStore import FactStore
+from tests.synthetic import load_table
+
+import numpy as np
+import pytest
+
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def make_store(cik, revenue):
+    return FactStore.from_summary({
+        'path': f'{cik}.xbrl',
+        'contexts': {
+            'Q1': {'entity': ('http://www.sec.gov/CIK', cik), 'start': '2024-01-01', 'end': '2024-03-31', 'instant': False, 'dims': {}},
+            'Q1East': {'entity': ('http://www.sec.gov/CIK', cik), 'start': '2024-01-01', 'end': '2024-03-31', 'instant': False, 'dims': {'ex:RegionAxis': 'ex:EastMember'}},
+            'FY': {'entity': ('http://www.sec.gov/CIK', cik), 'start': '2024-01-01', 'end': '2024-12-31', 'instant': False, 'dims': {}},
+            'I': {'entity': ('http://www.sec.gov/CIK', cik), 'start': None, 'end': '2024-03-31', 'instant': True, 'dims': {}},
+        },
+        'units': {'u1': 'USD', 'u2': 'USD', 'eps': 'shares / USD'},
+        'facts': [
+            ('us-gaap:Revenues', 'Q1', 'u1', '0', str(revenue)),
+            ('us-gaap:Revenues', 'Q1East', 'u2', '0', str(revenue // 2)),
+            ('us-gaap:Revenues', 'FY', 'u1', '0', str(revenue * 4)),
+            ('us-gaap:Cash', 'I', 'u1', '0', '7'),
+            ('us-gaap:EarningsPerShareBasic', 'FY', 'eps', '2', '0.5'),
+            ('us-gaap:Other', 'FY', 'undeclared', '0', '1'),
+            ('dei:EntityRegistrantName', 'FY', None, None, f'Company {cik}'),
+        ],
+    })
+
+def test_query_across_filings():
+    query = Query([make_store('0000000001', 100), make_store('0000000002', 300)])
+    result = query.select(['entity', 'value', 'filing'], concept='us-gaap:Revenues', period=('2024-01-01', '2024-03-31'))
+    assert result['entity'] == ['http://www.sec.gov/CIK|0000000001', 'http://www.sec.gov/CIK|0000000001',
+                                'http://www.sec.gov/CIK|0000000002', 'http://www.sec.gov/CIK|0000000002']
+    assert result['value'].tolist() == [100, 50, 300, 150]
+    assert result['filing'] == ['0000000001.xbrl'] * 2 + ['0000000002.xbrl'] * 2
+    assert query.select(['value'], concept='us-gaap:Revenues', dims={'ex:RegionAxis': 'ex:EastMember'}, entity='0000000002')['value'].tolist() == [150]
+    assert query.count(period=('2024-03-31', None)) == 2   #instants on the bound
+    #units match by measures, whatever their ids
+    assert query.count(unit='USD') == 8
+    assert query.count(unit='shares / USD') == 2 and query.count(unit='USD / shares') == 0
+    assert query.select(['unit', 'measure'], unit=['shares / USD'], filing=0) == {'unit': ['eps'], 'measure': ['shares / USD']}
+    assert query.count(unit='undeclared') == 2
+    assert query.select(['text'], concept='dei:EntityRegistrantName', filing=1)['text'] == ['Company 0000000002']
+    assert query.count(concept='us-gaap:Missing') == 0
+    assert query.count(concept=['us-gaap:Cash', 'dei:EntityRegistrantName']) == 4
+    assert query.count() == 14
+
+def test_table_query():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        table = load_table(Path(temp_dir))
+        result = table.query(['row', 'concept', 'context'], concept='bench:Concept0000001')
+        store = table.get_fact_store()
+        expected = np.flatnonzero(store.concept == store.names.get('bench:Concept0000001'))
+        assert result['row'].tolist() == expected.tolist() and len(expected) > 0
+        assert result['concept'] == ['bench:Concept0000001'] * len(expected)
+        assert result['context'] == [store.context_ids[idx] for idx in store.context[expected].tolist()]
+        assert table.query(['row'])['row'].tolist() == list(range(len(store)))
+
+def test_query_without_fact_stores():
+    with pytest.raises(ValueError, match='no facts to query'):
+        Query([])
+    failed = SimpleNamespace(get_fact_store=lambda: None)
+    with pytest.raises(ValueError, match='no facts to query'):
+        Query([failed, failed])
+    assert len(Query([failed, make_store('0000000001', 100)])) == 7
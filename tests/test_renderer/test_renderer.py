@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test Renderer class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory
+from src.Table import Taxonomy
+from src.Renderer import Renderer
+from src.FactStore import FactStore
+from src.TaxonomyIndex import TaxonomyIndex
+from tests.synthetic import write_taxonomy, ROLE, INSTANCE
+
+import io
+import re
+import tempfile
+from pathlib import Path
+
+
+def test_table_to_html():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        schema_path = write_taxonomy(temp_dir)
+        instance_path = temp_dir / 'instance.xbrl'
+        instance_path.write_text(INSTANCE, encoding='utf-8')
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        table = tblfactory.create_xbrl_instance_table(instance_path)
+        taxonomy = Taxonomy(tblfactory.prepare_options(schema_path), 'schema', schema_path, dts_cache=tblfactory.dts_cache)
+        html = table.to_html(taxonomy=taxonomy)
+        #periods as columns, most recent first; rows in presentation order with preferred labels
+        assert re.findall(r'<thead><tr><th></th>(.*?)</tr></thead>', html) == ['<th>2024-12-31</th><th>2023-12-31</th>']
+        rows = re.findall(r'<tr class="(depth-\d[^"]*)"><th[^>]*>([^<]*)</th>(.*?)</tr>', html)
+        assert rows == [
+            ('depth-0 abstract', 'ex:AssetsAbstract', '<td></td><td></td>'),
+            ('depth-1', 'Cash and Equivalents', '<td class="num">1,500</td><td class="num">1,200.50</td>'),
+            ('depth-1', 'ex:Receivables', '<td class="num">500</td><td></td>'),
+            ('depth-1', 'Total assets', '<td class="num">1,000</td><td></td>'),
+            ]
+        #streamed to a file, with the index of the instance's own DTS
+        written = table.to_html(temp_dir / 'statements.html', roles=[ROLE])
+        assert written == len((temp_dir / 'statements.html').read_text(encoding='utf-8'))
+        tblfactory.close()
+
+def test_renderer_slicers():
+    store = FactStore.from_summary({
+        'path': 'sliced.xbrl',
+        'contexts': {
+            'D2024': {'entity': ('cik', '1'), 'start': '2024-01-01', 'end': '2024-12-31', 'instant': False, 'dims': {}},
+            'D2024East': {'entity': ('cik', '1'), 'start': '2024-01-01', 'end': '2024-12-31', 'instant': False, 'dims': {'ex:RegionAxis': 'ex:EastMember'}},
+        },
+        'facts': [
+            ('ex:Cash', 'D2024', 'USD', None, '10'),
+            ('ex:Cash', 'D2024East', 'USD', None, '4'),
+            ('ex:Assets', 'D2024East', None, None, 'A & B'),
+        ],
+    })
+    index = TaxonomyIndex(['ex:Assets', 'ex:Cash'], [ROLE], networks={'presentation': {
+        'parent': [0], 'child': [1], 'role': [0], 'arcrole': [0], 'order': [1], 'weight': [float('nan')], 'preferred_label': [-1]}})
+    renderer = Renderer(index, store)
+    assert renderer.get_slicers(ROLE) == [{}, {'ex:RegionAxis': 'ex:EastMember'}]
+    out = io.StringIO()
+    renderer.write(out, dims='all')
+    html = out.getvalue()
+    assert html.count('<table') == 2 and 'class="slicers"' in html
+    assert '<td class="num">4</td>' in html and '<td class="text">A &amp; B</td>' in html
+    assert '<th>2024-01-01 to 2024-12-31</th>' in html
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test SessionPool class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.SessionPool import SessionPool
+from tests.synthetic import load_table
+
+import pytest
+
+import tempfile
+import threading
+from pathlib import Path
+
+
+def in_thread(target):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=target()))
+    thread.start()
+    thread.join(10)
+    return result.get('value')
+
+def test_session_pool_same_thread_reuse():
+    pool = SessionPool(max_size=2)
+    with pool.session() as session:
+        pass
+    with pool.session() as again:
+        assert again is session
+    assert pool.stats['creations'] == 1 and pool.stats['hits'] == 1
+    pool.close()
+
+def test_session_pool_cross_thread_checkout():
+    pool = SessionPool(max_size=1, timeout=5)
+    session = pool.checkout()
+    pool.checkin(session)
+    #the only idle Session belongs to this thread: another thread replaces it, without waiting
+    other = in_thread(lambda: pool.checkin(pool.checkout()) or 'done')
+    assert other == 'done'
+    assert pool.stats['replacements'] == 1 and pool.stats['waits'] == 0
+    assert len(pool._retired) == 1
+    #the retired Session is closed by its own thread
+    assert pool.close_retired() == 1
+    pool.close()
+
+def test_session_pool_close():
+    pool = SessionPool(max_size=2)
+    idle = pool.checkout()
+    busy = pool.checkout()
+    pool.checkin(idle)
+    pool.close()
+    assert pool._size == 1 and not pool._idle
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+    pool.checkin(busy)
+    assert pool._size == 0 and not pool._retired
+
+def test_session_pool_checkin_keeps_loaded_models():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        table = load_table(temp_dir)
+        #validation runs on the models after the pool has detached them
+        assert table.validation.entrypoint == str(temp_dir / 'bench.xbrl')
+        assert 'exception' not in table.validation.counts()
+        assert table.session_pool.stats['detached_models'] >= 1
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test TableFactory class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory, load_instance_summary
+from tests.synthetic import load_table
+
+import os
+import tempfile
+from pathlib import Path
+
+
+TUPLE_INSTANCE = '''<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:link="http://www.xbrl.org/2003/linkbase"
+    xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:iso4217="http://www.xbrl.org/2003/iso4217" xmlns:ex="http://example.com/tuples">
+  <link:schemaRef xlink:type="simple" xlink:href="tuples.xsd"/>
+  <xbrli:context id="C"><xbrli:entity><xbrli:identifier scheme="http://www.sec.gov/CIK">1</xbrli:identifier></xbrli:entity>
+    <xbrli:period><xbrli:instant>2024-12-31</xbrli:instant></xbrli:period></xbrli:context>
+  <xbrli:unit id="USD"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>
+  <ex:Zeta contextRef="C" unitRef="USD" decimals="0">1</ex:Zeta>
+  <ex:Pair><ex:Alpha contextRef="C" unitRef="USD" decimals="0">2</ex:Alpha><ex:Mid contextRef="C" unitRef="USD" decimals="0">3</ex:Mid></ex:Pair>
+  <ex:Beta contextRef="C" unitRef="USD" decimals="0">4</ex:Beta>
+</xbrli:xbrl>
+'''
+
+TUPLE_SCHEMA = '''<?xml version="1.0" encoding="utf-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:xbrli="http://www.xbrl.org/2003/instance"
+    xmlns:ex="http://example.com/tuples" targetNamespace="http://example.com/tuples" elementFormDefault="qualified">
+  <xs:import namespace="http://www.xbrl.org/2003/instance" schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd"/>
+''' + ''.join(
+    f'  <xs:element name="{name}" id="ex_{name}" type="xbrli:monetaryItemType" substitutionGroup="xbrli:item" xbrli:periodType="instant" nillable="true"/>\n'
+    for name in ('Zeta', 'Alpha', 'Mid', 'Beta')
+    ) + '''  <xs:element name="Pair" id="ex_Pair" substitutionGroup="xbrli:tuple" nillable="true">
+    <xs:complexType><xs:complexContent><xs:restriction base="xs:anyType"><xs:sequence>
+      <xs:element ref="ex:Alpha"/><xs:element ref="ex:Mid"/>
+    </xs:sequence><xs:attribute name="id" type="xs:ID"/></xs:restriction></xs:complexContent></xs:complexType>
+  </xs:element>
+</xs:schema>
+'''
+
+
+def crash_on_marker(filepath, trusted=False):
+    """Worker loader that kills its process for files named 'crash'."""
+    if Path(filepath).stem == 'crash':
+        os._exit(1)
+    return load_instance_summary(filepath, trusted=True)
+
+def test_get_summary_document_order():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        (temp_dir / 'tuples.xsd').write_text(TUPLE_SCHEMA, encoding='utf-8')
+        (temp_dir / 'tuples.xbrl').write_text(TUPLE_INSTANCE, encoding='utf-8')
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        table = tblfactory.create_xbrl_instance_table(temp_dir / 'tuples.xbrl')
+        summary = table.get_summary()
+        assert [fact[0] for fact in summary['facts']] == ['ex:Zeta', 'ex:Alpha', 'ex:Mid', 'ex:Beta']
+        tblfactory.close()
+
+def test_create_xbrl_instance_tables_isolates_dead_workers():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        load_table(temp_dir)
+        (temp_dir / 'crash.xbrl').write_text('<xbrl/>')
+        tblfactory = TableFactory(temp_dir / 'working')
+        paths = [temp_dir / 'crash.xbrl', temp_dir / 'bench.xbrl', temp_dir / 'bench.xbrl']
+        summaries = list(tblfactory.create_xbrl_instance_tables(paths, workers=1, max_pending=1, loader=crash_on_marker))
+        assert len(summaries) == 3
+        assert [Path(summary['path']).stem for summary in summaries] == ['crash', 'bench', 'bench']
+        assert 'BrokenProcessPool' in summaries[0]['error']
+        assert summaries[0]['facts'] == [] and summaries[0]['contexts'] == {}
+        assert [len(summary['facts']) for summary in summaries[1:]] == [16, 16]
+        tblfactory.close()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test Table bulk fact creation
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory
+from src.InstanceReader import InstanceReader
+from tests.synthetic import generate_synthetic_taxonomy, generate_synthetic_instance, load_table
+
+import tempfile
+from pathlib import Path
+
+
+def test_synthetic_filing_is_valid():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        table = load_table(temp_dir)
+        #concepts match their contexts' period types, and the axes are dimensions
+        assert table.validation, table.validation.counts()
+        assert len(table.xbrl_model.facts) == 16
+        #and the taxonomy is deterministic
+        schema = (temp_dir / 'bench.xsd').read_bytes()
+        generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+        assert (temp_dir / 'bench.xsd').read_bytes() == schema
+
+def test_table_add_facts_deduplicates_contexts_and_units():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        table = load_table(temp_dir)
+        n_contexts = len(table.xbrl_model.contexts)
+        stats = table.add_facts([
+            #matches the instance's context C0000001 and unit USD
+            ('bench:Concept0000001', '0000000001', '2000-12-31', {'bench:Axis0': 'bench:Member0x1'}, 'iso4217:USD', 0, 5),
+            ('bench:Concept0000000', '0000000001', ('2030-01-01', '2030-12-31'), None, 'iso4217:USD', 0, 10.0),
+            ('bench:Concept0000002', '0000000001', ('2030-01-01', '2030-12-31'), None, 'iso4217:EUR', 0, 20),
+            {'concept': 'bench:Concept0000003', 'entity': '0000000001', 'period': '2030-12-31', 'unit': 'iso4217:EUR', 'decimals': 0, 'value': None},
+            ])
+        assert stats == {'facts': 4, 'contexts': 2, 'units': 1}
+        assert len(table.xbrl_model.contexts) == n_contexts + 2
+        facts = {fact.qname.localName: fact for fact in table.xbrl_model.facts[-4:]}
+        assert facts['Concept0000001'].contextID == 'C0000001'
+        assert facts['Concept0000000'].contextID == facts['Concept0000002'].contextID
+        assert facts['Concept0000000'].xValue == 10
+        assert facts['Concept0000003'].isNil
+        stats = table.add_facts({
+            'concept': ['bench:Concept0000000'] * 3,
+            'entity': ['0000000001'] * 3,
+            'period': [('2030-01-01', '2030-12-31')] * 3,
+            'unit': ['iso4217:EUR'] * 3,
+            'decimals': [0] * 3,
+            'value': [1, 2, 3],
+            })
+        assert stats == {'facts': 3, 'contexts': 0, 'units': 0}
+        assert len(table.get_facts(columnar=True)) == 16 + 7
+        table.to_file(temp_dir / 'out' / 'bench.xbrl')
+        assert len(InstanceReader(temp_dir / 'out' / 'bench.xbrl').to_summary()['facts']) == 16 + 7
+
+def test_table_add_facts_does_not_mutate_cached_model():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        load_table(temp_dir)
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        first = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+        second = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+        assert second.xbrl_model is first.xbrl_model
+        fact = ('bench:Concept0000000', '0000000001', ('2030-01-01', '2030-12-31'), None, 'iso4217:USD', 0, 1)
+        #the model is shared: the second table takes a private copy
+        second.add_facts([fact])
+        assert len(second.xbrl_model.facts) == 17
+        assert len(first.xbrl_model.facts) == 16
+        #the first is now its only holder, and mutates it in place; later loads rediscover
+        first.add_facts([fact])
+        assert len(first.xbrl_model.facts) == 17
+        assert len(tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl').xbrl_model.facts) == 16
+        tblfactory.close()
+
+def test_table_add_facts_does_not_reuse_contexts_with_other_content():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+        generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 16)
+        #contexts with a scenario, or non-dimensional segment content
+        identifier = '<xbrli:identifier scheme="http://x">E1</xbrli:identifier>'
+        period = '<xbrli:period><xbrli:instant>2030-12-31</xbrli:instant></xbrli:period>'
+        note = '<ex:note xmlns:ex="http://example.com/ex">restated</ex:note>'
+        extra = (
+            f'<xbrli:context id="SCN"><xbrli:entity>{identifier}</xbrli:entity>{period}<xbrli:scenario>{note}</xbrli:scenario></xbrli:context>'
+            f'<xbrli:context id="SEG"><xbrli:entity>{identifier}<xbrli:segment>{note}</xbrli:segment></xbrli:entity>{period}</xbrli:context>'
+            )
+        instance = (temp_dir / 'bench.xbrl').read_text()
+        (temp_dir / 'bench.xbrl').write_text(instance.replace('<xbrli:context id="C0000000">', extra + '<xbrli:context id="C0000000">', 1))
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        table = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+        assert {'SCN', 'SEG'} <= set(table.xbrl_model.contexts)
+        stats = table.add_facts([
+            ('bench:Concept0000001', ('http://x', 'E1'), '2030-12-31', None, 'iso4217:USD', 0, 5),
+            ('bench:Concept0000003', ('http://x', 'E1'), '2030-12-31', None, 'iso4217:USD', 0, 6),
+            ])
+        assert stats == {'facts': 2, 'contexts': 1, 'units': 0}
+        context_ids = {fact.contextID for fact in table.xbrl_model.facts[-2:]}
+        assert len(context_ids) == 1 and not context_ids & {'SCN', 'SEG'}
+        context = table.xbrl_model.contexts[context_ids.pop()]
+        assert not context.hasScenario and not context.hasSegment
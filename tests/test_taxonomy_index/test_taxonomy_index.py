@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test TaxonomyIndex class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TableFactory import TableFactory
+from src.Table import Taxonomy
+from src.TaxonomyIndex import TaxonomyIndex
+from tests.synthetic import write_taxonomy, ROLE
+
+import numpy as np
+
+import tempfile
+from pathlib import Path
+
+
+def test_taxonomy_index_labels_and_networks():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        schema_path = write_taxonomy(temp_dir)
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        options = tblfactory.prepare_options(schema_path)
+        taxonomy = Taxonomy(options, 'schema', schema_path, dts_cache=tblfactory.dts_cache, session_pool=tblfactory.session_pool)
+        labels = taxonomy.get_concept_labels()
+        assert labels == {'ex:Assets': 'Assets', 'ex:Cash': 'Cash and Equivalents'}
+        index = taxonomy.get_index()
+        assert index.get_label('ex:Receivables', 'http://www.xbrl.org/2003/role/terseLabel') == 'Receivables'
+        assert index.get_label('ex:Receivables', default='ex:Receivables') == 'ex:Receivables'
+        assert index.children('ex:AssetsAbstract', 'presentation', role=ROLE) == ['ex:Cash', 'ex:Receivables', 'ex:Assets']
+        assert index.roots('presentation') == ['ex:AssetsAbstract']
+        assert index.parents('ex:Cash', 'definition') == ['ex:Assets']
+        arrays = index.networks['calculation']
+        rows = index.edges('ex:Assets', 'calculation')
+        assert arrays['weight'][rows].tolist() == [1.0, -1.0]
+        pre = index.networks['presentation']
+        preferred = pre['preferred_label'][index.edges('ex:AssetsAbstract', 'presentation')]
+        assert index.roles[preferred[-1]] == 'http://www.xbrl.org/2003/role/totalLabel'
+        #a lazy taxonomy reuses the saved index without loading the DTS
+        lazy = Taxonomy(options, 'schema', schema_path, dts_cache=tblfactory.dts_cache, lazy=True)
+        assert lazy.get_concept_labels() == labels
+        assert not lazy.is_loaded
+        saved = lazy.get_index()
+        assert saved.children('ex:Assets', 'calculation') == ['ex:Cash', 'ex:Receivables']
+        assert np.array_equal(saved.networks['presentation']['indptr'], pre['indptr'])
+        tblfactory.close()
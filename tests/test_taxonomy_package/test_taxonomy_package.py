@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test TaxonomyPackage class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.TaxonomyPackage import TaxonomyPackage
+from src.PackageIndex import PackageIndex
+
+import tempfile
+import zipfile
+from pathlib import Path
+
+
+METADATA = {
+    'identifier': 'http://example.com/taxonomy/2024',
+    'name': 'example',
+    'entry_points': {'Example': 'http://example.com/taxonomy/2024/example.xsd'},
+    'remappings': {'http://example.com/taxonomy/': 'example.com/taxonomy/'},
+}
+
+
+def write_source(source_dir):
+    for idx in range(20):
+        path = source_dir / 'example.com' / 'taxonomy' / '2024' / f'schema{idx}.xsd'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'<schema id="{idx}"/>\n' * 50)
+
+def test_taxonomy_package_build_is_deterministic():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        write_source(temp_dir / 'source')
+        TaxonomyPackage(temp_dir / 'source', workers=4, **METADATA).build(temp_dir / 'a.zip')
+        TaxonomyPackage(temp_dir / 'source', workers=1, **METADATA).build(temp_dir / 'b.zip')
+        assert (temp_dir / 'a.zip').read_bytes() == (temp_dir / 'b.zip').read_bytes()
+        with zipfile.ZipFile(temp_dir / 'a.zip') as zf:
+            assert zf.testzip() is None
+            names = zf.namelist()
+            assert names[:2] == ['example/META-INF/taxonomyPackage.xml', 'example/META-INF/catalog.xml']
+            assert names[2:] == sorted(names[2:])
+            assert zf.read('example/example.com/taxonomy/2024/schema3.xsd') == b'<schema id="3"/>\n' * 50
+        index = PackageIndex(temp_dir / 'index')
+        index.register(temp_dir, pattern='a.zip')
+        assert index.read('http://example.com/taxonomy/2024/schema3.xsd') == b'<schema id="3"/>\n' * 50
+        assert index.get_entry_points() == {'example': ['http://example.com/taxonomy/2024/example.xsd']}
+        index.close()
+
+def test_taxonomy_package_update_copies_unchanged_members():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        write_source(temp_dir / 'source')
+        TaxonomyPackage(temp_dir / 'source', **METADATA).build(temp_dir / 'package.zip')
+        (temp_dir / 'source' / 'example.com' / 'taxonomy' / '2024' / 'schema0.xsd').write_text('<schema changed="true"/>')
+        package = TaxonomyPackage(temp_dir / 'source', **METADATA)
+        package.build(temp_dir / 'package.zip', update=True)
+        assert package.stats['compressed'] == 1
+        assert package.stats['copied'] == 19
+        TaxonomyPackage(temp_dir / 'source', **METADATA).build(temp_dir / 'fresh.zip', update=False)
+        assert (temp_dir / 'package.zip').read_bytes() == (temp_dir / 'fresh.zip').read_bytes()
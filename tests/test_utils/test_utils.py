@@ -10,10 +10,45 @@ __license__ = "AGPL-3.0"
 
 
 from src.utils import (
-    parse_xbrl_instance
+    parse_xbrl_instance,
+    are_xml_files_identical_lxml
 )
 
 
 def test_parse_xbrl_instance():
     check = parse_xbrl_instance()
-    assert check == True
\ No newline at end of file
+    assert check == True
+
+
+INSTANCE = """<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:ex="http://example.com/ex">
+{body}
+</xbrli:xbrl>
+"""
+CONTEXT = '<xbrli:context id="c1"><xbrli:entity><xbrli:identifier scheme="s">1</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:instant>2024-12-31</xbrli:instant></xbrli:period></xbrli:context>'
+UNIT = '<xbrli:unit id="u1"><xbrli:measure>iso4217:USD</xbrli:measure></xbrli:unit>'
+FACT_A = '<ex:A contextRef="c1" unitRef="u1" decimals="0">100</ex:A>'
+FACT_B = '<ex:B decimals="0" unitRef="u1" contextRef="c1">200</ex:B>'
+
+
+def write_instance(path, *items):
+    path.write_text(INSTANCE.format(body='\n'.join(items)), encoding='utf-8')
+    return path
+
+
+def test_are_xml_files_identical_c14n(tmp_path):
+    file1 = write_instance(tmp_path / 'a.xbrl', CONTEXT, UNIT, FACT_A, FACT_B)
+    #attribute order and comments are not significant
+    file2 = write_instance(tmp_path / 'b.xbrl', '<!-- comment -->' + CONTEXT, UNIT, FACT_A, FACT_B.replace('decimals="0" unitRef="u1" contextRef="c1"', 'contextRef="c1" unitRef="u1" decimals="0"'))
+    file3 = write_instance(tmp_path / 'c.xbrl', CONTEXT, UNIT, FACT_A, FACT_B.replace('200', '201'))
+    assert are_xml_files_identical_lxml(file1, file2, mode='c14n') == True
+    assert are_xml_files_identical_lxml(file1, file3, mode='c14n') == False
+
+
+def test_are_xml_files_identical_xbrl(tmp_path):
+    file1 = write_instance(tmp_path / 'a.xbrl', CONTEXT, UNIT, FACT_A, FACT_B)
+    file2 = write_instance(tmp_path / 'b.xbrl', FACT_B, UNIT, FACT_A, CONTEXT)
+    file3 = write_instance(tmp_path / 'c.xbrl', CONTEXT, UNIT, FACT_A)
+    assert are_xml_files_identical_lxml(file1, file2) == False
+    assert are_xml_files_identical_lxml(file1, file2, mode='xbrl') == True
+    assert are_xml_files_identical_lxml(file1, file3, mode='xbrl') == False
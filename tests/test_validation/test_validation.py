@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test ValidationCache class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.Validation import ValidationCache, ValidationResult
+from src.DtsCache import DtsCache
+from src.TableFactory import TableFactory
+from tests.synthetic import generate_synthetic_taxonomy, generate_synthetic_instance, make_model
+
+import os
+import tempfile
+from pathlib import Path
+
+
+def validate(dts_cache, validation_cache, instance_path, schema_path):
+    """Stand-in for Table.load_xbrl: look up the DTS, else 'validate' the
+    documents not in the plan, with an error naming each one's content."""
+    dts_cache.put(instance_path, make_model(instance_path, schema_path))
+    manifest = dts_cache.get_manifest(instance_path)
+    result = validation_cache.lookup(instance_path, manifest)
+    if result is None:
+        plan = validation_cache.plan(manifest)
+        checked = [path for path in (instance_path, schema_path) if str(path) not in plan['skip']]
+        result = ValidationResult(instance_path, [
+            {'code': path.read_text(), 'level': 'ERROR', 'message': '', 'document': str(path)} for path in checked
+            ])
+        result = validation_cache.merge(result, plan)
+        validation_cache.store(result, manifest)
+    return result
+
+def test_validation_cache():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        instance_path = temp_dir / 'instance.xbrl'
+        schema_path = temp_dir / 'schema.xsd'
+        instance_path.write_text('I1')
+        schema_path.write_text('S1')
+        dts_cache = DtsCache(temp_dir / 'dts')
+        validation_cache = ValidationCache(temp_dir / 'validation')
+        result = validate(dts_cache, validation_cache, instance_path, schema_path)
+        assert not result.cached and result.counts() == {'I1': 1, 'S1': 1}
+        #hit: unchanged DTS
+        result = validate(dts_cache, validation_cache, instance_path, schema_path)
+        assert result.cached and result.counts() == {'I1': 1, 'S1': 1}
+        assert {error['code']: error['document'] for error in result.errors} == {'I1': str(instance_path), 'S1': str(schema_path)}
+        #an edited instance reruns only the instance
+        instance_path.write_text('I2')
+        result = validate(dts_cache, validation_cache, instance_path, schema_path)
+        assert not result.cached and result.counts() == {'I2': 1, 'S1': 1}
+        assert validation_cache.stats['reused'] == 1
+        #as does another instance against the same taxonomy
+        other_path = temp_dir / 'other.xbrl'
+        other_path.write_text('I3')
+        result = validate(dts_cache, validation_cache, other_path, schema_path)
+        assert result.counts() == {'I3': 1, 'S1': 1} and validation_cache.stats['reused'] == 2
+        #an edited schema is revalidated
+        schema_path.write_text('S2')
+        result = validate(dts_cache, validation_cache, instance_path, schema_path)
+        assert not result.cached and result.counts() == {'I2': 1, 'S2': 1}
+        #an edit reverted: S1's own result, not S2's
+        schema_path.write_text('S1')
+        os.utime(schema_path, ns=(1, 1))
+        result = validate(dts_cache, validation_cache, instance_path, schema_path)
+        assert result.cached and result.counts() == {'I2': 1, 'S1': 1}
+        assert validation_cache.stats == {'hits': 2, 'misses': 4, 'reused': 2}
+
+def test_cached_failure_survives_dts_cache_hit():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+        generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 16)
+        #an instant concept in a duration context
+        instance = (temp_dir / 'bench.xbrl').read_text()
+        (temp_dir / 'bench.xbrl').write_text(instance.replace('<bench:Concept0000001 contextRef="C0000001"', '<bench:Concept0000001 contextRef="C0000000"', 1))
+        tblfactory = TableFactory(temp_dir / 'working')
+        tblfactory.options['internetConnectivity'] = 'offline'
+        tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+        first = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+        assert not first.validation and not first.validation.cached
+        #the DtsCache hands back the model, and the cached failure is kept as is
+        second = tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl')
+        assert second.xbrl_model is first.xbrl_model
+        assert not second.validation and second.validation.cached
+        assert second.validation.messages == first.validation.messages
+
+def test_instances_share_taxonomy_validation():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        generate_synthetic_taxonomy(temp_dir / 'bench.xsd', 4)
+        generate_synthetic_instance(temp_dir / 'bench.xbrl', 'bench.xsd', 16)
+        instance = (temp_dir / 'bench.xbrl').read_text()
+        (temp_dir / 'invalid.xbrl').write_text(instance.replace('<bench:Concept0000001 contextRef="C0000001"', '<bench:Concept0000001 contextRef="C0000000"', 1))
+        results = {}
+        for name in ('fresh', 'shared'):
+            tblfactory = TableFactory(temp_dir / name)
+            tblfactory.options['internetConnectivity'] = 'offline'
+            tblfactory.logfile_dir.mkdir(parents=True, exist_ok=True)
+            if name == 'shared':
+                assert tblfactory.create_xbrl_instance_table(temp_dir / 'bench.xbrl').validation
+                assert tblfactory.validation_cache.stats['reused'] == 0
+            results[name] = tblfactory.create_xbrl_instance_table(temp_dir / 'invalid.xbrl').validation
+        #the taxonomy's checks are skipped for the second instance, with the same result
+        assert tblfactory.validation_cache.stats['reused'] >= 1
+        assert not results['shared'] and not results['shared'].cached
+        assert results['shared'].counts() == results['fresh'].counts()
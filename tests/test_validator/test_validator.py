@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test Validator class
+
+"""
+
+__author__ = "Jason Beach"
+__version__ = "0.1.0"
+__license__ = "AGPL-3.0"
+
+
+from src.vba.bas_validation.validator import Validator
+from src.vba.bas_validation.validate_hello_world import validate_hello_world
+from src.vba.bas_validation.rules import Rule, RulePlan
+
+from openpyxl import Workbook, load_workbook
+
+import tempfile
+from pathlib import Path
+
+
+def write_workbook(path, ppe_2006_total=1500, rules=None):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Hello World Example'
+    for row, (value_2007, value_2006) in enumerate(((100, 200), (200, 300), (300, 400), (400, 500), (500, 100)), start=9):
+        ws[f'C{row}'], ws[f'D{row}'] = value_2007, value_2006
+    ws['C14'], ws['D14'] = 1500, ppe_2006_total
+    ws['B2'] = 'Hello World'
+    other = wb.create_sheet('Schedule A')
+    other['B5'] = 1500
+    other['B6'] = -3
+    wb.create_sheet('Messages').append(('Number', 'Level', 'Message'))
+    if rules is not None:
+        ws_rules = wb.create_sheet('Rules')
+        ws_rules.append(('kind', 'sheet', 'target', 'operand', 'level'))
+        for rule in rules:
+            ws_rules.append(rule)
+    wb.save(path)
+    return path
+
+def test_rule_plan():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_workbook(Path(temp_dir) / 'input.xlsx', ppe_2006_total=1400)
+        plan = RulePlan([
+            Rule('total', 'C14', 'C9:C13', sheet='Hello World Example'),
+            Rule('total', 'D14', 'D9:D13', sheet='Hello World Example'),
+            Rule('tie', "'Hello World Example'!C14", "'Schedule A'!B5"),
+            Rule('required', 'B2:B3', sheet='Hello World Example', level='WARNING'),
+            Rule('sign', 'B5:B6,C9', '+', sheet='Schedule A'),
+            Rule('sign', 'B6', '-', sheet='Schedule A'),
+            ])
+        assert len(plan.cells) == 17
+        result = plan.evaluate(*plan.read(path))
+        assert result['passed'].tolist() == [True, False, True, False, False, True]
+        assert result['expected'][:2].tolist() == [1500, 1500]
+        messages = plan.messages(result)
+        assert [level for level, _ in messages] == ['ERROR', 'WARNING', 'ERROR']
+        assert messages[0][1] == 'D14 does not foot!  D14 = 1400, whereas the sum of D9:D13 is 1500.'
+        assert messages[1][1] == "B2:B3 is required, but 'Hello World Example'!B3 is empty."
+        assert messages[2][1] == "B5:B6,C9 must be positive, but 'Schedule A'!B6 is not."
+
+def test_validator():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        #the Hello World checks by default
+        path = write_workbook(temp_dir / 'input.xlsx', ppe_2006_total=1400)
+        validator = Validator(path, output_path=temp_dir / 'output.xlsx')
+        messages = validator.run_validation()
+        assert [level for level, _ in messages] == ['Information', 'Information', 'ERROR', 'Information']
+        assert messages[1][1] == "Property, Plant and Equipment for 2007 foots on 'Hello World Example'."
+        assert 'group = 1400, whereas the sum of the components of PPE is 1500' in messages[2][1]
+        rows = list(load_workbook(temp_dir / 'output.xlsx')['Messages'].iter_rows(min_row=2, values_only=True))
+        assert [row[:2] for row in rows] == [(1, 'Information'), (2, 'Information'), (3, 'ERROR'), (4, 'Information')]
+        #rerun replaces the messages
+        validator.run_validation()
+        assert validator.ws.max_row == 5
+        #rules from the workbook's Rules sheet
+        path = write_workbook(temp_dir / 'rules.xlsx', rules=[('tie', 'Schedule A', 'B5', "'Hello World Example'!D14", None)])
+        validator = Validator(path, output_path=temp_dir / 'output.xlsx')
+        assert [level for level, _ in validator.run_validation()] == ['Information', 'Information']
+        #the standalone script writes its own results sheet
+        assert [level for level, _ in validate_hello_world(temp_dir / 'input.xlsx')] == ['Information', 'ERROR']
+        assert load_workbook(temp_dir / 'input.xlsx')['Validation Results']['B2'].value == 'ERROR'